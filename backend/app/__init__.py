@@ -1,18 +1,38 @@
+import time
+from datetime import date, datetime
 from pyramid.config import Configurator
 from pyramid.renderers import JSON
 from pyramid.response import Response
-from .database import init_db, Session
+from pyramid.tweens import INGRESS, EXCVIEW
+from .renderers import FastJSON
+from .database import init_db, configure_engine
+from .jobs import job_queue
+from .backlog import key_points_backlog
+from .dedup import near_duplicates
+from .services.sentiment_analyzer import sentiment_analyzer
+from .services.gemini_extractor import gemini_extractor
 
 def main(global_config, **settings):
     """
     This function returns a Pyramid WSGI application.
+    
+    AI models are not loaded here: they initialize lazily on first use, and
+    app.model_warmup (background | eager | lazy) controls whether they are
+    warmed up in the background, before serving, or not at all.
     """
+    startup_started = time.perf_counter()
+    timings = {}
     config = Configurator(settings=settings)
     
-    # Configure JSON renderer
-    json_renderer = JSON()
-    json_renderer.add_adapter(type(None), lambda obj, request: None)
-    config.add_renderer('json', json_renderer)
+    # Configure JSON renderer: fast (orjson when installed) or the stock stdlib one
+    if settings.get('app.json_renderer', 'fast') == 'fast':
+        config.add_renderer('json', FastJSON)
+    else:
+        json_renderer = JSON()
+        json_renderer.add_adapter(type(None), lambda obj, request: None)
+        json_renderer.add_adapter(datetime, lambda obj, request: obj.isoformat())
+        json_renderer.add_adapter(date, lambda obj, request: obj.isoformat())
+        config.add_renderer('json', json_renderer)
     
     # Add CORS headers to ALL responses
     def add_cors_headers(event):
@@ -25,6 +45,21 @@ def main(global_config, **settings):
     
     config.add_subscriber(add_cors_headers, 'pyramid.events.NewResponse')
     
+    # Tweens are ordered explicitly, outermost first: metrics wraps admission
+    # so shed requests and queue time show up in the request metrics
+    
+    # Per-route latency and in-flight request metrics
+    config.add_tween('app.tweens.metrics_tween_factory', under=INGRESS)
+    
+    # Per-route concurrency limits and load shedding (app.admission.*)
+    config.add_tween('app.tweens.admission_tween_factory', under='app.tweens.metrics_tween_factory')
+    
+    # One scoped database session per request, removed when the request ends
+    config.add_tween('app.tweens.db_session_tween_factory', under='app.tweens.admission_tween_factory')
+    
+    # gzip/brotli for large JSON and text bodies (app.compression_min_bytes)
+    config.add_tween('app.tweens.compression_tween_factory', under='app.tweens.db_session_tween_factory', over=EXCVIEW)
+    
     # Handle OPTIONS preflight requests
     def cors_options_view(request):
         response = Response()
@@ -38,18 +73,65 @@ def main(global_config, **settings):
     
     # Add routes
     config.add_route('analyze_review', '/api/analyze-review')
+    config.add_route('analyze_reviews', '/api/analyze-reviews')
     config.add_route('get_reviews', '/api/reviews')
+    config.add_route('export_reviews', '/api/reviews/export')
+    config.add_route('search_reviews', '/api/reviews/search')
+    config.add_route('get_review', r'/api/reviews/{id:\d+}')
+    config.add_route('stats', '/api/stats')
+    config.add_route('metrics', '/api/metrics')
     config.add_route('health', '/api/health')
+    config.add_route('ready', '/api/health/ready')
     
     # Add OPTIONS handlers for each route
     config.add_view(cors_options_view, route_name='analyze_review', request_method='OPTIONS')
+    config.add_view(cors_options_view, route_name='analyze_reviews', request_method='OPTIONS')
     config.add_view(cors_options_view, route_name='get_reviews', request_method='OPTIONS')
+    config.add_view(cors_options_view, route_name='export_reviews', request_method='OPTIONS')
+    config.add_view(cors_options_view, route_name='search_reviews', request_method='OPTIONS')
+    config.add_view(cors_options_view, route_name='get_review', request_method='OPTIONS')
+    config.add_view(cors_options_view, route_name='stats', request_method='OPTIONS')
+    config.add_view(cors_options_view, route_name='metrics', request_method='OPTIONS')
     config.add_view(cors_options_view, route_name='health', request_method='OPTIONS')
+    config.add_view(cors_options_view, route_name='ready', request_method='OPTIONS')
     
     # Scan for view functions
+    started = time.perf_counter()
     config.scan('.views')
+    timings['imports'] = round(time.perf_counter() - started, 3)
     
-    # Initialize database
+    # Initialize database (pool options come from the sqlalchemy.* settings)
+    started = time.perf_counter()
+    configure_engine(settings=settings)
     init_db()
+    timings['db_init'] = round(time.perf_counter() - started, 3)
+    
+    # Rebuild the near-duplicate index from stored signatures
+    started = time.perf_counter()
+    indexed = near_duplicates.rebuild()
+    timings['dedup_index'] = round(time.perf_counter() - started, 3)
+    if indexed:
+        print(f"🔎 Near-duplicate index rebuilt with {indexed} reviews in {timings['dedup_index']}s")
+    
+    # Warm up AI models
+    warmup = settings.get('app.model_warmup', 'background')
+    started = time.perf_counter()
+    if warmup == 'eager':
+        sentiment_analyzer.warm_up(background=False)
+        gemini_extractor.warm_up(background=False)
+    elif warmup == 'background':
+        sentiment_analyzer.warm_up()
+        gemini_extractor.warm_up()
+    timings['model_load'] = round(time.perf_counter() - started, 3)
+    
+    # Start background workers for async analysis and deferred key points
+    job_queue.start()
+    key_points_backlog.start()
+    
+    timings['total'] = round(time.perf_counter() - startup_started, 3)
+    config.registry.settings['app.startup_timings'] = timings
+    print(f"🚀 Startup finished in {timings['total']}s "
+          f"(imports {timings['imports']}s, db init {timings['db_init']}s, "
+          f"model load {timings['model_load']}s, warmup={warmup})")
     
     return config.make_wsgi_app()
@@ -0,0 +1,227 @@
+"""
+Request admission control
+waitress serves requests from a fixed thread pool, so a burst of slow
+analysis requests can occupy every thread and starve cheap reads and health
+checks. Each limited route gets a concurrency limit and a bounded wait
+queue; requests beyond that are shed immediately with Retry-After instead
+of queueing without bound, and a number of threads stays reserved for the
+routes listed in app.admission.reserved_routes. Streamed responses (the
+export) hold their slot until the body has been sent and closed.
+
+Settings (development.ini):
+
+    app.admission.enabled           true | false
+    app.admission.threads           waitress threads ([server:main] threads)
+    app.admission.reserved_threads  threads only reserved routes may use
+    app.admission.reserved_routes   route names that bypass the limits
+    app.admission.routes            one "route_name limit queue_size max_wait_seconds" per line
+"""
+import math
+import threading
+import time
+from pyramid.settings import asbool, aslist
+from .metrics import registry, STAGE_DURATION
+
+# Weight of the newest request in a route's moving-average service time
+_EWMA_ALPHA = 0.2
+
+ADMISSION_WAIT = registry.histogram(
+    'admission_queue_wait_seconds', 'Time admitted requests spent queued', ('route',))
+
+
+class AdmissionRejected(Exception):
+    """A request was shed; status is 429 (route queue full) or 503 (server busy)"""
+
+    def __init__(self, status, reason, retry_after):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class RouteLimiter:
+    """Concurrency limit plus a bounded wait queue (not strictly FIFO) for one route"""
+
+    def __init__(self, route, limit, queue_size=0, max_wait=10.0):
+        self.route = route
+        self.limit = max(1, limit)
+        self.queue_size = max(0, queue_size)
+        self.max_wait = max(0.0, max_wait)
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = {}
+        self.service_seconds = None
+        self._cond = threading.Condition()
+
+    def _reject(self, status, reason, retry_after):
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        raise AdmissionRejected(status, reason, retry_after)
+
+    def estimated_wait(self, queued=None):
+        """
+        Seconds until a newly queued request would start, from the route's
+        recent service time (or its recorded stage latencies before any
+        request has finished)
+        """
+        service = self.service_seconds
+        if service is None:
+            stages = [values for (endpoint, _), values in STAGE_DURATION.snapshot().items()
+                      if endpoint == self.route and values['count']]
+            service = sum(values['sum'] / values['count'] for values in stages) or 1.0
+        queued = self.waiting if queued is None else queued
+        return service * (queued // self.limit + 1)
+
+    def acquire(self):
+        """
+        Wait for a slot
+
+        Returns:
+            float: Seconds spent queued
+
+        Raises:
+            AdmissionRejected: When the queue is full or the wait exceeds max_wait
+        """
+        with self._cond:
+            if self.active < self.limit:
+                self.active += 1
+                self.admitted += 1
+                return 0.0
+            if self.waiting >= self.queue_size:
+                self._reject(429, 'queue_full', self.estimated_wait())
+            self.waiting += 1
+            started = time.monotonic()
+            deadline = started + self.max_wait
+            try:
+                while self.active >= self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._reject(503, 'queue_timeout', self.estimated_wait())
+                    self._cond.wait(remaining)
+            finally:
+                self.waiting -= 1
+            self.active += 1
+            self.admitted += 1
+            return time.monotonic() - started
+
+    def release(self, service_seconds):
+        """Free the slot and fold the request's service time into the moving average"""
+        with self._cond:
+            self.active -= 1
+            if self.service_seconds is None:
+                self.service_seconds = service_seconds
+            else:
+                self.service_seconds += _EWMA_ALPHA * (service_seconds - self.service_seconds)
+            self._cond.notify()
+
+
+class AdmissionController:
+    """Per-route limiters plus the thread budget shared by all non-reserved routes"""
+
+    def __init__(self):
+        self.enabled = False
+        self.limiters = {}
+        self.reserved_routes = frozenset()
+        self.shared_threads = None
+        self.occupied = 0
+        self.shed_shared = 0
+        self._lock = threading.Lock()
+
+    def configure(self, settings):
+        """Read the app.admission.* settings (see the module docstring)"""
+        self.enabled = asbool(settings.get('app.admission.enabled', False))
+        self.limiters = {}
+        for line in aslist(settings.get('app.admission.routes', ''), flatten=False):
+            parts = line.split()
+            if not parts:
+                continue
+            if len(parts) > 4:
+                raise ValueError(f"Invalid app.admission.routes entry '{line}', "
+                                 "expected: route_name limit [queue_size] [max_wait_seconds]")
+            route = parts[0]
+            limit = int(parts[1]) if len(parts) > 1 else 1
+            queue_size = int(parts[2]) if len(parts) > 2 else 0
+            max_wait = float(parts[3]) if len(parts) > 3 else 10.0
+            self.limiters[route] = RouteLimiter(route, limit, queue_size, max_wait)
+        self.reserved_routes = frozenset(aslist(settings.get('app.admission.reserved_routes', '')))
+        threads = int(settings.get('app.admission.threads', 0))
+        reserved = int(settings.get('app.admission.reserved_threads', 0))
+        self.shared_threads = max(1, threads - reserved) if threads else None
+        if self.enabled:
+            for route, limiter in self.limiters.items():
+                if self.shared_threads and limiter.limit + limiter.queue_size > self.shared_threads:
+                    print(f"⚠️ Warning: Admission limit + queue for {route} exceeds the "
+                          f"{self.shared_threads} non-reserved threads; the excess is shed as 503")
+
+    def _retry_after(self):
+        """Shared budget exhausted: the soonest any limited route is expected to free a slot"""
+        estimates = [limiter.estimated_wait(0) for limiter in self.limiters.values() if limiter.active]
+        return min(estimates) if estimates else 1.0
+
+    def admit(self, route):
+        """
+        Admit a request for route, waiting in its queue if necessary
+
+        Returns:
+            callable: Call with the service time in seconds when the request finishes
+
+        Raises:
+            AdmissionRejected: When the request is shed
+        """
+        if not self.enabled or route in self.reserved_routes:
+            return _noop_release
+        if self.shared_threads is not None:
+            with self._lock:
+                if self.occupied >= self.shared_threads:
+                    self.shed_shared += 1
+                    raise AdmissionRejected(503, 'server_busy', self._retry_after())
+                self.occupied += 1
+
+        limiter = self.limiters.get(route)
+        try:
+            if limiter is not None:
+                ADMISSION_WAIT.observe(limiter.acquire(), route=route)
+        except AdmissionRejected:
+            self._free_thread()
+            raise
+
+        def release(service_seconds):
+            if limiter is not None:
+                limiter.release(service_seconds)
+            self._free_thread()
+
+        return release
+
+    def _free_thread(self):
+        if self.shared_threads is not None:
+            with self._lock:
+                self.occupied -= 1
+
+    def metric_families(self):
+        """Active, queued and shed requests per limited route"""
+        limiters = sorted(self.limiters.items())
+        rejected = [({'route': route, 'reason': reason}, count)
+                    for route, limiter in limiters for reason, count in sorted(limiter.rejected.items())]
+        rejected.append(({'route': '*', 'reason': 'server_busy'}, self.shed_shared))
+        return [
+            ('admission_active_requests', 'gauge', 'Requests holding an admission slot',
+             [({'route': route}, limiter.active) for route, limiter in limiters]),
+            ('admission_queued_requests', 'gauge', 'Requests waiting for an admission slot',
+             [({'route': route}, limiter.waiting) for route, limiter in limiters]),
+            ('admission_rejected_total', 'counter', 'Requests shed by admission control', rejected),
+            ('admission_shared_threads_occupied', 'gauge', 'Threads used by non-reserved routes',
+             [({}, self.occupied)]),
+        ]
+
+
+def _noop_release(service_seconds):
+    pass
+
+
+def retry_after_header(seconds):
+    """Retry-After value in whole seconds (at least 1)"""
+    return str(max(1, int(math.ceil(seconds))))
+
+# Global instance (configured from the settings by the admission tween)
+admission = AdmissionController()
+registry.register_collector(admission.metric_families)
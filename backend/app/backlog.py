@@ -0,0 +1,114 @@
+"""
+Key points backlog
+Reviews stored without key points (key_points_status = 'pending', from degraded
+mode or the defer/sample key-point policies) are picked up by a background
+thread and filled in once Gemini is healthy again
+"""
+import os
+import threading
+from .models import Review
+from .database import SessionFactory
+from .ingest import extract_key_points_many
+from .services.gemini_extractor import gemini_extractor
+from .services.resilience import CircuitBreaker, is_unavailable
+from .metrics import registry
+
+BACKLOG_POLL_SECONDS = float(os.getenv('KEY_POINTS_BACKLOG_POLL_SECONDS', '30'))
+BACKLOG_BATCH_SIZE = int(os.getenv('KEY_POINTS_BACKLOG_BATCH_SIZE', '32'))
+
+
+class KeyPointsBacklog:
+    """Background filler for reviews whose key points are still pending"""
+
+    def __init__(self, poll_seconds=30, batch_size=32):
+        self.poll_seconds = poll_seconds
+        self.batch_size = batch_size
+        self._wake = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.filled = 0
+        self.failed = 0
+
+    def start(self):
+        """Start the backlog thread (idempotent)"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='key-points-backlog', daemon=True)
+                self._thread.start()
+
+    def notify(self):
+        """Wake the backlog thread early, e.g. after queueing new work"""
+        self._wake.set()
+
+    def pending_count(self):
+        db = SessionFactory()
+        try:
+            return db.query(Review).filter(Review.key_points_status == 'pending').count()
+        finally:
+            db.close()
+
+    def metric_families(self):
+        """Backlog throughput for the metrics endpoint"""
+        return [
+            ('key_points_backlog_processed_total', 'counter', 'Deferred key points resolved by the backlog', [
+                ({'result': 'filled'}, self.filled),
+                ({'result': 'failed'}, self.failed)
+            ]),
+        ]
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+            try:
+                # Drain while there is work and Gemini accepts calls
+                while gemini_extractor.caller.breaker.state != CircuitBreaker.OPEN and self._drain_once():
+                    pass
+            except Exception as e:
+                print(f"❌ Error processing key points backlog: {str(e)}")
+
+    def _drain_once(self):
+        """
+        Fill key points for one batch of pending reviews
+
+        Returns:
+            bool: True if every review in a full batch was resolved, i.e. more may be waiting
+        """
+        db = SessionFactory()
+        try:
+            reviews = db.query(Review)\
+                .filter(Review.key_points_status == 'pending')\
+                .filter(Review.status == 'completed')\
+                .order_by(Review.id)\
+                .limit(self.batch_size)\
+                .all()
+            if not reviews:
+                return False
+
+            resolved = 0
+            results = extract_key_points_many(
+                [review.review_text for review in reviews], [review.language for review in reviews])
+            for review, points in zip(reviews, results):
+                if not isinstance(points, Exception):
+                    review.key_points = points
+                    review.key_points_status = 'completed'
+                    review.key_points_model = gemini_extractor.version
+                    self.filled += 1
+                    resolved += 1
+                elif not is_unavailable(points):
+                    review.key_points_status = 'failed'
+                    review.error_message = f'Key points extraction failed: {str(points)}'
+                    self.failed += 1
+                    resolved += 1
+            db.commit()
+            return resolved == len(reviews) == self.batch_size
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+# Global instance
+key_points_backlog = KeyPointsBacklog(poll_seconds=BACKLOG_POLL_SECONDS, batch_size=BACKLOG_BATCH_SIZE)
+registry.register_collector(key_points_backlog.metric_families)
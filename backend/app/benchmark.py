@@ -0,0 +1,336 @@
+"""
+Load-testing harness
+Offline stand-ins for the AI services plus a load generator that drives the
+WSGI app in-process or over HTTP and reports throughput and latency as JSON
+"""
+import json
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+SAMPLE_REVIEWS = [
+    "This product is amazing! Great quality and fast shipping.",
+    "Terrible product. Waste of money. Very disappointed.",
+    "It's okay, does what it says but nothing special.",
+    "Battery life is excellent but the screen scratches easily.",
+    "Produk ini bagus sekali! Kualitas mantap dan pengiriman cepat.",
+    "Barangnya rusak saat sampai, sangat mengecewakan.",
+    "Biasa saja, sesuai harga. Pengemasan cukup rapi.",
+    "Penjual ramah, respon cepat, tapi ukurannya kekecilan.",
+]
+
+_POSITIVE_WORDS = ('amazing', 'great', 'excellent', 'good', 'love', 'bagus', 'mantap', 'cepat', 'ramah', 'puas')
+_NEGATIVE_WORDS = ('terrible', 'waste', 'disappointed', 'bad', 'broken', 'rusak', 'mengecewakan', 'jelek', 'kecewa', 'lambat')
+_PACKED_REVIEW = re.compile(r'^\[(\d+)\] ', re.MULTILINE)
+
+
+class StubSentimentPipeline:
+    """
+    Keyword-based stand-in for the transformers pipeline
+
+    Simulates inference cost as base_ms per forward pass plus per_item_ms
+    per text, so batching effects still show up in benchmark numbers.
+    """
+
+    def __init__(self, base_ms=20.0, per_item_ms=2.0):
+        self.base_ms = base_ms
+        self.per_item_ms = per_item_ms
+
+    def _score(self, text):
+        lowered = text.lower()
+        positive = sum(lowered.count(word) for word in _POSITIVE_WORDS)
+        negative = sum(lowered.count(word) for word in _NEGATIVE_WORDS)
+        if positive > negative:
+            return {'label': 'positive', 'score': min(0.99, 0.6 + 0.1 * (positive - negative))}
+        if negative > positive:
+            return {'label': 'negative', 'score': min(0.99, 0.6 + 0.1 * (negative - positive))}
+        return {'label': 'neutral', 'score': 0.55}
+
+    def __call__(self, texts, **kwargs):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        time.sleep((self.base_ms + self.per_item_ms * len(texts)) / 1000.0)
+        return [self._score(text) for text in texts]
+
+
+class _StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubGeminiModel:
+    """
+    Stand-in for genai.GenerativeModel with configurable latency and errors
+
+    Latency is drawn uniformly from latency_ms +/- jitter_ms per call; a
+    fraction error_rate of calls raise a 503-style error so the retry and
+    circuit-breaker paths are exercised.
+    """
+
+    def __init__(self, latency_ms=800.0, jitter_ms=200.0, error_rate=0.0, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.prompt_chars = 0
+
+    def generate_content(self, prompt):
+        with self._lock:
+            self.calls += 1
+            self.prompt_chars += len(prompt)
+            delay = max(0.0, self._random.uniform(self.latency_ms - self.jitter_ms, self.latency_ms + self.jitter_ms))
+            fail = self._random.random() < self.error_rate
+        time.sleep(delay / 1000.0)
+        if fail:
+            raise RuntimeError('503 Service Unavailable (simulated)')
+
+        packed = _PACKED_REVIEW.findall(prompt)
+        if packed:
+            return _StubResponse(json.dumps({
+                index: [f'Key point {n + 1} of review {index}' for n in range(3)] for index in packed
+            }))
+        return _StubResponse(json.dumps(['Key point 1', 'Key point 2', 'Key point 3']))
+
+
+def install_stubs(sentiment='stub', sentiment_base_ms=20.0, sentiment_per_item_ms=2.0,
+                  gemini_latency_ms=800.0, gemini_jitter_ms=200.0, gemini_error_rate=0.0, seed=None,
+                  routed_base_ms=None, routed_per_item_ms=None):
+    """
+    Swap the AI services for offline stand-ins
+
+    Args:
+        sentiment (str): 'stub' for the keyword pipeline, or 'model' to keep
+            the configured model (SENTIMENT_MODEL, loaded from the local
+            Hugging Face cache when HF_HUB_OFFLINE=1)
+        routed_base_ms (float): Stub cost of the per-language sentiment
+            models (defaults to sentiment_base_ms), to model smaller
+            distilled models
+        routed_per_item_ms (float): Per-text cost of the per-language stubs
+
+    Returns:
+        StubGeminiModel: The installed Gemini stub (exposes a call counter)
+    """
+    from .services.sentiment_analyzer import sentiment_analyzer
+    from .services.gemini_extractor import gemini_extractor
+
+    if sentiment == 'stub':
+        sentiment_analyzer.install_pipeline(
+            StubSentimentPipeline(sentiment_base_ms, sentiment_per_item_ms),
+            model_name='benchmark-stub-sentiment'
+        )
+        for language, route in sentiment_analyzer.routes.items():
+            route.install_pipeline(
+                StubSentimentPipeline(
+                    sentiment_base_ms if routed_base_ms is None else routed_base_ms,
+                    sentiment_per_item_ms if routed_per_item_ms is None else routed_per_item_ms
+                ),
+                model_name=f'benchmark-stub-sentiment-{language}'
+            )
+    gemini = StubGeminiModel(gemini_latency_ms, gemini_jitter_ms, gemini_error_rate, seed)
+    gemini_extractor.install_model(gemini, model_name='benchmark-stub-gemini')
+    return gemini
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+def make_payload(scenario, rng, unique=True, bulk_size=20):
+    """
+    Build (method, path, body) for one request of a scenario
+
+    unique appends a tag of random numbers to review texts so neither the
+    analysis cache nor near-duplicate reuse turns the run into a cache
+    benchmark (the tag outweighs the shared words, keeping the MinHash
+    similarity between payloads well below NEAR_DUPLICATE_THRESHOLD).
+    """
+    def review():
+        text = rng.choice(SAMPLE_REVIEWS)
+        if not unique:
+            return text
+        return f"{text} (ref {' '.join(str(rng.randrange(10 ** 6)) for _ in range(12))})"
+
+    if scenario == 'analyze':
+        return 'POST', '/api/analyze-review', {'review_text': review()}
+    if scenario == 'analyze-async':
+        return 'POST', '/api/analyze-review', {'review_text': review(), 'async': True}
+    if scenario == 'bulk':
+        return 'POST', '/api/analyze-reviews', [review() for _ in range(bulk_size)]
+    if scenario == 'reviews':
+        return 'GET', '/api/reviews?page=1&limit=20', None
+    if scenario == 'health':
+        return 'GET', '/api/health', None
+    raise ValueError(f"Unknown scenario '{scenario}'")
+
+
+def in_process_client(app):
+    """Send requests straight to the WSGI app, no sockets involved"""
+    from webob import Request
+
+    def send(method, path, body):
+        request = Request.blank(path, method=method)
+        if body is not None:
+            request.body = json.dumps(body).encode('utf-8')
+            request.content_type = 'application/json'
+        return request.get_response(app).status_code
+
+    return send
+
+
+def http_client(base_url):
+    """Send requests to a running server"""
+    import requests
+    session_local = threading.local()
+
+    def send(method, path, body):
+        session = getattr(session_local, 'session', None)
+        if session is None:
+            session = session_local.session = requests.Session()
+        return session.request(method, base_url + path, json=body, timeout=120).status_code
+
+    return send
+
+
+_STAGE_SAMPLE = re.compile(
+    r'^review_stage_duration_seconds_(sum|count)\{endpoint="([^"]*)",stage="([^"]*)"\} (\S+)$', re.MULTILINE)
+
+
+def scrape_stage_totals(base_url):
+    """Per-stage count/sum from a remote server's /api/metrics"""
+    import requests
+    totals = {}
+    text = requests.get(base_url + '/api/metrics', timeout=30).text
+    for kind, endpoint, stage, value in _STAGE_SAMPLE.findall(text):
+        totals.setdefault((endpoint, stage), {'count': 0, 'sum': 0.0})[kind] = float(value)
+    return totals
+
+
+def stage_breakdown(totals=None, baseline=None):
+    """
+    Mean and total seconds per (endpoint, stage)
+
+    Args:
+        totals (dict): {(endpoint, stage): {'count', 'sum'}}; defaults to the
+            in-process metrics registry
+        baseline (dict): Totals captured before the run, subtracted from totals
+    """
+    if totals is None:
+        from .metrics import STAGE_DURATION
+        totals = STAGE_DURATION.snapshot()
+    baseline = baseline or {}
+    breakdown = {}
+    for (endpoint, stage), values in sorted(totals.items()):
+        before = baseline.get((endpoint, stage), {'count': 0, 'sum': 0.0})
+        count = int(values['count'] - before['count'])
+        seconds = values['sum'] - before['sum']
+        breakdown[f'{endpoint}.{stage}'] = {
+            'count': count,
+            'mean_ms': round(seconds * 1000.0 / count, 3) if count else None,
+            'total_s': round(seconds, 3)
+        }
+    return breakdown
+
+
+_ROUTED_SAMPLE = re.compile(
+    r'^sentiment_routed_texts_total\{language="([^"]*)",model="([^"]*)"\} (\S+)$', re.MULTILINE)
+
+
+def scrape_routing_totals(base_url):
+    """Texts per (language, model) from a remote server's /api/metrics"""
+    import requests
+    text = requests.get(base_url + '/api/metrics', timeout=30).text
+    return {(language, model): float(value) for language, model, value in _ROUTED_SAMPLE.findall(text)}
+
+
+def routing_breakdown(totals=None, baseline=None):
+    """
+    Texts routed to each sentiment model per detected language
+
+    Args:
+        totals (dict): {(language, model): count}; defaults to the in-process metrics registry
+        baseline (dict): Totals captured before the run, subtracted from totals
+    """
+    if totals is None:
+        from .metrics import SENTIMENT_ROUTED
+        totals = SENTIMENT_ROUTED.snapshot()
+    baseline = baseline or {}
+    breakdown = {}
+    for (language, model), count in sorted(totals.items()):
+        routed = int(count - baseline.get((language, model), 0))
+        if routed:
+            breakdown.setdefault(language, {})[model] = routed
+    return breakdown
+
+
+def run_load(send, scenario, requests_total=200, concurrency=8, warmup=5, seed=None, unique=True, bulk_size=20,
+             remote_url=None):
+    """
+    Drive send() with a fixed number of requests at the given concurrency
+
+    With remote_url the per-stage breakdown is scraped from that server's
+    /api/metrics before and after the run instead of read in-process.
+
+    Returns:
+        dict: Throughput, latency percentiles (ms), status counts, the
+        per-stage breakdown and the sentiment routing per detected language
+        recorded during the run
+    """
+    from .metrics import STAGE_DURATION, STAGE_ERRORS, SENTIMENT_ROUTED
+
+    rng = random.Random(seed)
+    payloads = [make_payload(scenario, rng, unique, bulk_size) for _ in range(requests_total + warmup)]
+    for payload in payloads[:warmup]:
+        send(*payload)
+    STAGE_DURATION.reset()
+    STAGE_ERRORS.reset()
+    SENTIMENT_ROUTED.reset()
+    baseline = scrape_stage_totals(remote_url) if remote_url else None
+    routing_baseline = scrape_routing_totals(remote_url) if remote_url else None
+
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+
+    def one(payload):
+        started = time.perf_counter()
+        try:
+            status = str(send(*payload))
+        except Exception as e:
+            status = type(e).__name__
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, payloads[warmup:]))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    to_ms = lambda value: round(value * 1000.0, 3) if value is not None else None
+    return {
+        'scenario': scenario,
+        'requests': requests_total,
+        'concurrency': concurrency,
+        'wall_seconds': round(wall, 3),
+        'requests_per_second': round(requests_total / wall, 2) if wall else None,
+        'latency_ms': {
+            'mean': to_ms(sum(latencies) / len(latencies)) if latencies else None,
+            'p50': to_ms(_percentile(latencies, 0.50)),
+            'p95': to_ms(_percentile(latencies, 0.95)),
+            'p99': to_ms(_percentile(latencies, 0.99)),
+            'max': to_ms(latencies[-1] if latencies else None)
+        },
+        'status_counts': statuses,
+        'stages': stage_breakdown(scrape_stage_totals(remote_url), baseline) if remote_url else stage_breakdown(),
+        'routing': (routing_breakdown(scrape_routing_totals(remote_url), routing_baseline)
+                    if remote_url else routing_breakdown())
+    }
@@ -0,0 +1,193 @@
+"""
+Content-addressed cache for sentiment and key-point results
+Entries are keyed on a hash of the normalized review text plus the model name,
+with an in-process LRU tier and an optional persistent SQL tier
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from time import monotonic
+from .models import AnalysisCacheEntry
+from .database import SessionFactory
+from .metrics import registry
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_text(text):
+    """Normalize review text so trivially different copies share a cache key"""
+    text = unicodedata.normalize('NFKC', text)
+    return _WHITESPACE.sub(' ', text).strip().casefold()
+
+
+def text_hash(text):
+    """sha256 hex digest of the normalized text"""
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+class AnalysisCache:
+    """
+    Two-tier result cache
+
+    The memory tier is an LRU bounded by max_entries. The persistent tier
+    stores JSON values in the analysis_cache table. Both tiers honour ttl
+    (seconds, 0 disables expiry).
+    """
+
+    def __init__(self, max_entries=10000, ttl=86400, persistent=False):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.persistent = persistent
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _expired(self, stored_at):
+        return self.ttl > 0 and monotonic() - stored_at > self.ttl
+
+    def get(self, text, model):
+        """
+        Look up a cached result
+
+        Args:
+            text (str): Review text
+            model (str): Name of the model that produced the result
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        key = (text_hash(text), model)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                if not self._expired(stored_at):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.evictions += 1
+
+        value = self._get_persistent(key) if self.persistent else None
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.persistent_hits += 1
+        self._remember(key, value)
+        return value
+
+    def set(self, text, model, value):
+        """Store a result in both tiers"""
+        key = (text_hash(text), model)
+        self._remember(key, value)
+        if self.persistent:
+            self._set_persistent(key, value)
+
+    def _remember(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _get_persistent(self, key):
+        db = SessionFactory()
+        try:
+            entry = db.get(AnalysisCacheEntry, key)
+            if entry is None:
+                return None
+            if self.ttl > 0 and entry.created_at < datetime.utcnow() - timedelta(seconds=self.ttl):
+                db.delete(entry)
+                db.commit()
+                return None
+            return json.loads(entry.value)
+        except Exception as e:
+            db.rollback()
+            print(f"⚠️ Warning: Analysis cache lookup failed: {str(e)}")
+            return None
+        finally:
+            db.close()
+
+    def _set_persistent(self, key, value):
+        db = SessionFactory()
+        try:
+            db.merge(AnalysisCacheEntry(
+                text_hash=key[0],
+                model=key[1],
+                value=json.dumps(value, ensure_ascii=False),
+                created_at=datetime.utcnow()
+            ))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"⚠️ Warning: Analysis cache write failed: {str(e)}")
+        finally:
+            db.close()
+
+    def prune(self):
+        """
+        Delete expired rows from the persistent tier
+
+        Returns:
+            int: Number of rows removed
+        """
+        if not self.persistent or self.ttl <= 0:
+            return 0
+        db = SessionFactory()
+        try:
+            cutoff = datetime.utcnow() - timedelta(seconds=self.ttl)
+            removed = db.query(AnalysisCacheEntry)\
+                .filter(AnalysisCacheEntry.created_at < cutoff)\
+                .delete(synchronize_session=False)
+            db.commit()
+            return removed
+        finally:
+            db.close()
+
+    def metric_families(self):
+        """Hit/miss counters for the metrics endpoint"""
+        stats = self.stats()
+        return [
+            ('analysis_cache_requests_total', 'counter', 'Analysis cache lookups by result', [
+                ({'result': 'hit'}, stats['hits']),
+                ({'result': 'persistent_hit'}, stats['persistent_hits']),
+                ({'result': 'miss'}, stats['misses'])
+            ]),
+            ('analysis_cache_evictions_total', 'counter', 'Entries evicted from the memory tier', [({}, stats['evictions'])]),
+            ('analysis_cache_entries', 'gauge', 'Entries in the memory tier', [({}, stats['entries'])]),
+        ]
+
+    def stats(self):
+        """Hit/miss counters and current memory tier size"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'persistent_hits': self.persistent_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries
+            }
+
+
+# Global instance
+analysis_cache = AnalysisCache(
+    max_entries=int(os.getenv('ANALYSIS_CACHE_SIZE', '10000')),
+    ttl=int(os.getenv('ANALYSIS_CACHE_TTL_SECONDS', '86400')),
+    persistent=os.getenv('ANALYSIS_CACHE_PERSISTENT', 'false').lower() in ('1', 'true', 'yes')
+)
+registry.register_collector(analysis_cache.metric_families)
@@ -0,0 +1,56 @@
+"""
+Cached row count for the reviews table
+The full COUNT(*) runs at most once per REVIEW_COUNT_TTL_SECONDS; inserts
+between refreshes are added incrementally
+"""
+import os
+import threading
+from time import monotonic
+from .models import Review
+from .database import SessionFactory
+
+REVIEW_COUNT_TTL = float(os.getenv('REVIEW_COUNT_TTL_SECONDS', '60'))
+
+
+class ReviewCounter:
+    """Approximate total of reviews, refreshed from the database every ttl seconds"""
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self._count = None
+        self._refreshed_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+        Current review count
+
+        Returns:
+            int: Exact at refresh time, plus inserts recorded since
+        """
+        with self._lock:
+            if self._count is not None and monotonic() - self._refreshed_at < self.ttl:
+                return self._count
+        return self.refresh()
+
+    def refresh(self):
+        """Recount the reviews table"""
+        db = SessionFactory()
+        try:
+            count = db.query(Review).count()
+        finally:
+            db.close()
+        with self._lock:
+            self._count = count
+            self._refreshed_at = monotonic()
+        return count
+
+    def add(self, n=1):
+        """Record n inserted (or, when negative, deleted) reviews"""
+        with self._lock:
+            if self._count is not None:
+                self._count = max(0, self._count + n)
+
+
+# Global instance
+review_counter = ReviewCounter(ttl=REVIEW_COUNT_TTL)
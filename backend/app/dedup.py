@@ -0,0 +1,233 @@
+"""
+Near-duplicate review detection
+Every review gets a MinHash signature over its normalized words and word
+pairs; an in-memory LSH index (rebuilt from the database at startup) finds
+earlier reviews whose estimated Jaccard similarity reaches
+NEAR_DUPLICATE_THRESHOLD, so copy-pasted reviews with small edits are
+flagged. A small edit can flip the meaning ("would not recommend"), so the
+earlier analysis is only reused for identical normalized text, or above the
+much stricter NEAR_DUPLICATE_REUSE_THRESHOLD when that is set
+"""
+import hashlib
+import os
+import re
+import struct
+import threading
+from collections import OrderedDict, namedtuple
+from .cache import normalize_text
+from .models import Review
+from .database import SessionFactory
+from .metrics import registry
+from .services.sentiment_analyzer import sentiment_analyzer
+from .services.gemini_extractor import gemini_extractor
+
+DEDUP_MODES = ('off', 'flag', 'reuse')
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+NearDuplicate = namedtuple('NearDuplicate', ['signature', 'review_id', 'similarity'])
+
+
+def _shingles(text):
+    """Normalized words plus adjacent word pairs"""
+    words = _WORD.findall(normalize_text(text))
+    return words, set(words) | {f'{a} {b}' for a, b in zip(words, words[1:])}
+
+
+class MinHasher:
+    """num_perm seeded hash permutations; signatures are packed uint32 bytes"""
+
+    def __init__(self, num_perm=64, seed=1):
+        self.num_perm = num_perm
+        self._struct = struct.Struct(f'>{num_perm}I')
+        params = hashlib.shake_256(f'minhash-{seed}'.encode()).digest(16 * num_perm)
+        self._permutations = [
+            (int.from_bytes(params[i:i + 8], 'big') % (_MERSENNE_PRIME - 1) + 1,
+             int.from_bytes(params[i + 8:i + 16], 'big') % _MERSENNE_PRIME)
+            for i in range(0, 16 * num_perm, 16)
+        ]
+
+    def signature(self, text, min_words=1):
+        """
+        MinHash signature of text
+
+        Returns:
+            bytes: Packed signature, or None for texts shorter than min_words
+        """
+        words, shingles = _shingles(text)
+        if not words or len(words) < min_words:
+            return None
+        hashes = [int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest(), 'big')
+                  for s in shingles]
+        return self._struct.pack(*[
+            min((a * h + b) % _MERSENNE_PRIME for h in hashes) & _MAX_HASH
+            for a, b in self._permutations
+        ])
+
+    def similarity(self, a, b):
+        """Estimated Jaccard similarity of two signatures"""
+        return sum(1 for x, y in zip(self._struct.unpack(a), self._struct.unpack(b)) if x == y) / self.num_perm
+
+
+class NearDuplicateIndex:
+    """
+    MinHash LSH index over the most recent max_entries reviews
+
+    Signatures are split into bands; reviews sharing any band are candidates
+    and are kept when their estimated Jaccard similarity reaches threshold.
+    Memory is bounded by max_entries (the oldest entries are dropped first),
+    roughly num_perm * 4 bytes plus one bucket slot per band per entry.
+    """
+
+    def __init__(self, mode='flag', threshold=0.8, num_perm=64, bands=16, max_entries=50000, min_words=6,
+                 reuse_threshold=None):
+        self.mode = mode if mode in DEDUP_MODES else 'flag'
+        self.threshold = threshold
+        self.reuse_threshold = reuse_threshold
+        self.hasher = MinHasher(num_perm)
+        self.max_entries = max_entries
+        self.min_words = min_words
+        rows = max(1, num_perm // max(1, bands))
+        self._bands = [(start * 4, (start + rows) * 4) for start in range(0, num_perm - rows + 1, rows)]
+        self._entries = OrderedDict()
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.matches = 0
+        self.reused = 0
+
+    @property
+    def enabled(self):
+        return self.mode != 'off' and self.max_entries > 0
+
+    def _keys(self, signature):
+        return [hash((band, signature[start:end])) for band, (start, end) in enumerate(self._bands)]
+
+    def add(self, review_id, signature):
+        """Index a stored review's signature"""
+        if not self.enabled or signature is None:
+            return
+        with self._lock:
+            if review_id in self._entries:
+                return
+            self._entries[review_id] = signature
+            for key in self._keys(signature):
+                self._buckets.setdefault(key, set()).add(review_id)
+            while len(self._entries) > self.max_entries:
+                old_id, old_signature = self._entries.popitem(last=False)
+                for key in self._keys(old_signature):
+                    bucket = self._buckets.get(key)
+                    if bucket is not None:
+                        bucket.discard(old_id)
+                        if not bucket:
+                            del self._buckets[key]
+
+    def check(self, text):
+        """
+        Signature for text and the most similar indexed review at or above threshold
+
+        Returns:
+            NearDuplicate: review_id and similarity are None when nothing matches
+        """
+        if not self.enabled:
+            return NearDuplicate(None, None, None)
+        signature = self.hasher.signature(text, self.min_words)
+        if signature is None:
+            return NearDuplicate(None, None, None)
+        best = None
+        with self._lock:
+            candidates = set()
+            for key in self._keys(signature):
+                candidates.update(self._buckets.get(key, ()))
+            for review_id in candidates:
+                similarity = self.hasher.similarity(signature, self._entries[review_id])
+                if similarity >= self.threshold and (best is None or (similarity, review_id) > (best[1], best[0])):
+                    best = (review_id, similarity)
+            if best is not None:
+                self.matches += 1
+        if best is None:
+            return NearDuplicate(signature, None, None)
+        return NearDuplicate(signature, best[0], round(best[1], 4))
+
+    def reusable_analysis(self, duplicate, text):
+        """
+        The earlier review's analysis, when mode is 'reuse', it is complete
+        and current, and its text is the same as text after normalization (or
+        the similarity reaches reuse_threshold)
+
+        Returns:
+            tuple: (sentiment_result, key_points), or None
+        """
+        if self.mode != 'reuse' or duplicate.review_id is None:
+            return None
+        db = SessionFactory()
+        try:
+            review = db.get(Review, duplicate.review_id)
+            if review is None or review.status != 'completed' or review.key_points_status != 'completed':
+                return None
+            if normalize_text(review.review_text) != normalize_text(text) and (
+                    self.reuse_threshold is None or duplicate.similarity < self.reuse_threshold):
+                return None
+            # Don't copy results produced by an older model or prompt
+            if (review.sentiment_model != sentiment_analyzer.for_language(review.language).cache_key
+                    or review.key_points_model != gemini_extractor.version):
+                return None
+            with self._lock:
+                self.reused += 1
+            return {'sentiment': review.sentiment, 'confidence': review.confidence_score}, review.key_points
+        finally:
+            db.close()
+
+    def rebuild(self, batch_size=10000):
+        """
+        Reload the index from the newest max_entries reviews with a signature
+
+        Signatures made with a different NEAR_DUPLICATE_NUM_PERM are skipped.
+
+        Returns:
+            int: Entries indexed
+        """
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+        if not self.enabled:
+            return 0
+        size = self.hasher.num_perm * 4
+        db = SessionFactory()
+        try:
+            rows = db.query(Review.id, Review.minhash)\
+                .filter(Review.minhash.isnot(None))\
+                .order_by(Review.id.desc())\
+                .limit(self.max_entries)\
+                .yield_per(batch_size)
+            newest_first = [(review_id, bytes(signature)) for review_id, signature in rows if len(signature) == size]
+        finally:
+            db.close()
+        for review_id, signature in reversed(newest_first):
+            self.add(review_id, signature)
+        return len(self._entries)
+
+    def metric_families(self):
+        """Index size and match counters for the metrics endpoint"""
+        with self._lock:
+            entries = len(self._entries)
+            matches, reused = self.matches, self.reused
+        return [
+            ('near_duplicate_index_entries', 'gauge', 'Signatures in the near-duplicate index', [({}, entries)]),
+            ('near_duplicate_matches_total', 'counter', 'Reviews matching an earlier near-duplicate', [({}, matches)]),
+            ('near_duplicate_reused_total', 'counter', 'Analyses reused from a near-duplicate', [({}, reused)]),
+        ]
+
+
+# Global instance (filled from the database at startup)
+near_duplicates = NearDuplicateIndex(
+    mode=os.getenv('NEAR_DUPLICATE_MODE', 'flag'),
+    threshold=float(os.getenv('NEAR_DUPLICATE_THRESHOLD', '0.8')),
+    reuse_threshold=float(os.getenv('NEAR_DUPLICATE_REUSE_THRESHOLD') or 0) or None,
+    num_perm=int(os.getenv('NEAR_DUPLICATE_NUM_PERM', '64')),
+    bands=int(os.getenv('NEAR_DUPLICATE_BANDS', '16')),
+    max_entries=int(os.getenv('NEAR_DUPLICATE_INDEX_SIZE', '50000')),
+    min_words=int(os.getenv('NEAR_DUPLICATE_MIN_WORDS', '6'))
+)
+registry.register_collector(near_duplicates.metric_families)
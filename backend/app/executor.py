@@ -0,0 +1,87 @@
+"""
+Shared bounded executors for analysis stages
+Sentiment inference (local CPU) and key-point extraction (network) run on
+stage_executor so a request waits for the slower stage instead of the sum
+of both. Packed Gemini requests from bulk ingestion, the backlog and
+reprocessing run on the separate, smaller bulk_executor so a large chunk
+can't fill stage_executor and starve single-review requests.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+STAGE_WORKERS = int(os.getenv('STAGE_EXECUTOR_WORKERS', '8'))
+BULK_WORKERS = int(os.getenv('BULK_EXECUTOR_WORKERS', '4'))
+
+# Per-stage timeouts in seconds
+SENTIMENT_TIMEOUT = float(os.getenv('SENTIMENT_TIMEOUT_SECONDS', '30'))
+KEY_POINTS_TIMEOUT = float(os.getenv('GEMINI_TIMEOUT_SECONDS', '60'))
+
+stage_executor = ThreadPoolExecutor(
+    max_workers=STAGE_WORKERS,
+    thread_name_prefix='analysis-stage'
+)
+
+bulk_executor = ThreadPoolExecutor(
+    max_workers=BULK_WORKERS,
+    thread_name_prefix='bulk-key-points'
+)
+
+
+class StageTimeoutError(Exception):
+    """Raised when a stage doesn't finish within its timeout"""
+
+    def __init__(self, stage, timeout):
+        self.stage = stage
+        self.timeout = timeout
+        super().__init__(f'{stage} timed out after {timeout:g}s')
+
+
+class StageError(Exception):
+    """A stage failure, tagged with the stage name and the results of the stages before it"""
+
+    def __init__(self, stage, error, completed=None):
+        self.stage = stage
+        self.error = error
+        self.completed = completed or []
+        super().__init__(str(error))
+
+
+def run_stages(stages):
+    """
+    Run independent stages concurrently on the shared executor
+
+    Stages are awaited in the given order. Every timeout counts from the
+    moment the stages are submitted, so the request waits at most the
+    largest timeout rather than their sum. When one fails or times out, the
+    error is raised so callers report the same first failure as a
+    sequential run would. Stages that haven't started yet are cancelled;
+    a stage that is already running can't be interrupted and finishes in
+    the background, its result discarded.
+
+    Args:
+        stages (list): (name, callable, timeout) tuples
+
+    Returns:
+        list: Each stage's result, in order
+
+    Raises:
+        StageError: Wrapping the failing stage's name and exception, plus
+        the results of the stages awaited before it
+    """
+    started = time.monotonic()
+    futures = [(name, stage_executor.submit(func), timeout) for name, func, timeout in stages]
+    results = []
+    try:
+        for name, future, timeout in futures:
+            try:
+                results.append(future.result(timeout=max(0.0, started + timeout - time.monotonic())))
+            except FutureTimeoutError:
+                raise StageError(name, StageTimeoutError(name, timeout), results)
+            except Exception as e:
+                raise StageError(name, e, results)
+    except StageError:
+        for _, future, _ in futures:
+            future.cancel()
+        raise
+    return results
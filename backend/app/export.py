@@ -0,0 +1,89 @@
+"""
+Streaming export of analyzed reviews
+Rows are read through a server-side cursor (yield_per) and encoded one at a
+time, so memory use doesn't grow with the size of the table
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from .models import Review
+from .database import SessionFactory
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson'
+}
+
+EXPORT_COLUMNS = ('id', 'review_text', 'sentiment', 'confidence_score', 'key_points', 'status', 'created_at')
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+
+
+def parse_date(value):
+    """Parse an ISO date or datetime query parameter (None if empty)"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid date '{value}', expected ISO format e.g. 2025-12-06 or 2025-12-06T16:30:00")
+
+
+def _rows(sentiments=None, date_from=None, date_to=None):
+    """Yield export rows as dicts, streaming from the database"""
+    db = SessionFactory()
+    try:
+        query = db.query(*[getattr(Review, column) for column in EXPORT_COLUMNS])
+        if sentiments:
+            query = query.filter(Review.sentiment.in_(sentiments))
+        if date_from is not None:
+            query = query.filter(Review.created_at >= date_from)
+        if date_to is not None:
+            query = query.filter(Review.created_at < date_to)
+
+        for row in query.order_by(Review.id).yield_per(EXPORT_BATCH_SIZE):
+            item = dict(zip(EXPORT_COLUMNS, row))
+            if item['created_at'] is not None:
+                item['created_at'] = item['created_at'].isoformat()
+            yield item
+    finally:
+        db.close()
+
+
+def _csv_lines(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        if row['key_points'] is not None:
+            row['key_points'] = json.dumps(row['key_points'], ensure_ascii=False)
+        writer.writerow([row[column] for column in EXPORT_COLUMNS])
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    # Header-only exports still need the header line
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _ndjson_lines(rows):
+    for row in rows:
+        yield (json.dumps(row, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def export_stream(export_format, sentiments=None, date_from=None, date_to=None):
+    """
+    Iterator of encoded export chunks
+
+    Args:
+        export_format (str): 'csv' or 'ndjson'
+        sentiments (list[str]): Only include these sentiments
+        date_from (datetime): Inclusive lower bound on created_at
+        date_to (datetime): Exclusive upper bound on created_at
+    """
+    rows = _rows(sentiments, date_from, date_to)
+    if export_format == 'csv':
+        return _csv_lines(rows)
+    return _ndjson_lines(rows)
@@ -0,0 +1,53 @@
+"""
+Conditional GET support for the review read endpoints
+Validators come from max(id) and max(updated_at) over the reviews table
+(both indexed), so a poll that finds nothing changed is answered with 304
+before the page query runs
+"""
+import hashlib
+from datetime import timezone
+from pyramid.httpexceptions import HTTPNotModified
+from sqlalchemy import func
+from .models import Review
+
+
+class Validators:
+    """Weak ETag and Last-Modified for one request against the current reviews table"""
+
+    def __init__(self, etag, last_modified):
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @classmethod
+    def load(cls, request, db):
+        """
+        Compute validators for request from the session it will be served from
+
+        The ETag also covers the path and query string, so every page and
+        filter combination gets its own tag.
+        """
+        max_id, max_updated = db.query(func.max(Review.id), func.max(Review.updated_at)).one()
+        last_modified = max_updated.replace(microsecond=0) if max_updated is not None else None
+        stamp = f"{max_id or 0}:{max_updated.isoformat() if max_updated else ''}:{request.path_qs}"
+        return cls(hashlib.sha1(stamp.encode('utf-8')).hexdigest()[:20], last_modified)
+
+    def matches(self, request):
+        """True when the client's cached copy is still current (If-None-Match wins over If-Modified-Since)"""
+        if request.if_none_match:
+            return self.etag in request.if_none_match
+        since = request.if_modified_since
+        if since is None or self.last_modified is None:
+            return False
+        return self.last_modified.replace(tzinfo=timezone.utc) <= since
+
+    def apply(self, response):
+        """Set the validators on a 200 (or 304) response"""
+        response.etag = (self.etag, False)
+        if self.last_modified is not None:
+            response.last_modified = self.last_modified
+        # Clients may keep the body but must revalidate before reusing it
+        response.cache_control = 'no-cache'
+        return response
+
+    def not_modified(self):
+        return self.apply(HTTPNotModified())
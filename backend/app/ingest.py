@@ -0,0 +1,304 @@
+"""
+Bulk review ingestion
+Runs sentiment in batched forward passes, extracts key points concurrently
+(several reviews per Gemini request) and persists each chunk with a single
+bulk insert
+"""
+import json
+import os
+from .models import Review
+from .database import get_db_session
+from .services.sentiment_analyzer import sentiment_analyzer
+from .services.gemini_extractor import gemini_extractor
+from .services.language import language_detector
+from .cache import analysis_cache
+from .executor import stage_executor, bulk_executor
+from .counters import review_counter
+from .stats import record_reviews
+from .dedup import near_duplicates
+from .metrics import SENTIMENT_ROUTED
+from .policy import key_points_policy
+
+# Maximum reviews accepted by one bulk request
+MAX_BULK_REVIEWS = int(os.getenv('BULK_MAX_REVIEWS', '1000'))
+
+# Reviews analyzed and inserted together
+BULK_CHUNK_SIZE = int(os.getenv('BULK_CHUNK_SIZE', '100'))
+
+
+def sentiment_route(language):
+    """Sentiment analyzer for a detected language, counted per language and model"""
+    analyzer = sentiment_analyzer.for_language(language)
+    SENTIMENT_ROUTED.inc(language=language or 'unknown', model=analyzer.model_name)
+    return analyzer
+
+
+def _analyze_group(analyzer, texts):
+    """
+    Score texts routed to one analyzer in batched passes, falling back to
+    per-text calls if the batch fails
+    Cached results are reused and only the misses are sent to the model
+    """
+    model = analyzer.cache_key
+    results = [analysis_cache.get(text, model) for text in texts]
+    missing = [pos for pos, result in enumerate(results) if result is None]
+    if not missing:
+        return results
+
+    try:
+        scored = analyzer.analyze_batch([texts[pos] for pos in missing])
+    except Exception:
+        scored = []
+        for pos in missing:
+            try:
+                scored.append(analyzer.analyze(texts[pos]))
+            except Exception as e:
+                scored.append(e)
+
+    for pos, result in zip(missing, scored):
+        results[pos] = result
+        if not isinstance(result, Exception):
+            analysis_cache.set(texts[pos], model, result)
+    return results
+
+
+def analyze_sentiments(texts, languages=None):
+    """
+    Score a chunk, each text with the analyzer for its detected language
+
+    Shared by bulk ingestion, the background job workers and reprocessing.
+
+    Returns:
+        list: One result dict or Exception per text
+    """
+    languages = languages or [None] * len(texts)
+    groups = {}
+    for pos, language in enumerate(languages):
+        analyzer = sentiment_route(language)
+        groups.setdefault(analyzer.cache_key, (analyzer, []))[1].append(pos)
+
+    results = [None] * len(texts)
+    for analyzer, positions in groups.values():
+        for pos, result in zip(positions, _analyze_group(analyzer, [texts[pos] for pos in positions])):
+            results[pos] = result
+    return results
+
+
+def analyze_sentiment_cached(text, language=None):
+    """Sentiment for one text from the analyzer for its language, served from the analysis cache when possible"""
+    analyzer = sentiment_route(language)
+    model = analyzer.cache_key
+    result = analysis_cache.get(text, model)
+    if result is None:
+        result = analyzer.analyze(text)
+        analysis_cache.set(text, model, result)
+    return result
+
+
+def sentiment_input(result):
+    """How much of the review the sentiment model saw, for API responses"""
+    return {
+        'truncated': result.get('truncated', False),
+        'chunks': result.get('chunks', 1)
+    }
+
+
+def _cached_key_points(text, model):
+    key_points = analysis_cache.get(text, model)
+    if isinstance(key_points, str):
+        # Persistent entries written before key points were stored as arrays
+        key_points = json.loads(key_points)
+    return key_points
+
+
+def extract_key_points_cached(text, language=None):
+    """Key points for one text, served from the analysis cache when possible"""
+    model = gemini_extractor.version
+    key_points = _cached_key_points(text, model)
+    if key_points is None:
+        key_points = gemini_extractor.extract_key_points(text, language)
+        analysis_cache.set(text, model, key_points)
+    return key_points
+
+
+def key_points_after_sentiment(text, sentiment_result, policy):
+    """
+    Key points for a review analyzed without synchronous extraction: cached
+    key points are used as is, otherwise the policy decides between the
+    backlog and skipping
+
+    Returns:
+        tuple: (key_points or None, key_points_status)
+    """
+    key_points = _cached_key_points(text, gemini_extractor.version)
+    if key_points is not None:
+        return key_points, 'completed'
+    return None, key_points_policy.status_after_sentiment(policy, text, sentiment_result)
+
+
+def extract_key_points_many(texts, languages=None):
+    """
+    Extract key points for a chunk: cached results are reused and the misses
+    are grouped by detected language and packed several per Gemini request,
+    with packs run concurrently on the bulk executor (at most
+    BULK_EXECUTOR_WORKERS in flight)
+
+    Returns:
+        list: One list of key points or Exception per text
+    """
+    model = gemini_extractor.version
+    languages = languages or [None] * len(texts)
+    results = [_cached_key_points(text, model) for text in texts]
+    missing = {}
+    for pos, result in enumerate(results):
+        if result is None:
+            missing.setdefault(languages[pos], []).append(pos)
+
+    futures = []
+    for language, group in missing.items():
+        for pack in gemini_extractor.pack([texts[pos] for pos in group]):
+            positions = [group[i] for i in pack]
+            future = bulk_executor.submit(
+                gemini_extractor.extract_key_points_batch, [texts[pos] for pos in positions], language)
+            futures.append((positions, future))
+
+    for positions, future in futures:
+        try:
+            extracted = future.result()
+        except Exception as e:
+            extracted = [e] * len(positions)
+        for pos, points in zip(positions, extracted):
+            results[pos] = points
+            if not isinstance(points, Exception):
+                analysis_cache.set(texts[pos], model, points)
+    return results
+
+
+def analyze_texts(texts, languages=None):
+    """
+    Sentiment and key points for many texts, running both stages concurrently
+
+    Used by bulk ingestion and the background job workers.
+
+    Args:
+        texts (list[str]): Review texts
+        languages (list): Detected language code (or None) per text
+
+    Returns:
+        tuple: (sentiments, key_points), each with a result or Exception per text
+    """
+    sentiment_future = stage_executor.submit(analyze_sentiments, texts, languages)
+    key_points = extract_key_points_many(texts, languages)
+    return sentiment_future.result(), key_points
+
+
+def _ingest_chunk(items, policy='sync'):
+    """
+    Analyze and store one chunk of (index, review_text) pairs
+
+    Returns:
+        list[dict]: Per-item results in the same order as items
+    """
+    languages = language_detector.detect_many([text for _, text in items])
+
+    # Near-duplicates of earlier analyzed reviews reuse their analysis
+    duplicates = [near_duplicates.check(text) for _, text in items]
+    reused = [near_duplicates.reusable_analysis(duplicate, text) for duplicate, (_, text) in zip(duplicates, items)]
+    to_analyze = [pos for pos, analysis in enumerate(reused) if analysis is None]
+    sentiments = [analysis[0] if analysis else None for analysis in reused]
+    key_points = [analysis[1] if analysis else None for analysis in reused]
+    statuses = ['completed'] * len(items)
+    if to_analyze:
+        texts = [items[pos][1] for pos in to_analyze]
+        if policy == 'sync':
+            analyzed_sentiments, analyzed_key_points = analyze_texts(texts, [languages[pos] for pos in to_analyze])
+        else:
+            analyzed_sentiments = analyze_sentiments(texts, [languages[pos] for pos in to_analyze])
+            analyzed_key_points = [None] * len(texts)
+        for pos, sentiment, points in zip(to_analyze, analyzed_sentiments, analyzed_key_points):
+            sentiments[pos] = sentiment
+            key_points[pos] = points
+            if policy != 'sync' and not isinstance(sentiment, Exception):
+                key_points[pos], statuses[pos] = key_points_after_sentiment(items[pos][1], sentiment, policy)
+
+    results = [None] * len(items)
+    reviews = []
+    for pos, ((index, text), sentiment, points) in enumerate(zip(items, sentiments, key_points)):
+        if isinstance(sentiment, Exception):
+            results[pos] = _item_error(index, f'Sentiment analysis failed: {str(sentiment)}')
+        elif isinstance(points, Exception) and not gemini_extractor.should_defer(points):
+            results[pos] = _item_error(index, f'Key points extraction failed: {str(points)}')
+        else:
+            status = 'pending' if isinstance(points, Exception) else statuses[pos]
+            completed = status == 'completed'
+            reviews.append((pos, index, sentiment, Review(
+                review_text=text,
+                sentiment=sentiment['sentiment'],
+                confidence_score=sentiment['confidence'],
+                key_points=points if completed else None,
+                key_points_status=status,
+                key_points_policy=policy,
+                language=languages[pos],
+                sentiment_model=sentiment_analyzer.for_language(languages[pos]).cache_key,
+                key_points_model=gemini_extractor.version if completed else None,
+                minhash=duplicates[pos].signature,
+                duplicate_of=duplicates[pos].review_id
+            )))
+
+    if reviews:
+        db = get_db_session()
+        try:
+            db.add_all([review for _, _, _, review in reviews])
+            record_reviews(db, [review for _, _, _, review in reviews])
+            db.commit()
+            review_counter.add(len(reviews))
+            for pos, index, sentiment, review in reviews:
+                near_duplicates.add(review.id, duplicates[pos].signature)
+                data = review.to_dict()
+                data['sentiment_input'] = sentiment_input(sentiment)
+                data['analysis_reused'] = reused[pos] is not None
+                results[pos] = {'index': index, 'status': 'success', 'data': data}
+        except Exception as e:
+            db.rollback()
+            for pos, index, _, _ in reviews:
+                results[pos] = _item_error(index, f'Database error: {str(e)}')
+        finally:
+            db.close()
+
+    return results
+
+
+def _item_error(index, message):
+    return {'index': index, 'status': 'error', 'error': message}
+
+
+def ingest_reviews(review_texts, policy='sync'):
+    """
+    Analyze and store many reviews
+
+    Args:
+        review_texts (list): Raw review texts; invalid entries (missing, not a
+            string, or a ValueError from parsing) are reported per item
+        policy (str): Key-point policy, one of policy.KEY_POINTS_POLICIES
+
+    Returns:
+        list[dict]: One result per input, each with 'index', 'status' and
+        either 'data' (the stored review) or 'error'
+    """
+    results = []
+    valid = []
+    for index, text in enumerate(review_texts):
+        if isinstance(text, ValueError):
+            results.append(_item_error(index, str(text)))
+        elif text is not None and not isinstance(text, str):
+            results.append(_item_error(index, f'review_text must be a string, got {type(text).__name__}'))
+        elif not text or not text.strip():
+            results.append(_item_error(index, 'review_text is required and cannot be empty'))
+        else:
+            valid.append((index, text.strip()))
+
+    for start in range(0, len(valid), BULK_CHUNK_SIZE):
+        results.extend(_ingest_chunk(valid[start:start + BULK_CHUNK_SIZE], policy))
+
+    results.sort(key=lambda item: item['index'])
+    return results
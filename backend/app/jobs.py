@@ -0,0 +1,272 @@
+"""
+Background analysis jobs
+Reviews accepted in async mode are stored as 'pending' and analyzed by an
+in-process worker pool that fills in sentiment, confidence and key points
+"""
+import os
+import queue
+import threading
+from .models import Review
+from .database import SessionFactory
+from .ingest import (analyze_texts, analyze_sentiments, analyze_sentiment_cached, extract_key_points_cached,
+                     key_points_after_sentiment)
+from .stats import record_reviews
+from .metrics import registry
+from .executor import run_stages, StageError, SENTIMENT_TIMEOUT, KEY_POINTS_TIMEOUT
+from .services.sentiment_analyzer import sentiment_analyzer
+from .services.gemini_extractor import gemini_extractor
+from .backlog import key_points_backlog
+
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+JOB_QUEUE_MAX = int(os.getenv('JOB_QUEUE_MAX', '1000'))
+
+# Queued reviews a worker picks up and analyzes together
+JOB_BATCH_SIZE = int(os.getenv('JOB_BATCH_SIZE', '8'))
+
+# Longest a client may block on GET /api/reviews/{id}?wait=N
+MAX_WAIT_SECONDS = float(os.getenv('JOB_MAX_WAIT_SECONDS', '30'))
+
+FINISHED_STATUSES = ('completed', 'failed')
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at capacity"""
+
+
+class JobQueue:
+    """
+    Bounded queue of review IDs plus the worker threads that process them
+
+    Callers waiting for a review to finish register a threading.Event that
+    the worker sets when it writes the final status.
+    """
+
+    def __init__(self, workers=2, max_size=1000, batch_size=8):
+        self.workers = workers
+        self.max_size = max_size
+        self.batch_size = max(1, batch_size)
+        self._queue = queue.Queue(maxsize=max_size)
+        self._threads = []
+        self._waiters = {}
+        self._lock = threading.Lock()
+
+    @property
+    def depth(self):
+        """Number of reviews waiting for a worker"""
+        return self._queue.qsize()
+
+    def has_capacity(self):
+        return not self._queue.full()
+
+    def start(self):
+        """Start the worker threads and re-enqueue reviews left pending by a previous run"""
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f'review-job-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        self._recover_pending()
+
+    def submit(self, review_id):
+        """
+        Enqueue a stored review for background analysis
+
+        Raises:
+            QueueFullError: If the queue is at capacity
+        """
+        try:
+            self._queue.put_nowait(review_id)
+        except queue.Full:
+            raise QueueFullError(f'Job queue is full ({self.max_size} pending reviews)')
+
+    def wait(self, review_id, timeout, is_finished):
+        """
+        Block until the worker finishes review_id or timeout elapses
+
+        The waiter is registered before is_finished() is checked, so a
+        completion that lands in between is never missed.
+
+        Args:
+            review_id (int): Review to wait for
+            timeout (float): Seconds to wait, capped at JOB_MAX_WAIT_SECONDS
+            is_finished (callable): Returns True if the review is already done
+
+        Returns:
+            bool: True if the review finished
+        """
+        with self._lock:
+            event = self._waiters.setdefault(review_id, threading.Event())
+        try:
+            if is_finished():
+                return True
+            return event.wait(min(timeout, MAX_WAIT_SECONDS))
+        finally:
+            with self._lock:
+                if self._waiters.get(review_id) is event and not event.is_set():
+                    self._waiters.pop(review_id, None)
+
+    def _notify(self, review_id):
+        with self._lock:
+            event = self._waiters.pop(review_id, None)
+        if event is not None:
+            event.set()
+
+    def metric_families(self):
+        """Queue depth and capacity for the metrics endpoint"""
+        return [
+            ('job_queue_depth', 'gauge', 'Reviews waiting for a background worker', [({}, self.depth)]),
+            ('job_queue_capacity', 'gauge', 'Maximum queued reviews before 503', [({}, self.max_size)]),
+            ('job_workers', 'gauge', 'Background analysis worker threads', [({}, self.workers)]),
+        ]
+
+    def _recover_pending(self):
+        db = SessionFactory()
+        try:
+            pending = db.query(Review.id)\
+                .filter(Review.status.in_(('pending', 'processing')))\
+                .order_by(Review.id)\
+                .limit(self.max_size)\
+                .all()
+        finally:
+            db.close()
+
+        for (review_id,) in pending:
+            try:
+                self.submit(review_id)
+            except QueueFullError:
+                break
+        if pending:
+            print(f"🔁 Re-queued {len(pending)} pending review(s) for background analysis")
+
+    def _next_batch(self):
+        """Block for one review ID, then take whatever else is already queued, up to batch_size"""
+        batch = [self._queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _work(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._process(batch)
+            except Exception as e:
+                print(f"❌ Error processing reviews {batch}: {str(e)}")
+            finally:
+                for review_id in batch:
+                    self._notify(review_id)
+                    self._queue.task_done()
+
+    def _analyze(self, texts, languages):
+        """
+        Analyze a batch of texts
+
+        A single review goes through run_stages so the per-stage timeouts
+        apply; larger batches use batched sentiment and packed Gemini requests.
+        In degraded mode a review whose key points fail because Gemini is
+        unavailable keeps its sentiment and is left for the key points backlog.
+
+        Returns:
+            list: (sentiment_result, key_points, key_points_status) per text, or the error message string
+        """
+        if len(texts) == 1:
+            text, language = texts[0], languages[0]
+            try:
+                return [tuple(run_stages([
+                    ('sentiment', lambda: analyze_sentiment_cached(text, language), SENTIMENT_TIMEOUT),
+                    ('key_points', lambda: extract_key_points_cached(text, language), KEY_POINTS_TIMEOUT)
+                ])) + ('completed',)]
+            except StageError as e:
+                if e.stage == 'key_points' and gemini_extractor.should_defer(e.error):
+                    return [(e.completed[0], None, 'pending')]
+                label = 'Sentiment analysis' if e.stage == 'sentiment' else 'Key points extraction'
+                return [f'{label} failed: {str(e.error)}']
+
+        results = []
+        for sentiment, points in zip(*analyze_texts(texts, languages)):
+            if isinstance(sentiment, Exception):
+                results.append(f'Sentiment analysis failed: {str(sentiment)}')
+            elif isinstance(points, Exception) and gemini_extractor.should_defer(points):
+                results.append((sentiment, None, 'pending'))
+            elif isinstance(points, Exception):
+                results.append(f'Key points extraction failed: {str(points)}')
+            else:
+                results.append((sentiment, points, 'completed'))
+        return results
+
+    def _analyze_sentiment_only(self, reviews):
+        """
+        Sentiment for reviews whose key-point policy isn't sync; the policy
+        then decides between the key points backlog and skipping
+
+        Returns:
+            list: (sentiment_result, key_points, key_points_status) per review, or the error message string
+        """
+        results = []
+        sentiments = analyze_sentiments([review.review_text for review in reviews], [review.language for review in reviews])
+        for review, sentiment in zip(reviews, sentiments):
+            if isinstance(sentiment, Exception):
+                results.append(f'Sentiment analysis failed: {str(sentiment)}')
+            else:
+                results.append((sentiment,) + key_points_after_sentiment(review.review_text, sentiment, review.key_points_policy))
+        return results
+
+    def _process(self, review_ids):
+        db = SessionFactory()
+        try:
+            reviews = db.query(Review)\
+                .filter(Review.id.in_(review_ids))\
+                .filter(Review.status.notin_(FINISHED_STATUSES))\
+                .all()
+            if not reviews:
+                return
+            for review in reviews:
+                review.status = 'processing'
+            db.commit()
+
+            sync = [review for review in reviews if review.key_points_policy in (None, 'sync')]
+            sentiment_only = [review for review in reviews if review.key_points_policy not in (None, 'sync')]
+            results = []
+            if sync:
+                results = self._analyze([review.review_text for review in sync], [review.language for review in sync])
+            if sentiment_only:
+                results.extend(self._analyze_sentiment_only(sentiment_only))
+
+            completed = []
+            for review, result in zip(sync + sentiment_only, results):
+                if isinstance(result, str):
+                    review.status = 'failed'
+                    review.key_points_status = 'failed'
+                    review.error_message = result
+                    continue
+                sentiment_result, key_points, key_points_status = result
+                review.sentiment = sentiment_result['sentiment']
+                review.confidence_score = sentiment_result['confidence']
+                review.key_points = key_points
+                review.key_points_status = key_points_status
+                review.sentiment_model = sentiment_analyzer.for_language(review.language).cache_key
+                review.key_points_model = gemini_extractor.version if key_points_status == 'completed' else None
+                review.status = 'completed'
+                review.error_message = None
+                completed.append(review)
+
+            if completed:
+                record_reviews(db, completed)
+            db.commit()
+            if any(review.key_points_status == 'pending' for review in completed):
+                key_points_backlog.notify()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+# Global instance
+job_queue = JobQueue(workers=JOB_WORKERS, max_size=JOB_QUEUE_MAX, batch_size=JOB_BATCH_SIZE)
+registry.register_collector(job_queue.metric_families)
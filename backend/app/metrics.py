@@ -0,0 +1,256 @@
+"""
+Lightweight Prometheus-style metrics
+Counters, gauges and histograms with labels, rendered in the Prometheus text
+exposition format by GET /api/metrics. Observing a value is a dict lookup and
+a few additions under a lock, so timers are cheap enough for the hot path.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Seconds; covers cache hits (sub-millisecond) up to slow Gemini calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    metric_type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def reset(self):
+        """Drop all recorded values"""
+        with self._lock:
+            self._values.clear()
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.metric_type}']
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in sorted(items):
+            lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key, value):
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}']
+
+
+class Counter(_Metric):
+    metric_type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def snapshot(self):
+        """
+        Value per label set
+
+        Returns:
+            dict: {label_values_tuple: value}
+        """
+        with self._lock:
+            return dict(self._values)
+
+
+class Gauge(_Metric):
+    metric_type = 'gauge'
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    metric_type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def snapshot(self):
+        """
+        Observation count and sum per label set
+
+        Returns:
+            dict: {label_values_tuple: {'count': int, 'sum': float}}
+        """
+        with self._lock:
+            return {key: {'count': state[2], 'sum': state[1]} for key, state in self._values.items()}
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the with-block in seconds"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _render_value(self, key, value):
+        bucket_counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), bucket_counts):
+            cumulative += bucket_count
+            labels = _format_labels(self.labelnames, key, ('le', _format_value(float(bound))))
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+        lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Holds metrics plus collector callbacks
+
+    Collectors are called at scrape time and return
+    (name, type, documentation, [(labels_dict, value), ...]) tuples, for
+    values that already live elsewhere (queue depth, cache counters, ...).
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector):
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in collectors:
+            try:
+                families = collector()
+            except Exception as e:
+                print(f"⚠️ Warning: Metrics collector failed: {str(e)}")
+                continue
+            for name, metric_type, documentation, samples in families:
+                lines.append(f'# HELP {name} {documentation}')
+                lines.append(f'# TYPE {name} {metric_type}')
+                for labels, value in samples:
+                    names = tuple(labels)
+                    lines.append(f'{name}{_format_labels(names, tuple(labels[n] for n in names))} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+# Global registry
+registry = MetricsRegistry()
+
+REQUEST_DURATION = registry.histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route', ('route', 'method', 'status'))
+REQUESTS_IN_FLIGHT = registry.gauge(
+    'http_requests_in_flight', 'HTTP requests currently being handled')
+STAGE_DURATION = registry.histogram(
+    'review_stage_duration_seconds', 'Latency of each processing stage', ('endpoint', 'stage'))
+STAGE_ERRORS = registry.counter(
+    'review_stage_errors_total', 'Errors by processing stage', ('endpoint', 'stage'))
+SENTIMENT_BATCH_SIZE = registry.histogram(
+    'sentiment_batch_size', 'Texts per sentiment forward pass', (),
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128))
+SENTIMENT_TRUNCATED = registry.counter(
+    'sentiment_truncated_texts_total', 'Texts with tokens left unscored by sentiment inference')
+SENTIMENT_TRUNCATED_TOKENS = registry.counter(
+    'sentiment_truncated_tokens_total', 'Model tokens dropped by truncation or the chunk limit before sentiment inference')
+SENTIMENT_CHUNKED = registry.counter(
+    'sentiment_chunked_texts_total', 'Long texts scored as several token windows')
+LANGUAGES_DETECTED = registry.counter(
+    'review_languages_detected_total', 'Reviews by detected language', ('language',))
+KEY_POINTS_DECISIONS = registry.counter(
+    'key_points_policy_decisions_total', 'Reviews analyzed without synchronous key points, by policy and outcome',
+    ('policy', 'outcome'))
+SENTIMENT_ROUTED = registry.counter(
+    'sentiment_routed_texts_total', 'Texts scored per detected language and sentiment model', ('language', 'model'))
+
+
+def timed_stage(endpoint, stage, func):
+    """
+    Wrap func so each call records its duration and failures under endpoint/stage
+
+    Returns:
+        callable: Takes no arguments and returns func()'s result
+    """
+    def run():
+        started = time.perf_counter()
+        try:
+            return func()
+        except Exception:
+            STAGE_ERRORS.inc(endpoint=endpoint, stage=stage)
+            raise
+        finally:
+            STAGE_DURATION.observe(time.perf_counter() - started, endpoint=endpoint, stage=stage)
+
+    return run
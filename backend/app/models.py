@@ -1,22 +1,52 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float
+from sqlalchemy import Column, Integer, LargeBinary, String, Text, DateTime, Float, Index, JSON, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
 Base = declarative_base()
 
+# JSONB on PostgreSQL (GIN-indexable), plain JSON elsewhere (e.g. SQLite)
+KeyPointsType = JSON().with_variant(JSONB(), 'postgresql')
+
 class Review(Base):
     """
     SQLAlchemy model for product reviews
     Stores review text, sentiment analysis results, and key points from AI
     """
     __tablename__ = 'reviews'
+    __table_args__ = (
+        # Backs newest-first listing and keyset pagination on (created_at, id)
+        Index('ix_reviews_created_at_id', 'created_at', 'id'),
+        # Containment queries on key points (PostgreSQL JSONB only)
+        Index('ix_reviews_key_points', 'key_points', postgresql_using='gin'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     review_text = Column(Text, nullable=False)
     sentiment = Column(String(50))  # positive, negative, neutral
     confidence_score = Column(Float)
-    key_points = Column(Text)  # JSON string from Gemini
+    key_points = Column(KeyPointsType)  # Array of key point strings from Gemini
+    key_points_status = Column(String(20), default='completed', nullable=False)  # completed, pending (queued for the backlog), skipped, failed
+    key_points_policy = Column(String(10))  # sync, skip, defer or sample, see policy
+    status = Column(String(20), default='completed', nullable=False)  # pending, processing, completed, failed
+    error_message = Column(Text)  # Set when background analysis fails
+    minhash = Column(LargeBinary)  # MinHash signature of the normalized text, see dedup
+    sentiment_model = Column(String(200))  # Sentiment model (and long-text mode) that scored the row
+    key_points_model = Column(String(200))  # Gemini model and prompt version that extracted the key points
+    duplicate_of = Column(Integer)  # Earlier near-duplicate review, if one was found at ingestion
+    language = Column(String(8))  # Detected language code (e.g. id, en), null when undetermined
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # Backs ETag/Last-Modified on the read endpoints
+    
+    # Columns returned by the API, in to_dict order
+    API_COLUMNS = ('id', 'review_text', 'sentiment', 'confidence_score', 'key_points', 'key_points_status',
+                   'key_points_policy', 'status', 'error_message', 'duplicate_of', 'language', 'sentiment_model', 'key_points_model',
+                   'created_at')
+    
+    @classmethod
+    def api_columns(cls):
+        """Column expressions for querying API fields as plain rows, without building ORM objects"""
+        return [getattr(cls, name) for name in cls.API_COLUMNS]
     
     def to_dict(self):
         """Convert model instance to dictionary for JSON serialization"""
@@ -26,5 +56,55 @@ class Review(Base):
             'sentiment': self.sentiment,
             'confidence_score': self.confidence_score,
             'key_points': self.key_points,
+            'key_points_status': self.key_points_status,
+            'key_points_policy': self.key_points_policy,
+            'status': self.status,
+            'error_message': self.error_message,
+            'duplicate_of': self.duplicate_of,
+            'language': self.language,
+            'sentiment_model': self.sentiment_model,
+            'key_points_model': self.key_points_model,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
+    
+    @staticmethod
+    def has_key_point(point, dialect_name):
+        """
+        Filter clause matching reviews whose key points include point
+        
+        Args:
+            point (str): Exact key point to look for
+            dialect_name (str): Database dialect, e.g. 'postgresql' or 'sqlite'
+        """
+        if dialect_name == 'postgresql':
+            # JSONB @> containment, served by the GIN index
+            return Review.key_points.contains([point])
+        return text(
+            "EXISTS (SELECT 1 FROM json_each(reviews.key_points) WHERE json_each.value = :key_point)"
+        ).bindparams(key_point=point)
+
+
+class AnalysisCacheEntry(Base):
+    """
+    Persistent tier of the analysis result cache
+    Keyed by the hash of the normalized review text plus the model that produced the value
+    """
+    __tablename__ = 'analysis_cache'
+
+    text_hash = Column(String(64), primary_key=True)  # sha256 hex of normalized text
+    model = Column(String(200), primary_key=True)
+    value = Column(Text, nullable=False)  # JSON-encoded result
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class SentimentRollup(Base):
+    """
+    Hourly sentiment aggregates, maintained incrementally as reviews are analyzed
+    Backs /api/stats so dashboards don't scan the reviews table
+    """
+    __tablename__ = 'sentiment_rollups'
+
+    bucket_start = Column(DateTime, primary_key=True)  # created_at truncated to the hour
+    sentiment = Column(String(50), primary_key=True)
+    review_count = Column(Integer, nullable=False, default=0)
+    confidence_sum = Column(Float, nullable=False, default=0.0)
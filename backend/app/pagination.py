@@ -0,0 +1,69 @@
+"""
+Keyset (cursor) pagination over reviews ordered by (created_at, id) descending
+"""
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_, desc
+from .models import Review
+
+
+def encode_cursor(created_at, review_id):
+    """Opaque cursor pointing just past the given row"""
+    payload = json.dumps([created_at.isoformat(), review_id])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor
+
+    Returns:
+        tuple: (created_at, id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, review_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(review_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
+def newest_first(query):
+    """Order a Review query by the (created_at, id) index, newest first"""
+    return query.order_by(desc(Review.created_at), desc(Review.id))
+
+
+def after_cursor(query, cursor):
+    """Restrict a newest-first Review query to rows after cursor"""
+    created_at, review_id = decode_cursor(cursor)
+    return query.filter(or_(
+        Review.created_at < created_at,
+        and_(Review.created_at == created_at, Review.id < review_id)
+    ))
+
+
+def keyset_page(query, cursor, limit):
+    """
+    Fetch one page of a Review query with keyset pagination
+
+    Args:
+        query: Review query (filters applied, no ordering)
+        cursor (str): Cursor from the previous page, or empty for the first page
+        limit (int): Page size
+
+    Returns:
+        tuple: (reviews, next_cursor) where next_cursor is None on the last page
+    """
+    if cursor:
+        query = after_cursor(query, cursor)
+    rows = newest_first(query).limit(limit + 1).all()
+    reviews = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = reviews[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return reviews, next_cursor
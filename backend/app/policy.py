@@ -0,0 +1,91 @@
+"""
+Key-point extraction policy
+Gemini extraction is the slowest and most expensive stage, so callers that
+only need sentiment can skip it or move it off the request path:
+
+    sync    extract before responding (default)
+    skip    sentiment only; key_points_status = 'skipped'
+    defer   respond after sentiment; the key points backlog fills them in
+    sample  respond after sentiment; only reviews that are negative, below
+            a confidence threshold or in a sampled fraction are queued for
+            the backlog, the rest are skipped
+
+The deployment default is KEY_POINTS_POLICY; requests may override it with
+key_points_policy.
+"""
+import hashlib
+import os
+from .cache import normalize_text
+from .metrics import KEY_POINTS_DECISIONS
+
+KEY_POINTS_POLICIES = ('sync', 'skip', 'defer', 'sample')
+
+
+class KeyPointsPolicy:
+    """Chooses whether and when a review's key points are extracted"""
+
+    def __init__(self, default='sync', sample_rate=0.0, confidence_below=None, sentiments=()):
+        if default not in KEY_POINTS_POLICIES:
+            print(f"⚠️ Warning: Unknown KEY_POINTS_POLICY '{default}', using sync")
+            default = 'sync'
+        self.default = default
+        self.sample_rate = min(1.0, max(0.0, sample_rate))
+        self.confidence_below = confidence_below
+        self.sentiments = frozenset(sentiments)
+
+    def resolve(self, requested=None):
+        """
+        Policy for one request
+
+        Args:
+            requested (str): key_points_policy from the request, or None for the deployment default
+
+        Raises:
+            ValueError: For an unknown policy
+        """
+        if requested is None or requested == '':
+            return self.default
+        policy = str(requested).lower()
+        if policy not in KEY_POINTS_POLICIES:
+            raise ValueError(f"Invalid key_points_policy '{requested}', expected one of: {', '.join(KEY_POINTS_POLICIES)}")
+        return policy
+
+    def _in_sample(self, text):
+        """Deterministic per text, so resubmitted reviews get the same decision"""
+        digest = hashlib.sha256(normalize_text(text).encode('utf-8')).digest()
+        return int.from_bytes(digest[:8], 'big') / 2 ** 64 < self.sample_rate
+
+    def selects(self, text, sentiment_result):
+        """True if the sample policy wants key points for this review"""
+        if sentiment_result['sentiment'] in self.sentiments:
+            return True
+        if self.confidence_below is not None and sentiment_result['confidence'] < self.confidence_below:
+            return True
+        return self._in_sample(text)
+
+    def status_after_sentiment(self, policy, text, sentiment_result):
+        """
+        key_points_status for a review analyzed without synchronous extraction
+
+        Returns:
+            str: 'pending' (queued for the backlog) or 'skipped'
+        """
+        if policy == 'defer' or (policy == 'sample' and self.selects(text, sentiment_result)):
+            status = 'pending'
+        else:
+            status = 'skipped'
+        KEY_POINTS_DECISIONS.inc(policy=policy, outcome=status)
+        return status
+
+
+def _optional_float(value):
+    return float(value) if value not in (None, '') else None
+
+
+# Global instance
+key_points_policy = KeyPointsPolicy(
+    default=os.getenv('KEY_POINTS_POLICY', 'sync'),
+    sample_rate=float(os.getenv('KEY_POINTS_SAMPLE_RATE', '0.1')),
+    confidence_below=_optional_float(os.getenv('KEY_POINTS_SAMPLE_CONFIDENCE_BELOW', '0.6')),
+    sentiments=[s.strip().lower() for s in os.getenv('KEY_POINTS_SAMPLE_SENTIMENTS', 'negative').split(',') if s.strip()]
+)
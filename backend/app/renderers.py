@@ -0,0 +1,59 @@
+"""
+Fast JSON renderer
+Serializes with orjson when it is installed (datetimes, dates and decimals
+handled natively), falling back to the stdlib encoder otherwise
+"""
+import datetime
+import decimal
+import json
+
+try:
+    import orjson
+except ImportError:  # Optional: pip install orjson
+    orjson = None
+
+
+def _default(obj):
+    """Types neither encoder handles on its own"""
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode('utf-8', errors='replace')
+    raise TypeError(f'{type(obj).__name__} is not JSON serializable')
+
+
+def dumps(value):
+    """
+    Encode value as JSON
+
+    Returns:
+        bytes: UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class FastJSON:
+    """
+    Pyramid renderer factory, a drop-in for the stock 'json' renderer
+
+    Views can return datetimes and SQLAlchemy row values directly instead of
+    converting every field to a string first.
+    """
+
+    def __init__(self, info):
+        self.info = info
+
+    def __call__(self, value, system):
+        request = system.get('request')
+        if request is not None:
+            response = request.response
+            if response.content_type == response.default_content_type:
+                response.content_type = 'application/json'
+                response.charset = 'utf-8'
+        return dumps(value)
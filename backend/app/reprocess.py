@@ -0,0 +1,285 @@
+"""
+Offline reprocessing of stored reviews after a model or prompt upgrade
+Streams reviews in id order, re-scores each chunk (optionally on a process
+pool), writes the results back with bulk updates and checkpoints the last
+id so an interrupted run can resume
+"""
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from sqlalchemy import and_, or_, update
+from .models import Review
+from .database import SessionFactory
+from .ingest import analyze_sentiments, extract_key_points_many
+from .stats import rebuild_rollups
+from .services.sentiment_analyzer import sentiment_analyzer
+from .services.gemini_extractor import gemini_extractor
+from .services.language import language_detector
+
+REPROCESS_STAGES = ('sentiment', 'key_points')
+
+
+def current_versions():
+    """Model/prompt versions that fresh results are stored with"""
+    return {
+        'sentiment': sentiment_analyzer.cache_key,
+        'sentiment_languages': {
+            language: route.cache_key for language, route in sorted(sentiment_analyzer.routes.items())
+        },
+        'key_points': gemini_extractor.version
+    }
+
+
+def _sentiment_version(versions, language):
+    return versions['sentiment_languages'].get(language, versions['sentiment'])
+
+
+def _stale(stages, versions):
+    """Filter clause for rows whose stored version differs from the current one"""
+    def differs(column, version):
+        return or_(column.is_(None), column != version)
+
+    clauses = []
+    if 'sentiment' in stages:
+        routes = versions['sentiment_languages']
+        # Rows in a routed language are compared with that language's model
+        clauses.extend(
+            and_(Review.language == language, differs(Review.sentiment_model, version))
+            for language, version in routes.items()
+        )
+        multilingual = differs(Review.sentiment_model, versions['sentiment'])
+        if routes:
+            multilingual = and_(or_(Review.language.is_(None), Review.language.notin_(list(routes))), multilingual)
+        clauses.append(multilingual)
+    if 'key_points' in stages:
+        # Key points a policy skipped stay skipped
+        clauses.append(and_(Review.key_points_status != 'skipped', differs(Review.key_points_model, versions['key_points'])))
+    return or_(*clauses)
+
+
+def _init_worker(workers):
+    """
+    Pool worker setup: don't reuse database connections inherited from the
+    parent, and give each worker an equal share of the Gemini rate limit so
+    the pool as a whole stays within GEMINI_RATE_LIMIT_RPM
+    """
+    from . import database
+    database.engine.dispose(close=False)
+    gemini_extractor.caller.rate_limiter.split(workers)
+
+
+def _selected(rows, languages, stages, versions, force):
+    """
+    Per stage, whether each row needs re-scoring: its stored version is out
+    of date (or force is set), and for key points the policy didn't skip them
+    """
+    selected = {}
+    if 'sentiment' in stages:
+        selected['sentiment'] = [
+            force or row.sentiment_model != _sentiment_version(versions, language)
+            for row, language in zip(rows, languages)
+        ]
+    if 'key_points' in stages:
+        selected['key_points'] = [
+            row.key_points_status != 'skipped' and (force or row.key_points_model != versions['key_points'])
+            for row in rows
+        ]
+    return selected
+
+
+def score_texts(texts, languages, stages, selected=None):
+    """
+    Re-score texts for the given stages (runs in pool workers)
+
+    Args:
+        selected (dict): Per stage, one bool per text, True if it needs re-scoring (default: all)
+
+    Returns:
+        dict: Per stage, one result or error message string per text (None
+        for texts that weren't selected)
+    """
+    results = {}
+    for stage, analyze in (('sentiment', analyze_sentiments), ('key_points', extract_key_points_many)):
+        if stage not in stages:
+            continue
+        mask = (selected or {}).get(stage) or [True] * len(texts)
+        positions = [pos for pos, needed in enumerate(mask) if needed]
+        results[stage] = [None] * len(texts)
+        if not positions:
+            continue
+        for pos, result in zip(positions, analyze([texts[pos] for pos in positions], [languages[pos] for pos in positions])):
+            results[stage][pos] = str(result) if isinstance(result, Exception) else result
+    return results
+
+
+class Checkpoint:
+    """Last processed id and counters, saved atomically as JSON after every chunk"""
+
+    def __init__(self, path, stages, versions):
+        self.path = path
+        self.stages = list(stages)
+        self.versions = versions
+        self.last_id = 0
+        self.updated = 0
+        self.failed = 0
+
+    def load(self):
+        """Resume from the file if it was written for the same stages and versions"""
+        if not self.path or not os.path.exists(self.path):
+            return False
+        with open(self.path, encoding='utf-8') as f:
+            saved = json.load(f)
+        if saved.get('stages') != self.stages or saved.get('versions') != self.versions:
+            return False
+        self.last_id = saved.get('last_id', 0)
+        self.updated = saved.get('updated', 0)
+        self.failed = saved.get('failed', 0)
+        return True
+
+    def save(self):
+        if not self.path:
+            return
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump({
+                'stages': self.stages,
+                'versions': self.versions,
+                'last_id': self.last_id,
+                'updated': self.updated,
+                'failed': self.failed,
+                'saved_at': datetime.utcnow().isoformat()
+            }, f, indent=2)
+        os.replace(temporary, self.path)
+
+
+def _updates(ids, languages, scored, stages, versions):
+    """Bulk-update mappings for one chunk, skipping per-row failures and rows a stage left alone"""
+    mappings = []
+    failed = 0
+    for pos, review_id in enumerate(ids):
+        values = {}
+        complete = True
+        if 'sentiment' in stages:
+            result = scored['sentiment'][pos]
+            if isinstance(result, dict):
+                values.update(
+                    sentiment=result['sentiment'],
+                    confidence_score=result['confidence'],
+                    language=languages[pos],
+                    sentiment_model=_sentiment_version(versions, languages[pos])
+                )
+            elif result is not None:
+                complete = False
+        if 'key_points' in stages:
+            points = scored['key_points'][pos]
+            if isinstance(points, list):
+                values.update(
+                    key_points=points,
+                    key_points_status='completed',
+                    key_points_model=versions['key_points']
+                )
+            elif points is not None:
+                complete = False
+        if not complete:
+            failed += 1
+        if values:
+            # Bulk updates skip the column's onupdate, so bump it here for the HTTP validators
+            mappings.append({'id': review_id, 'updated_at': datetime.utcnow(), **values})
+    return mappings, failed
+
+
+def reprocess(stages=REPROCESS_STAGES, chunk_size=500, workers=0, checkpoint_path=None, resume=True,
+              force=False, limit=None):
+    """
+    Re-score stored reviews whose model/prompt version is out of date
+
+    Args:
+        stages (iterable): Any of REPROCESS_STAGES
+        chunk_size (int): Reviews fetched, scored and updated together
+        workers (int): Process pool size for scoring (0 scores in this process)
+        checkpoint_path (str): JSON file recording progress (None disables)
+        resume (bool): Continue from a matching checkpoint instead of id 0
+        force (bool): Re-score every completed review, current or not
+            (key points skipped by policy stay skipped)
+        limit (int): Stop after this many reviews
+
+    Returns:
+        dict: Reviews updated and failed, last id reached and elapsed seconds
+    """
+    stages = [stage for stage in REPROCESS_STAGES if stage in stages]
+    versions = current_versions()
+    checkpoint = Checkpoint(checkpoint_path, stages, versions)
+    if resume and checkpoint.load():
+        print(f"↩️ Resuming after review id {checkpoint.last_id}")
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(workers,)) if workers > 0 else None
+    started = time.perf_counter()
+    processed = 0
+    sentiment_changed = False
+    db = SessionFactory()
+    try:
+        while limit is None or processed < limit:
+            query = db.query(Review.id, Review.review_text, Review.language, Review.sentiment_model,
+                             Review.key_points_model, Review.key_points_status)\
+                .filter(Review.id > checkpoint.last_id)\
+                .filter(Review.status == 'completed')
+            if not force:
+                query = query.filter(_stale(stages, versions))
+            size = chunk_size if limit is None else min(chunk_size, limit - processed)
+            rows = query.order_by(Review.id).limit(size).all()
+            if not rows:
+                break
+
+            ids = [row.id for row in rows]
+            texts = [row.review_text for row in rows]
+            # Rows stored before language detection get it now
+            languages = [row.language or language_detector.detect(row.review_text) for row in rows]
+            selected = _selected(rows, languages, stages, versions, force)
+            if pool is None:
+                scored = score_texts(texts, languages, stages, selected)
+            else:
+                step = -(-len(texts) // workers)
+                slices = [(texts[start:start + step], languages[start:start + step], stages,
+                           {stage: mask[start:start + step] for stage, mask in selected.items()})
+                          for start in range(0, len(texts), step)]
+                scored = {stage: [] for stage in stages}
+                for part in pool.map(score_texts, *zip(*slices)):
+                    for stage in stages:
+                        scored[stage].extend(part[stage])
+
+            mappings, failed = _updates(ids, languages, scored, stages, versions)
+            if mappings:
+                db.execute(update(Review), mappings)
+                sentiment_changed = sentiment_changed or any('sentiment' in mapping for mapping in mappings)
+            db.commit()
+
+            processed += len(rows)
+            checkpoint.last_id = ids[-1]
+            checkpoint.updated += len(mappings)
+            checkpoint.failed += failed
+            checkpoint.save()
+            print(f"🔁 Reprocessed up to id {checkpoint.last_id}: "
+                  f"{checkpoint.updated} updated, {checkpoint.failed} failed")
+
+        if sentiment_changed:
+            rebuild_rollups(db)
+            print("✅ Sentiment rollups rebuilt")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+        if pool is not None:
+            pool.shutdown()
+
+    return {
+        'stages': stages,
+        'versions': versions,
+        'processed': processed,
+        'updated': checkpoint.updated,
+        'failed': checkpoint.failed,
+        'last_id': checkpoint.last_id,
+        'seconds': round(time.perf_counter() - started, 3)
+    }
@@ -0,0 +1 @@
+# Console scripts package
@@ -0,0 +1,154 @@
+"""
+Benchmark the API offline
+
+Usage:
+    review-benchmark --scenario analyze --requests 200 --concurrency 8
+    review-benchmark --mode http --scenario bulk --gemini-latency-ms 1200
+    review-benchmark --mode http --url http://localhost:6543 --scenario reviews
+    review-benchmark --scenario bulk --language-models en,id --routed-base-ms 8 --routed-item-ms 0.5
+
+Gemini is replaced by a stub with configurable latency and error rate, and
+sentiment uses a keyword stub (or the configured model with --sentiment
+model). The app runs against a throwaway SQLite database unless --url points
+at an existing server. Prints a JSON report (req/s, p50/p95/p99 latency and
+per-stage breakdown, plus sentiment routing per detected language) that can
+be saved with --output and compared between runs; --language-models routes
+languages to separate (stub) sentiment models.
+"""
+import argparse
+import json
+import os
+import platform
+import tempfile
+import threading
+
+SCENARIOS = ('analyze', 'analyze-async', 'bulk', 'reviews', 'health')
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenario', choices=SCENARIOS, default='analyze')
+    parser.add_argument('--requests', type=int, default=200, help='Measured requests')
+    parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests sent first')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--mode', choices=('inprocess', 'http'), default='inprocess')
+    parser.add_argument('--url', help='Benchmark an already running server instead of an in-process app')
+    parser.add_argument('--server-threads', type=int, default=4, help='waitress threads for --mode http')
+    parser.add_argument('--db', help='Database URL (default: a temporary SQLite file)')
+    parser.add_argument('--sentiment', choices=('stub', 'model'), default='stub')
+    parser.add_argument('--sentiment-base-ms', type=float, default=20.0)
+    parser.add_argument('--sentiment-item-ms', type=float, default=2.0)
+    parser.add_argument('--language-models', default=None,
+                        help='Per-language sentiment routes, e.g. "en,id" (stubs) or "en=<model>,id=<model>"; '
+                             'default: SENTIMENT_LANGUAGE_MODELS')
+    parser.add_argument('--routed-base-ms', type=float, default=None,
+                        help='Stub cost per forward pass of the per-language models (default: --sentiment-base-ms)')
+    parser.add_argument('--routed-item-ms', type=float, default=None,
+                        help='Stub cost per text of the per-language models (default: --sentiment-item-ms)')
+    parser.add_argument('--gemini-latency-ms', type=float, default=800.0)
+    parser.add_argument('--gemini-jitter-ms', type=float, default=200.0)
+    parser.add_argument('--gemini-error-rate', type=float, default=0.0)
+    parser.add_argument('--gemini-rpm', type=float, default=0, help='Client rate limit (0 disables)')
+    parser.add_argument('--bulk-size', type=int, default=20, help='Reviews per request for --scenario bulk')
+    parser.add_argument('--no-unique', action='store_true', help='Reuse review texts (measures cache hits)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Also write the JSON report to this file')
+    return parser.parse_args(argv)
+
+
+def _build_app(args):
+    """Point the app at the benchmark database, build it and install the stubs"""
+    from .. import main as make_app
+    from ..benchmark import install_stubs
+    from ..database import configure_engine
+    from ..services.gemini_extractor import gemini_extractor
+    from ..services.sentiment_analyzer import sentiment_analyzer
+
+    configure_engine(args.db or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'benchmark.db'))
+    gemini_extractor.caller.rate_limiter.rate = args.gemini_rpm / 60.0
+    if args.language_models is not None:
+        routes = {}
+        for item in args.language_models.split(','):
+            language, _, model_name = item.partition('=')
+            if language.strip():
+                routes[language.strip()] = model_name.strip() or f'benchmark-stub-sentiment-{language.strip()}'
+        sentiment_analyzer.configure_routes(routes)
+    app = make_app({}, **{'app.model_warmup': 'lazy'})
+    gemini = install_stubs(
+        sentiment=args.sentiment,
+        sentiment_base_ms=args.sentiment_base_ms,
+        sentiment_per_item_ms=args.sentiment_item_ms,
+        gemini_latency_ms=args.gemini_latency_ms,
+        gemini_jitter_ms=args.gemini_jitter_ms,
+        gemini_error_rate=args.gemini_error_rate,
+        seed=args.seed,
+        routed_base_ms=args.routed_base_ms,
+        routed_per_item_ms=args.routed_item_ms
+    )
+    if args.sentiment == 'model':
+        # Weights must already be in the local Hugging Face cache
+        sentiment_analyzer.warm_up(background=False)
+    return app, gemini
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+
+    from ..benchmark import run_load, in_process_client, http_client
+
+    server = None
+    remote_url = None
+    gemini = None
+    if args.url:
+        send = http_client(args.url.rstrip('/'))
+        remote_url = args.url.rstrip('/')
+    else:
+        app, gemini = _build_app(args)
+        if args.mode == 'http':
+            from waitress.server import create_server
+            server = create_server(app, host='127.0.0.1', port=0, threads=args.server_threads)
+            threading.Thread(target=server.run, name='benchmark-server', daemon=True).start()
+            send = http_client(f'http://127.0.0.1:{server.effective_port}')
+        else:
+            send = in_process_client(app)
+
+    try:
+        report = run_load(
+            send,
+            args.scenario,
+            requests_total=args.requests,
+            concurrency=args.concurrency,
+            warmup=args.warmup,
+            seed=args.seed,
+            unique=not args.no_unique,
+            bulk_size=args.bulk_size,
+            remote_url=remote_url
+        )
+    finally:
+        if server is not None:
+            server.close()
+
+    if gemini is not None:
+        # Prompt size shows the effect of language-specific prompts
+        report['gemini'] = {
+            'calls': gemini.calls,
+            'mean_prompt_chars': round(gemini.prompt_chars / gemini.calls, 1) if gemini.calls else None
+        }
+    report['config'] = {
+        key: value for key, value in vars(args).items() if key not in ('output',)
+    }
+    report['environment'] = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count()
+    }
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
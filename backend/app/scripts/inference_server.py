@@ -0,0 +1,45 @@
+"""
+Serve the sentiment model to every web process on this host
+
+Usage:
+    review-inference-server [--socket /tmp/review-sentiment.sock] [--workers 2]
+
+Loads the model configured by SENTIMENT_MODEL / SENTIMENT_BACKEND once and
+forks worker processes that share its weights. Point the web processes at
+it with SENTIMENT_INFERENCE_SOCKET set to the same path.
+"""
+import argparse
+import os
+from dotenv import load_dotenv
+from ..services.sentiment_backends import BACKENDS
+from ..services.inference_server import serve
+
+DEFAULT_MODEL = "cardiffnlp/twitter-xlm-roberta-base-sentiment-multilingual"
+
+
+def main(argv=None):
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--socket', default=os.getenv('SENTIMENT_INFERENCE_SOCKET') or '/tmp/review-sentiment.sock')
+    parser.add_argument('--workers', type=int, default=int(os.getenv('SENTIMENT_INFERENCE_WORKERS', '2')))
+    parser.add_argument('--backend', choices=BACKENDS, default=os.getenv('SENTIMENT_BACKEND', 'pytorch'))
+    parser.add_argument('--model', default=os.getenv('SENTIMENT_MODEL', DEFAULT_MODEL), help='Hugging Face model id')
+    parser.add_argument('--threads', type=int, default=int(os.getenv('SENTIMENT_NUM_THREADS', '0')) or None,
+                        help='Intra-op CPU threads per worker')
+    parser.add_argument('--batch-size', type=int, default=64, help='Largest forward pass per worker')
+    args = parser.parse_args(argv)
+
+    serve(
+        args.socket,
+        workers=max(1, args.workers),
+        backend=args.backend,
+        model_name=args.model,
+        token=os.getenv('HUGGINGFACE_ACCESS_TOKEN'),
+        num_threads=args.threads,
+        onnx_path=os.getenv('SENTIMENT_ONNX_PATH') or None,
+        batch_size=args.batch_size
+    )
+
+
+if __name__ == '__main__':
+    main()
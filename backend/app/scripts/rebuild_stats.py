@@ -0,0 +1,32 @@
+"""
+Rebuild the sentiment rollup table from the reviews table
+
+Usage:
+    review-stats-rebuild
+
+Use it to backfill /api/stats after upgrading or after bulk edits to reviews.
+"""
+import argparse
+from ..database import init_db, SessionFactory
+from ..stats import rebuild_rollups
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batch-size', type=int, default=5000, help='Reviews fetched per round trip')
+    args = parser.parse_args(argv)
+
+    init_db()
+    db = SessionFactory()
+    try:
+        counted = rebuild_rollups(db, batch_size=args.batch_size)
+        print(f"✅ Sentiment rollups rebuilt from {counted} review(s)")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Re-score stored reviews after a sentiment model or Gemini prompt upgrade
+
+Usage:
+    review-reprocess [--stages sentiment,key_points] [--workers 4] [--chunk-size 500]
+
+Only completed reviews whose stored sentiment_model / key_points_model
+differs from the current version are touched (--force re-scores all).
+Progress is checkpointed to --checkpoint after every chunk; running the
+same command again resumes where it stopped.
+"""
+import argparse
+import json
+from ..database import init_db
+from ..reprocess import REPROCESS_STAGES, reprocess
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stages', default=','.join(REPROCESS_STAGES),
+                        help='Comma-separated stages to recompute: sentiment, key_points')
+    parser.add_argument('--chunk-size', type=int, default=500, help='Reviews scored and updated together')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Scoring processes (0 scores in this process; each worker loads its own '
+                             'model unless SENTIMENT_INFERENCE_SOCKET is set)')
+    parser.add_argument('--checkpoint', default='reprocess-checkpoint.json', help='Progress file')
+    parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint')
+    parser.add_argument('--force', action='store_true', help='Re-score reviews that are already current')
+    parser.add_argument('--limit', type=int, help='Stop after this many reviews')
+    args = parser.parse_args(argv)
+
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = [stage for stage in stages if stage not in REPROCESS_STAGES]
+    if unknown or not stages:
+        parser.error(f"Unknown stage(s) {', '.join(unknown) or '(none)'}, expected: {', '.join(REPROCESS_STAGES)}")
+
+    init_db()
+    summary = reprocess(
+        stages=stages,
+        chunk_size=max(1, args.chunk_size),
+        workers=max(0, args.workers),
+        checkpoint_path=args.checkpoint,
+        resume=not args.restart,
+        force=args.force,
+        limit=args.limit
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == '__main__':
+    main()
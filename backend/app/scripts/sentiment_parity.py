@@ -0,0 +1,57 @@
+"""
+Compare sentiment inference backends against the PyTorch baseline
+
+Usage:
+    review-sentiment-parity [--texts reviews.txt] [--backends pytorch-int8,onnx]
+
+Without --texts a small built-in Indonesian/English sample is scored.
+Prints a JSON report with label agreement, score drift and throughput.
+"""
+import argparse
+import json
+import os
+from dotenv import load_dotenv
+from ..services.sentiment_backends import BACKENDS, parity_report
+
+DEFAULT_MODEL = "cardiffnlp/twitter-xlm-roberta-base-sentiment-multilingual"
+
+SAMPLE_TEXTS = [
+    "This product is amazing! Great quality and fast shipping.",
+    "Terrible product. Waste of money. Very disappointed.",
+    "It's okay, does what it says but nothing special.",
+    "Produk ini bagus sekali! Kualitas mantap dan pengiriman cepat.",
+    "Barangnya rusak saat sampai, sangat mengecewakan.",
+    "Biasa saja, sesuai harga.",
+]
+
+
+def main(argv=None):
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--texts', help='File with one review per line')
+    parser.add_argument('--backends', default=','.join(BACKENDS), help='Comma-separated backends to compare')
+    parser.add_argument('--model', default=DEFAULT_MODEL, help='Hugging Face model id')
+    parser.add_argument('--threads', type=int, default=int(os.getenv('SENTIMENT_NUM_THREADS', '0')) or None)
+    parser.add_argument('--batch-size', type=int, default=16)
+    args = parser.parse_args(argv)
+
+    if args.texts:
+        with open(args.texts, encoding='utf-8') as f:
+            texts = [line.strip() for line in f if line.strip()]
+    else:
+        texts = SAMPLE_TEXTS
+
+    report = parity_report(
+        texts,
+        args.model,
+        backends=[b.strip() for b in args.backends.split(',') if b.strip()],
+        token=os.getenv('HUGGINGFACE_ACCESS_TOKEN'),
+        num_threads=args.threads,
+        onnx_path=os.getenv('SENTIMENT_ONNX_PATH') or None,
+        batch_size=args.batch_size
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Full-text search over review text and key points
+
+PostgreSQL keeps a generated tsvector column (English and Indonesian
+stemming) behind a GIN index; SQLite keeps an FTS5 table in sync with
+triggers. Both are created alongside the reviews table by init_db.
+"""
+import base64
+import json
+import re
+from sqlalchemy import DDL, Float, and_, or_, cast, desc, event, func, literal_column, table, column, text
+from .models import Review
+from .pagination import newest_first, after_cursor, encode_cursor
+
+SEARCH_SORTS = ('relevance', 'newest')
+
+# Text search configurations combined for every review and query
+TEXT_SEARCH_CONFIGS = ('english', 'indonesian')
+
+_TSVECTOR_SQL = ' || '.join(
+    [f"setweight(to_tsvector('{config}', review_text), 'A')" for config in TEXT_SEARCH_CONFIGS]
+    + [f"setweight(jsonb_to_tsvector('{config}', coalesce(key_points, '[]'::jsonb), '[\"string\"]'), 'B')"
+       for config in TEXT_SEARCH_CONFIGS]
+)
+
+event.listen(Review.__table__, 'after_create', DDL(
+    f"ALTER TABLE reviews ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({_TSVECTOR_SQL}) STORED"
+).execute_if(dialect='postgresql'))
+event.listen(Review.__table__, 'after_create', DDL(
+    "CREATE INDEX ix_reviews_search_vector ON reviews USING gin (search_vector)"
+).execute_if(dialect='postgresql'))
+
+SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE reviews_fts USING fts5("
+    "review_text, key_points, content='reviews', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER reviews_fts_insert AFTER INSERT ON reviews BEGIN "
+    "INSERT INTO reviews_fts(rowid, review_text, key_points) VALUES (new.id, new.review_text, new.key_points); END",
+    "CREATE TRIGGER reviews_fts_delete AFTER DELETE ON reviews BEGIN "
+    "INSERT INTO reviews_fts(reviews_fts, rowid, review_text, key_points) "
+    "VALUES ('delete', old.id, old.review_text, old.key_points); END",
+    "CREATE TRIGGER reviews_fts_update AFTER UPDATE OF review_text, key_points ON reviews BEGIN "
+    "INSERT INTO reviews_fts(reviews_fts, rowid, review_text, key_points) "
+    "VALUES ('delete', old.id, old.review_text, old.key_points); "
+    "INSERT INTO reviews_fts(rowid, review_text, key_points) VALUES (new.id, new.review_text, new.key_points); END",
+    "INSERT INTO reviews_fts(reviews_fts) VALUES ('rebuild')",
+)
+for _statement in SQLITE_FTS_DDL:
+    event.listen(Review.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+
+_reviews_fts = table('reviews_fts', column('rowid'), column('rank'))
+_FTS_TERM = re.compile(r'\w+', re.UNICODE)
+
+
+def encode_rank_cursor(rank, review_id):
+    """Opaque cursor pointing just past the given row in relevance order"""
+    payload = json.dumps([rank, review_id])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_rank_cursor(cursor):
+    """
+    Decode a cursor produced by encode_rank_cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        rank, review_id = json.loads(base64.urlsafe_b64decode(padded))
+        return float(rank), int(review_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
+def _postgresql_match(db, q):
+    """API column rows plus rank, matching q against the tsvector column"""
+    search_vector = literal_column('reviews.search_vector')
+    ts_query = None
+    for config in TEXT_SEARCH_CONFIGS:
+        part = func.websearch_to_tsquery(config, q)
+        ts_query = part if ts_query is None else ts_query.op('||')(part)
+    # ts_rank_cd returns float4; as double precision the rank survives the
+    # cursor round trip exactly, so rows tied on rank aren't skipped or repeated
+    rank = cast(func.ts_rank_cd(search_vector, ts_query), Float(precision=53))
+    return db.query(*Review.api_columns(), rank.label('rank')).filter(search_vector.op('@@')(ts_query)), rank
+
+
+def _sqlite_match(db, q):
+    """API column rows plus rank, matching q against the FTS5 table; bm25 is negated so higher ranks first"""
+    terms = _FTS_TERM.findall(q)
+    if not terms:
+        raise ValueError('q must contain at least one word')
+    fts_query = ' '.join('"' + term + '"' for term in terms)
+    rank = -_reviews_fts.c.rank
+    query = db.query(*Review.api_columns(), rank.label('rank'))\
+        .join(_reviews_fts, _reviews_fts.c.rowid == Review.id)\
+        .filter(text('reviews_fts MATCH :fts_query').bindparams(fts_query=fts_query))
+    return query, rank
+
+
+def search_reviews(db, q, sentiments=None, cursor=None, limit=20, sort='relevance'):
+    """
+    Find reviews whose text or key points match q
+
+    Args:
+        db: Database session
+        q (str): Search terms (web-search syntax on PostgreSQL, all words must match on SQLite)
+        sentiments (list[str]): Only include these sentiments
+        cursor (str): next_cursor from the previous page
+        limit (int): Page size
+        sort (str): 'relevance' (best match first) or 'newest'
+
+    Returns:
+        tuple: ([row, ...], next_cursor) where each row has the Review.API_COLUMNS plus rank
+
+    Raises:
+        ValueError: For an unusable query or a malformed cursor
+    """
+    if db.get_bind().dialect.name == 'postgresql':
+        query, rank = _postgresql_match(db, q)
+    else:
+        query, rank = _sqlite_match(db, q)
+    if sentiments:
+        query = query.filter(Review.sentiment.in_(sentiments))
+
+    if sort == 'newest':
+        if cursor:
+            query = after_cursor(query, cursor)
+        query = newest_first(query)
+    else:
+        if cursor:
+            after_rank, after_id = decode_rank_cursor(cursor)
+            query = query.filter(or_(rank < after_rank, and_(rank == after_rank, Review.id < after_id)))
+        query = query.order_by(desc(rank), desc(Review.id))
+
+    rows = query.limit(limit + 1).all()
+    results = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = results[-1]
+        if sort == 'newest':
+            next_cursor = encode_cursor(last.created_at, last.id)
+        else:
+            next_cursor = encode_rank_cursor(float(last.rank), last.id)
+    return results, next_cursor
@@ -1,52 +1,121 @@
-import google.generativeai as genai
 import os
 import json
 from dotenv import load_dotenv
+from .lazy import LazyInitializer
+from .language import LANGUAGE_NAMES
+from .resilience import TokenBucket, CircuitBreaker, ResilientCaller, is_unavailable
+from ..metrics import registry
 
 load_dotenv()
 
+# Estimated tokens used by the fixed instructions of a batched prompt
+BATCH_PROMPT_OVERHEAD_TOKENS = 120
+
+# Bump whenever the prompts below change: stored key points record the
+# version that produced them, so review-reprocess can find stale rows
+PROMPT_VERSION = '2'
+
 class GeminiExtractor:
     """
     Key points extraction service using Google Gemini AI
-    Extracts key points in the same language as the input text
+    Extracts key points in the same language as the input text; when the
+    detected language is passed in, a shorter prompt names it instead of
+    asking the model to work it out
     Uses the latest Gemini API (v1beta)
+    The client is configured lazily, so a missing API key fails the first
+    extraction instead of app startup
     """
     
     def __init__(self):
         # Support both GEMINI_API_KEY (recommended) and GEMINI_API_TOKEN (legacy)
         self.api_key = os.getenv('GEMINI_API_KEY') or os.getenv('GEMINI_API_TOKEN') or os.getenv('GOOGLE_API_KEY')
-        if not self.api_key:
-            raise ValueError("Gemini API key not found. Please set GEMINI_API_KEY or GEMINI_API_TOKEN in .env file")
-        self._initialize_model()
+        # Using gemini-2.5-flash (latest stable model)
+        self.model_name = 'gemini-2.5-flash'
+        # Multi-review packing: reviews per request and prompt token budget per request
+        self.batch_size = max(1, int(os.getenv('GEMINI_BATCH_SIZE', '8')))
+        self.batch_token_budget = int(os.getenv('GEMINI_BATCH_TOKEN_BUDGET', '6000'))
+        self.model = None
+        # Calls go through a rate limiter, retry loop and circuit breaker
+        self.caller = ResilientCaller(
+            TokenBucket(
+                rate=float(os.getenv('GEMINI_RATE_LIMIT_RPM', '60')) / 60.0,
+                burst=int(os.getenv('GEMINI_RATE_LIMIT_BURST', '10'))
+            ),
+            CircuitBreaker(
+                failure_threshold=int(os.getenv('GEMINI_BREAKER_FAILURES', '5')),
+                reset_timeout=float(os.getenv('GEMINI_BREAKER_RESET_SECONDS', '30'))
+            ),
+            max_retries=int(os.getenv('GEMINI_MAX_RETRIES', '3')),
+            backoff_base=float(os.getenv('GEMINI_BACKOFF_BASE_SECONDS', '0.5')),
+            backoff_max=float(os.getenv('GEMINI_BACKOFF_MAX_SECONDS', '8'))
+        )
+        # Degraded mode: store reviews with sentiment only while Gemini is unavailable
+        self.degraded_mode = os.getenv('GEMINI_DEGRADED_MODE', 'false').lower() in ('1', 'true', 'yes')
+        self.initializer = LazyInitializer('Gemini extractor', self._initialize_model)
+    
+    @property
+    def version(self):
+        """Model and prompt version stored with (and caching) extracted key points"""
+        return f'{self.model_name}@prompt-{PROMPT_VERSION}'
+    
+    def warm_up(self, background=True):
+        """Configure the Gemini client now instead of on the first request"""
+        if background:
+            return self.initializer.warm_up_async()
+        self.initializer.ensure()
+    
+    def install_model(self, model, model_name=None):
+        """
+        Use a ready-made model object exposing generate_content(prompt)
+        instead of configuring Gemini, e.g. an offline stub for benchmarks
+        """
+        self.model = model
+        if model_name:
+            self.model_name = model_name
+        self.initializer.mark_ready()
     
     def _initialize_model(self):
         """Initialize Gemini AI model"""
+        if not self.api_key:
+            raise ValueError("Gemini API key not found. Please set GEMINI_API_KEY or GEMINI_API_TOKEN in .env file")
         try:
+            import google.generativeai as genai
             genai.configure(api_key=self.api_key)
-            # Using gemini-2.5-flash (latest stable model)
-            self.model = genai.GenerativeModel('gemini-2.5-flash')
-            print("✅ Gemini extractor initialized successfully with gemini-2.5-flash")
+            self.model = genai.GenerativeModel(self.model_name)
+            print(f"✅ Gemini extractor initialized successfully with {self.model_name}")
         except Exception as e:
             print(f"❌ Error initializing Gemini: {str(e)}")
             print("💡 Tip: Make sure your GEMINI_API_KEY is valid and has access to Gemini API")
             raise
     
-    def extract_key_points(self, review_text):
+    def extract_key_points(self, review_text, language=None):
         """
         Extract key points from review text
         
         Args:
             review_text (str): Review text to analyze
+            language (str): Detected language code, None if unknown
             
         Returns:
-            str: JSON string containing array of key points
+            list[str]: Key points
         """
         if not review_text or not review_text.strip():
             raise ValueError("Review text cannot be empty")
         
+        self.initializer.ensure()
+        
         try:
-            # Create prompt that instructs Gemini to respond in same language
-            prompt = f"""
+            language_name = LANGUAGE_NAMES.get(language)
+            if language_name:
+                prompt = f"""
+Extract 3-5 key points from this {language_name} product review. Write them in {language_name}, 1-2 sentences each.
+Return ONLY a JSON array of strings, e.g. ["point 1", "point 2", "point 3"]
+
+Review: {review_text}
+"""
+            else:
+                # Create prompt that instructs Gemini to respond in same language
+                prompt = f"""
 Analyze the following product review and extract the key points.
 IMPORTANT: Respond in the SAME language as the review text below.
 
@@ -61,7 +130,7 @@ Keep each point concise (1-2 sentences maximum).
 """
             
             # Generate response using Gemini
-            response = self.model.generate_content(prompt)
+            response = self._generate(prompt)
             
             # Extract text from response
             key_points_text = response.text.strip()
@@ -69,15 +138,7 @@ Keep each point concise (1-2 sentences maximum).
             # Try to parse as JSON to validate
             try:
                 # Remove markdown code blocks if present
-                if key_points_text.startswith('```'):
-                    # Remove code fence
-                    parts = key_points_text.split('```')
-                    if len(parts) >= 2:
-                        key_points_text = parts[1]
-                        # Remove 'json' language identifier if present
-                        if key_points_text.startswith('json'):
-                            key_points_text = key_points_text[4:]
-                        key_points_text = key_points_text.strip()
+                key_points_text = self._strip_code_fence(key_points_text)
                 
                 # Validate JSON
                 parsed = json.loads(key_points_text)
@@ -88,28 +149,180 @@ Keep each point concise (1-2 sentences maximum).
                 if len(parsed) > 5:
                     parsed = parsed[:5]
                 
-                return json.dumps(parsed, ensure_ascii=False)
+                return [str(point) for point in parsed]
             except json.JSONDecodeError as e:
                 # If parsing fails, return as simple array
                 print(f"⚠️ Warning: Could not parse Gemini response as JSON: {key_points_text}")
                 print(f"   JSON Error: {str(e)}")
                 # Fallback: return the text as a single point
-                return json.dumps([key_points_text], ensure_ascii=False)
+                return [key_points_text]
                 
         except Exception as e:
-            error_msg = str(e)
-            print(f"❌ Error extracting key points: {error_msg}")
-            
-            # Provide helpful error messages
-            if "404" in error_msg:
-                print("💡 Tip: Model not found. Try updating to a supported model.")
-            elif "API key" in error_msg.lower():
-                print("💡 Tip: Check your GEMINI_API_KEY in the .env file")
-            elif "quota" in error_msg.lower():
-                print("💡 Tip: You may have exceeded your API quota. Check Google AI Studio.")
-            
+            self._report_error(e)
             raise
+    
+    def should_defer(self, error):
+        """True if a failed extraction should be queued for later instead of failing the review"""
+        return self.degraded_mode and is_unavailable(error)
+    
+    def _generate(self, prompt):
+        """generate_content with rate limiting, retries and the circuit breaker"""
+        return self.caller.call(self.model.generate_content, prompt)
+    
+    @staticmethod
+    def _strip_code_fence(text):
+        """Remove a markdown code fence (and its 'json' language tag) around a response"""
+        if text.startswith('```'):
+            parts = text.split('```')
+            if len(parts) >= 2:
+                text = parts[1]
+                if text.startswith('json'):
+                    text = text[4:]
+                text = text.strip()
+        return text
+    
+    @staticmethod
+    def _report_error(error):
+        """Log an extraction error with a hint for the common causes"""
+        error_msg = str(error)
+        print(f"❌ Error extracting key points: {error_msg}")
+        
+        # Provide helpful error messages
+        if "404" in error_msg:
+            print("💡 Tip: Model not found. Try updating to a supported model.")
+        elif "API key" in error_msg.lower():
+            print("💡 Tip: Check your GEMINI_API_KEY in the .env file")
+        elif "quota" in error_msg.lower():
+            print("💡 Tip: You may have exceeded your API quota. Check Google AI Studio.")
+    
+    @staticmethod
+    def estimate_tokens(text):
+        """Rough token count (about 4 characters per token)"""
+        return len(text) // 4 + 1
+    
+    def pack(self, review_texts):
+        """
+        Split reviews into packs of at most batch_size reviews whose estimated
+        prompt tokens stay within batch_token_budget
+        
+        Returns:
+            list[list[int]]: Indexes into review_texts, one list per pack
+        """
+        packs = []
+        current = []
+        current_tokens = BATCH_PROMPT_OVERHEAD_TOKENS
+        for index, text in enumerate(review_texts):
+            tokens = self.estimate_tokens(text) + 8
+            if current and (len(current) >= self.batch_size or current_tokens + tokens > self.batch_token_budget):
+                packs.append(current)
+                current = []
+                current_tokens = BATCH_PROMPT_OVERHEAD_TOKENS
+            current.append(index)
+            current_tokens += tokens
+        if current:
+            packs.append(current)
+        return packs
+    
+    def _extract_pack(self, review_texts, language=None):
+        """
+        Extract key points for several reviews with one generate_content call
+        
+        Returns:
+            list: Key points list per review, or None where the item was missing or invalid
+        """
+        numbered = "\n\n".join(f"[{i}] {text}" for i, text in enumerate(review_texts))
+        language_name = LANGUAGE_NAMES.get(language)
+        if language_name:
+            instruction = f"Analyze each of the following {language_name} product reviews and extract the key points, written in {language_name}."
+        else:
+            instruction = ("Analyze each of the following product reviews and extract the key points.\n"
+                           "IMPORTANT: For each review, respond in the SAME language as that review.")
+        prompt = f"""
+{instruction}
+
+Reviews:
+{numbered}
+
+Extract 3-5 key points from each review. Return ONLY a JSON object that maps each
+review number (as a string) to a JSON array of strings, nothing else.
+Example format: {{"0": ["point 1", "point 2", "point 3"], "1": ["point 1", "point 2", "point 3"]}}
+
+Keep each point concise (1-2 sentences maximum).
+"""
+        response = self._generate(prompt)
+        try:
+            parsed = json.loads(self._strip_code_fence(response.text.strip()))
+        except json.JSONDecodeError as e:
+            print(f"⚠️ Warning: Could not parse batched Gemini response as JSON: {str(e)}")
+            return [None] * len(review_texts)
+        if not isinstance(parsed, dict):
+            return [None] * len(review_texts)
+        
+        results = []
+        for i in range(len(review_texts)):
+            points = parsed.get(str(i))
+            if isinstance(points, list) and points and all(isinstance(point, str) for point in points):
+                results.append(points[:5])
+            else:
+                results.append(None)
+        return results
+    
+    def extract_key_points_batch(self, review_texts, language=None):
+        """
+        Extract key points for many reviews, packing several into each request
+        
+        Items the batched response doesn't cover (or that fail to validate)
+        fall back to single-review extract_key_points calls, unless the pack
+        failed because Gemini is unavailable (quota, overload, open circuit):
+        then every item fails with that error instead of multiplying the
+        calls during an outage.
+        
+        Args:
+            review_texts (list[str]): Non-empty review texts (typically one pack from pack())
+            language (str): Detected language shared by all the reviews, None if unknown or mixed
+            
+        Returns:
+            list: Key points list or Exception per review, in input order
+        """
+        if any(not text or not text.strip() for text in review_texts):
+            raise ValueError("Review text cannot be empty")
+        
+        self.initializer.ensure()
+        
+        results = [None] * len(review_texts)
+        if len(review_texts) > 1:
+            try:
+                results = self._extract_pack(review_texts, language)
+            except Exception as e:
+                self._report_error(e)
+                if is_unavailable(e):
+                    return [e] * len(review_texts)
+        
+        for i, points in enumerate(results):
+            if points is None:
+                try:
+                    results[i] = self.extract_key_points(review_texts[i], language)
+                except Exception as e:
+                    results[i] = e
+        return results
+
+    def metric_families(self):
+        """Resilience counters and breaker state for the metrics endpoint"""
+        stats = self.caller.stats()
+        states = (CircuitBreaker.CLOSED, CircuitBreaker.HALF_OPEN, CircuitBreaker.OPEN)
+        return [
+            ('gemini_calls_total', 'counter', 'Gemini API calls attempted', [({}, stats['calls'])]),
+            ('gemini_retries_total', 'counter', 'Gemini API calls retried', [({}, stats['retries'])]),
+            ('gemini_failures_total', 'counter', 'Gemini API calls that failed after retries', [({}, stats['failures'])]),
+            ('gemini_circuit_state', 'gauge', 'Circuit breaker state (1 for the current state)',
+             [({'state': state}, int(stats['circuit_state'] == state)) for state in states]),
+            ('gemini_circuit_opened_total', 'counter', 'Times the circuit breaker opened', [({}, stats['circuit_opened'])]),
+            ('gemini_circuit_rejected_total', 'counter', 'Calls rejected by the open circuit', [({}, stats['circuit_rejected'])]),
+            ('gemini_rate_limit_wait_seconds_total', 'counter', 'Time spent waiting for rate-limit tokens',
+             [({}, stats['rate_limit_wait_seconds'])]),
+        ]
 
-# Global instance
+# Global instance (configured lazily)
 gemini_extractor = GeminiExtractor()
+registry.register_collector(gemini_extractor.metric_families)
 
@@ -0,0 +1,285 @@
+"""
+Local sentiment inference server
+One process loads the model and forks worker processes that share its
+weights copy-on-write; web processes send batches over a Unix socket
+instead of each loading their own ~1 GB copy
+
+Messages in both directions are a 4-byte big-endian length followed by a
+UTF-8 JSON object:
+
+    request   {"texts": [...], "options": {"top_k": null, ...}}  or  {"ping": true}
+    response  {"outputs": [...]}  or  {"error": "..."}  or  {"pong": true, "model": ...}
+"""
+import json
+import os
+import selectors
+import signal
+import socket
+import struct
+import threading
+import time
+
+_HEADER = struct.Struct('>I')
+
+# Largest message either side accepts (a batch of long reviews is well under this)
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+
+
+class InferenceServerError(RuntimeError):
+    """The inference server is unreachable or reported an error"""
+
+
+def send_message(sock, payload):
+    data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def _recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1024 * 1024))
+        if not chunk:
+            raise ConnectionError('Connection closed')
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def recv_message(sock):
+    (size,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    if size > MAX_MESSAGE_BYTES:
+        raise ValueError(f'Message of {size} bytes exceeds the {MAX_MESSAGE_BYTES} byte limit')
+    return json.loads(_recv_exact(sock, size).decode('utf-8'))
+
+
+class RemotePipeline:
+    """
+    Client with the same call interface as the transformers pipeline
+
+    Only the tokenizer is loaded locally (SentimentAnalyzer cuts long texts
+    with it); forward passes run in the inference server. Each calling
+    thread keeps its own connection.
+    """
+
+    def __init__(self, socket_path, model_name, token=None, timeout=30.0):
+        self.socket_path = socket_path
+        self.model_name = model_name
+        self.timeout = timeout
+        self._local = threading.local()
+        from transformers import AutoTokenizer
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name, token=token)
+
+    def _connection(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+            except OSError as e:
+                sock.close()
+                raise InferenceServerError(f'Cannot reach inference server at {self.socket_path}: {str(e)}')
+            self._local.sock = sock
+        return sock
+
+    def _close(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None:
+            self._local.sock = None
+            sock.close()
+
+    def request(self, payload):
+        """Send one request, reconnecting once if a kept-alive connection went stale"""
+        for attempt in range(2):
+            sock = self._connection()
+            try:
+                send_message(sock, payload)
+                response = recv_message(sock)
+                break
+            except (OSError, ConnectionError) as e:
+                self._close()
+                if attempt:
+                    raise InferenceServerError(f'Inference server request failed: {str(e)}')
+        if 'error' in response:
+            raise InferenceServerError(response['error'])
+        return response
+
+    def ping(self):
+        """Check the server is up and serving the expected model"""
+        response = self.request({'ping': True})
+        if response.get('model') != self.model_name:
+            raise InferenceServerError(
+                f"Inference server serves '{response.get('model')}', expected '{self.model_name}'")
+        return response
+
+    def __call__(self, texts, **options):
+        options.pop('batch_size', None)
+        return self.request({'texts': list(texts), 'options': options})['outputs']
+
+
+def _options_key(options):
+    return json.dumps(options or {}, sort_keys=True)
+
+
+class _Worker:
+    """
+    One forked worker: multiplexes client connections and scores every
+    request that is ready at the same time in a single forward pass
+    """
+
+    def __init__(self, listener, get_pipeline, model_name, batch_size):
+        self.listener = listener
+        self.get_pipeline = get_pipeline
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.selector = selectors.DefaultSelector()
+        self.running = True
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        self.listener.setblocking(False)
+        self.selector.register(self.listener, selectors.EVENT_READ)
+        analyzer = self.get_pipeline()
+        while self.running:
+            requests = []
+            for key, _ in self.selector.select(timeout=1.0):
+                if key.fileobj is self.listener:
+                    self._accept()
+                else:
+                    request = self._read(key.fileobj)
+                    if request is not None:
+                        requests.append(request)
+            if requests:
+                self._handle(analyzer, requests)
+
+    def _stop(self, signum, frame):
+        self.running = False
+
+    def _accept(self):
+        try:
+            conn, _ = self.listener.accept()
+        except (BlockingIOError, InterruptedError):
+            return  # Another worker took it
+        conn.setblocking(True)
+        conn.settimeout(30)
+        self.selector.register(conn, selectors.EVENT_READ)
+
+    def _read(self, conn):
+        try:
+            return conn, recv_message(conn)
+        except Exception:
+            self.selector.unregister(conn)
+            conn.close()
+            return None
+
+    def _reply(self, conn, payload):
+        try:
+            send_message(conn, payload)
+        except OSError:
+            self.selector.unregister(conn)
+            conn.close()
+
+    def _handle(self, analyzer, requests):
+        groups = {}
+        for conn, message in requests:
+            if message.get('ping'):
+                self._reply(conn, {'pong': True, 'model': self.model_name, 'pid': os.getpid()})
+            elif not isinstance(message.get('texts'), list):
+                self._reply(conn, {'error': 'texts must be a list'})
+            else:
+                options = message.get('options') or {}
+                groups.setdefault(_options_key(options), (options, []))[1].append((conn, message['texts']))
+
+        for options, pending in groups.values():
+            texts = [text for _, batch in pending for text in batch]
+            try:
+                outputs = analyzer(texts, batch_size=min(len(texts), self.batch_size), **options)
+            except Exception as e:
+                for conn, _ in pending:
+                    self._reply(conn, {'error': str(e)})
+                continue
+            position = 0
+            for conn, batch in pending:
+                self._reply(conn, {'outputs': outputs[position:position + len(batch)]})
+                position += len(batch)
+
+
+def serve(socket_path, workers=2, backend='pytorch', model_name=None, token=None, num_threads=None,
+          onnx_path=None, batch_size=64):
+    """
+    Load the model and serve it from forked worker processes until SIGTERM/SIGINT
+
+    With the PyTorch backends the model is loaded once before forking so the
+    workers share its weights copy-on-write. ONNX Runtime sessions are not
+    fork-safe, so with the onnx backend every worker builds its own session.
+    """
+    from .sentiment_backends import build_pipeline
+
+    def load():
+        return build_pipeline(backend, model_name, token=token, num_threads=num_threads, onnx_path=onnx_path)
+
+    started = time.perf_counter()
+    preloaded = load() if backend != 'onnx' else None
+    if preloaded is not None:
+        print(f"✅ Sentiment model loaded in {round(time.perf_counter() - started, 3)}s, sharing it with {workers} workers")
+
+    def get_pipeline():
+        if preloaded is None:
+            return load()
+        if num_threads:
+            import torch
+            torch.set_num_threads(num_threads)
+        return preloaded
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    listener.listen(128)
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _Worker(listener, get_pipeline, model_name, batch_size).run()
+            except Exception as e:
+                print(f"❌ Inference worker {os.getpid()} crashed: {str(e)}")
+                os._exit(1)
+            os._exit(0)
+        return pid
+
+    children = {spawn() for _ in range(workers)}
+    print(f"🚀 Inference server listening on {socket_path} with {workers} workers")
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    try:
+        while children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            children.discard(pid)
+            if not stopping:
+                print(f"⚠️ Warning: Inference worker {pid} exited ({status}), restarting")
+                children.add(spawn())
+    finally:
+        listener.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        print("👋 Inference server stopped")
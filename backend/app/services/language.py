@@ -0,0 +1,132 @@
+"""
+Local language identification for incoming reviews
+Runs before sentiment and key-point extraction so each review can be routed
+to a per-language sentiment model and a language-specific Gemini prompt
+
+    stopwords  Built-in function-word scoring for LANGUAGE_ID_LANGUAGES
+               (microseconds per review, no dependencies)
+    fasttext   fastText language-ID model such as lid.176.ftz
+               (requires fasttext and LANGUAGE_ID_MODEL_PATH)
+"""
+import os
+import re
+from dotenv import load_dotenv
+from .lazy import LazyInitializer
+from ..metrics import LANGUAGES_DETECTED
+
+load_dotenv()
+
+LANGUAGE_ID_BACKENDS = ('stopwords', 'fasttext', 'off')
+
+# Names used in Gemini prompts
+LANGUAGE_NAMES = {
+    'id': 'Indonesian',
+    'en': 'English',
+    'ms': 'Malay',
+    'jv': 'Javanese',
+    'su': 'Sundanese',
+}
+
+# Frequent function words, informal spellings and review vocabulary per language
+STOPWORDS = {
+    'id': frozenset((
+        'yang', 'yg', 'dan', 'di', 'ke', 'dari', 'ini', 'itu', 'untuk', 'utk', 'dengan', 'dgn', 'tidak', 'tdk',
+        'gak', 'ga', 'nggak', 'enggak', 'sudah', 'udah', 'sangat', 'banget', 'bgt', 'saya', 'aku', 'kami', 'juga',
+        'tapi', 'tetapi', 'ada', 'akan', 'bisa', 'karena', 'krn', 'sih', 'aja', 'saja', 'lagi', 'sekali', 'belum',
+        'barang', 'barangnya', 'produk', 'produknya', 'pengiriman', 'harga', 'sesuai', 'cukup', 'kurang', 'agak',
+        'tp', 'dpt', 'dapat', 'lebih', 'seperti', 'kalau', 'kalo', 'oleh', 'pada', 'dalam', 'tak', 'nya', 'mau',
+        'bagus', 'mantap', 'cepat', 'lambat', 'murah', 'mahal', 'jelek', 'kecewa', 'rapi', 'ramah', 'penjual',
+    )),
+    'en': frozenset((
+        'the', 'and', 'is', 'are', 'was', 'were', 'it', 'this', 'that', 'of', 'to', 'in', 'for', 'with', 'not',
+        'but', 'very', 'my', 'i', 'you', 'they', 'have', 'has', 'had', 'be', 'been', 'on', 'at', 'so', 'as',
+        'would', 'will', 'just', 'really', 'too', 'no', 'product', 'quality', 'shipping', 'price', 'does', 'do',
+        'did', 'an', 'a', 'or', 'if', 'than', 'after', 'its', "it's", 'we', 'me', 'all', 'what', 'there', 'from',
+        'good', 'great', 'bad', 'fast', 'slow', 'nice', 'love', 'cheap', 'delivery', 'seller', 'broken', 'works',
+    )),
+}
+
+_WORD = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?", re.UNICODE)
+
+
+class LanguageDetector:
+    """
+    Detects the language of a review
+
+    detect() returns an ISO 639-1 code, or None when no language reaches
+    min_confidence (the review then takes the multilingual path).
+    """
+
+    def __init__(self):
+        self.backend = os.getenv('LANGUAGE_ID_BACKEND', 'stopwords')
+        if self.backend not in LANGUAGE_ID_BACKENDS:
+            print(f"⚠️ Warning: Unknown LANGUAGE_ID_BACKEND '{self.backend}', using stopwords")
+            self.backend = 'stopwords'
+        self.model_path = os.getenv('LANGUAGE_ID_MODEL_PATH') or None
+        self.min_confidence = float(os.getenv('LANGUAGE_ID_MIN_CONFIDENCE', '0.5'))
+        languages = [code.strip() for code in os.getenv('LANGUAGE_ID_LANGUAGES', 'id,en').split(',') if code.strip()]
+        self.stopwords = {code: STOPWORDS[code] for code in languages if code in STOPWORDS}
+        self.model = None
+        self.initializer = LazyInitializer('language detector', self._initialize_model)
+
+    @property
+    def enabled(self):
+        return self.backend != 'off'
+
+    def _initialize_model(self):
+        if self.backend != 'fasttext':
+            return
+        if not self.model_path:
+            raise ValueError("LANGUAGE_ID_BACKEND=fasttext requires LANGUAGE_ID_MODEL_PATH (e.g. lid.176.ftz)")
+        try:
+            import fasttext
+        except ImportError:
+            raise ImportError("The fasttext language-ID backend requires fasttext: pip install fasttext-wheel")
+        self.model = fasttext.load_model(self.model_path)
+        print(f"✅ Language detector loaded fastText model from {self.model_path}")
+
+    def _detect_stopwords(self, text):
+        words = [word.lower() for word in _WORD.findall(text)]
+        hits = {code: sum(1 for word in words if word in stopwords) for code, stopwords in self.stopwords.items()}
+        total = sum(hits.values())
+        if not total:
+            return None, 0.0
+        code, best = max(hits.items(), key=lambda item: item[1])
+        # Texts with a single function word are too short to call
+        return code, (best / total) * min(1.0, best / 2.0)
+
+    def _detect_fasttext(self, text):
+        labels, scores = self.model.predict(' '.join(text.split()), k=1)
+        if not labels:
+            return None, 0.0
+        return labels[0].replace('__label__', ''), float(scores[0])
+
+    def detect_with_confidence(self, text):
+        """
+        Detect the language of text
+
+        Returns:
+            tuple: (language code or None, confidence 0-1)
+        """
+        if not self.enabled or not text or not text.strip():
+            return None, 0.0
+        if self.backend == 'fasttext':
+            self.initializer.ensure()
+            language, confidence = self._detect_fasttext(text)
+        else:
+            language, confidence = self._detect_stopwords(text)
+        if confidence < self.min_confidence:
+            language = None
+        LANGUAGES_DETECTED.inc(language=language or 'unknown')
+        return language, round(confidence, 4)
+
+    def detect(self, text):
+        """Language code of text, or None when undetermined"""
+        return self.detect_with_confidence(text)[0]
+
+    def detect_many(self, texts):
+        return [self.detect(text) for text in texts]
+
+
+# Global instance
+language_detector = LanguageDetector()
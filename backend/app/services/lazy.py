@@ -0,0 +1,73 @@
+"""
+Thread-safe lazy initialization for the AI services
+Heavy setup (loading torch/transformers weights, configuring Gemini) runs on
+first use or from a background warm-up, never at import time
+"""
+import threading
+import time
+
+
+class LazyInitializer:
+    """
+    Runs an init function exactly once, on demand
+
+    Concurrent callers block until the first one finishes. A failed init is
+    remembered and re-raised, and retried on the next ensure() call.
+    """
+
+    def __init__(self, name, init_func):
+        self.name = name
+        self._init_func = init_func
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self.error = None
+        self.seconds = None
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def ensure(self):
+        """Initialize if that hasn't happened yet; raises if initialization fails"""
+        if self._ready.is_set():
+            return
+        with self._lock:
+            if self._ready.is_set():
+                return
+            started = time.perf_counter()
+            try:
+                self._init_func()
+            except Exception as e:
+                self.error = e
+                raise
+            self.seconds = round(time.perf_counter() - started, 3)
+            self.error = None
+            self._ready.set()
+            print(f"⏱️ {self.name} initialized in {self.seconds}s")
+
+    def mark_ready(self):
+        """Treat the service as initialized, e.g. after a stub was installed in its place"""
+        with self._lock:
+            self.error = None
+            self.seconds = 0.0
+            self._ready.set()
+
+    def warm_up_async(self):
+        """Start initialization on a background thread"""
+        def run():
+            try:
+                self.ensure()
+            except Exception as e:
+                print(f"❌ Background warm-up of {self.name} failed: {str(e)}")
+
+        thread = threading.Thread(target=run, name=f'warmup-{self.name}', daemon=True)
+        thread.start()
+        return thread
+
+    def status(self):
+        """Readiness summary for health checks"""
+        return {
+            'ready': self.ready,
+            'init_seconds': self.seconds,
+            'error': str(self.error) if self.error is not None and not self.ready else None
+        }
@@ -0,0 +1,249 @@
+"""
+Client-side resilience for external API calls
+Token-bucket rate limiting, retries with exponential backoff and jitter, and
+a circuit breaker that fails fast while the API is unhealthy
+"""
+import random
+import re
+import threading
+import time
+
+# Errors worth retrying: quota/rate limits, server errors, timeouts
+RETRYABLE_ERROR_NAMES = (
+    'ResourceExhausted', 'TooManyRequests', 'ServiceUnavailable',
+    'InternalServerError', 'DeadlineExceeded', 'GatewayTimeout', 'Timeout'
+)
+RETRYABLE_STATUS_CODES = frozenset((429, 500, 502, 503, 504))
+RETRYABLE_ERROR_MARKERS = ('quota', 'rate limit', 'unavailable', 'timed out')
+
+# Client libraries without a status attribute put the HTTP status first ("503 ...")
+_LEADING_STATUS = re.compile(r'^\s*(\d{3})\b')
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the API while the circuit breaker is open"""
+
+
+class RateLimitTimeoutError(Exception):
+    """Raised when no rate-limit token becomes available in time"""
+
+
+def status_code(error):
+    """
+    HTTP status of an API error, from its code/status_code attribute or a
+    leading status in the message
+
+    Returns:
+        int: The status, or None when the error doesn't carry one
+    """
+    for attribute in ('code', 'status_code'):
+        value = getattr(error, attribute, None)
+        if isinstance(value, int) and 100 <= value <= 599:
+            return value
+    match = _LEADING_STATUS.match(str(error))
+    return int(match.group(1)) if match else None
+
+
+def is_retryable(error):
+    """True for transient errors (quota, 5xx, timeouts) that may succeed on retry"""
+    if isinstance(error, (CircuitOpenError, RateLimitTimeoutError)):
+        return False
+    if type(error).__name__ in RETRYABLE_ERROR_NAMES:
+        return True
+    if status_code(error) in RETRYABLE_STATUS_CODES:
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in RETRYABLE_ERROR_MARKERS)
+
+
+def is_unavailable(error):
+    """True when the API is unreachable or overloaded rather than rejecting the input"""
+    return isinstance(error, (CircuitOpenError, RateLimitTimeoutError)) or is_retryable(error)
+
+
+class TokenBucket:
+    """Token-bucket rate limiter: rate tokens per second, up to burst tokens saved"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def split(self, parts):
+        """Keep 1/parts of the rate and burst, for one of parts processes sharing a quota"""
+        with self._lock:
+            self.rate /= parts
+            self.burst = max(1, self.burst // parts)
+            self._tokens = min(self._tokens, float(self.burst))
+
+    def acquire(self, timeout=None):
+        """
+        Take one token, sleeping until one is available
+
+        Raises:
+            RateLimitTimeoutError: If the wait would exceed timeout seconds
+        """
+        if self.rate <= 0:
+            return
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    if waited:
+                        self.waits += 1
+                        self.wait_seconds += waited
+                    return
+                delay = (1 - self._tokens) / self.rate
+            if timeout is not None and waited + delay > timeout:
+                raise RateLimitTimeoutError(f'Rate limit: no request slot available within {timeout:g}s')
+            time.sleep(delay)
+            waited += delay
+
+
+class CircuitBreaker:
+    """
+    Classic closed / open / half-open breaker
+
+    After failure_threshold consecutive failures the circuit opens and calls
+    fail fast for reset_timeout seconds; then one trial call is let through
+    (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self.opened_count = 0
+        self.rejected_count = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go through now"""
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    self.rejected_count += 1
+                    raise CircuitOpenError('Circuit breaker is open: Gemini API is unhealthy, failing fast')
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self._state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    self.rejected_count += 1
+                    raise CircuitOpenError('Circuit breaker is half-open: waiting for trial request')
+                self._trial_in_flight = True
+
+    def release_trial(self):
+        """Give back a half-open trial slot taken by before_call when no call was made"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.opened_count += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class ResilientCaller:
+    """Runs calls through a rate limiter, retry loop and circuit breaker"""
+
+    def __init__(self, rate_limiter, breaker, max_retries=3, backoff_base=0.5, backoff_max=8.0, acquire_timeout=30.0):
+        self.rate_limiter = rate_limiter
+        self.breaker = breaker
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.acquire_timeout = acquire_timeout
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def backoff(self, attempt):
+        """Full-jitter exponential backoff delay for a retry attempt (1-based)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1))))
+
+    def call(self, func, *args, **kwargs):
+        """
+        Call func with rate limiting, retries and the circuit breaker
+
+        Non-retryable errors are raised immediately; retryable ones are
+        retried up to max_retries times before the last error is raised.
+        """
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            try:
+                self.rate_limiter.acquire(timeout=self.acquire_timeout)
+            except BaseException:
+                # No call was made, so a half-open breaker must not wait for its outcome
+                self.breaker.release_trial()
+                raise
+            self._count('calls')
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                retryable = is_retryable(e)
+                if retryable:
+                    self.breaker.record_failure()
+                else:
+                    # The API answered; the request itself was bad
+                    self.breaker.record_success()
+                if not retryable or attempt >= self.max_retries:
+                    self._count('failures')
+                    raise
+                attempt += 1
+                self._count('retries')
+                time.sleep(self.backoff(attempt))
+                continue
+            self.breaker.record_success()
+            return result
+
+    def stats(self):
+        """Counters and breaker state for metrics"""
+        with self._lock:
+            counters = {'calls': self.calls, 'retries': self.retries, 'failures': self.failures}
+        return {
+            **counters,
+            'circuit_state': self.breaker.state,
+            'circuit_opened': self.breaker.opened_count,
+            'circuit_rejected': self.breaker.rejected_count,
+            'rate_limit_waits': self.rate_limiter.waits,
+            'rate_limit_wait_seconds': round(self.rate_limiter.wait_seconds, 3)
+        }
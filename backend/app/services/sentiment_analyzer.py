@@ -1,79 +1,432 @@
-from transformers import pipeline
 import os
+import queue
+import threading
+import time
 from dotenv import load_dotenv
+from .sentiment_backends import build_pipeline
+from .inference_server import RemotePipeline
+from .lazy import LazyInitializer
+from ..metrics import registry, SENTIMENT_BATCH_SIZE, SENTIMENT_TRUNCATED, SENTIMENT_TRUNCATED_TOKENS, SENTIMENT_CHUNKED
 
 load_dotenv()
 
+# XLM-RoBERTa returns: negative, neutral, positive
+SENTIMENT_MAP = {
+    'positive': 'positive',
+    'negative': 'negative',
+    'neutral': 'neutral',
+    'pos': 'positive',
+    'neg': 'negative',
+    'neu': 'neutral'
+}
+
+# How reviews longer than the model's input are handled
+LONG_TEXT_MODES = ('truncate', 'chunk')
+
+
+def parse_language_models(value):
+    """
+    Parse SENTIMENT_LANGUAGE_MODELS, e.g. "en=distilbert/distilbert-base-uncased-finetuned-sst-2-english,id=..."
+
+    Returns:
+        dict: {language_code: model_name}
+    """
+    models = {}
+    for item in value.split(','):
+        language, _, model_name = item.partition('=')
+        if language.strip() and model_name.strip():
+            models[language.strip()] = model_name.strip()
+    return models
+
+
+class _PendingText:
+    """A single analyze() call waiting for the batch worker to score it"""
+
+    __slots__ = ('text', 'done', 'result', 'error')
+
+    def __init__(self, text):
+        self.text = text
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
 class SentimentAnalyzer:
     """
     Sentiment analysis service using Hugging Face Transformers
     Model: cardiffnlp/twitter-xlm-roberta-base-sentiment-multilingual
     Supports multiple languages including Indonesian and English
+
+    Concurrent analyze() callers are micro-batched: each caller puts its text
+    on a shared queue and a single inference worker scores up to
+    SENTIMENT_BATCH_SIZE texts (or whatever arrived within
+    SENTIMENT_BATCH_WAIT_MS) in one padded forward pass.
+
+    The runtime is chosen with SENTIMENT_BACKEND (pytorch, pytorch-int8 or
+    onnx, see sentiment_backends). The model is loaded lazily on first use
+    or by warm_up().
+
+    Long reviews are cut on token boundaries using the model's tokenizer.
+    With SENTIMENT_LONG_TEXT=truncate (default) only the first
+    SENTIMENT_MAX_TOKENS tokens are scored; with chunk the review is split
+    into overlapping token windows that are scored in the same forward pass
+    and combined, weighted by window length.
+
+    With SENTIMENT_INFERENCE_SOCKET set, forward passes are sent to a local
+    inference server (review-inference-server) and only the tokenizer is
+    loaded in this process.
+
+    SENTIMENT_LANGUAGE_MODELS adds smaller per-language models (each with its
+    own batch worker, always loaded in-process); for_language() picks the
+    analyzer for a detected language and falls back to the multilingual one.
+    Their labels must map through SENTIMENT_MAP.
     """
-    
-    def __init__(self):
+
+    def __init__(self, model_name=None, language=None):
         # Using multilingual model that supports Indonesian
-        self.model_name = "cardiffnlp/twitter-xlm-roberta-base-sentiment-multilingual"
+        self.model_name = model_name or os.getenv('SENTIMENT_MODEL', "cardiffnlp/twitter-xlm-roberta-base-sentiment-multilingual")
+        self.language = language
         self.token = os.getenv('HUGGINGFACE_ACCESS_TOKEN')
+        self.backend = os.getenv('SENTIMENT_BACKEND', 'pytorch')
+        self.num_threads = int(os.getenv('SENTIMENT_NUM_THREADS', '0')) or None
+        self.onnx_path = os.getenv('SENTIMENT_ONNX_PATH') or None
+        # The inference server only serves the multilingual model
+        self.inference_socket = None if language else os.getenv('SENTIMENT_INFERENCE_SOCKET') or None
+        self.inference_timeout = float(os.getenv('SENTIMENT_INFERENCE_TIMEOUT_SECONDS', '30'))
+        self.batch_size = max(1, int(os.getenv('SENTIMENT_BATCH_SIZE', '16')))
+        self.batch_wait = max(0.0, float(os.getenv('SENTIMENT_BATCH_WAIT_MS', '5')) / 1000.0)
+        self.long_text_mode = os.getenv('SENTIMENT_LONG_TEXT', 'truncate')
+        if self.long_text_mode not in LONG_TEXT_MODES:
+            print(f"⚠️ Warning: Unknown SENTIMENT_LONG_TEXT '{self.long_text_mode}', using truncate")
+            self.long_text_mode = 'truncate'
+        self.max_tokens = int(os.getenv('SENTIMENT_MAX_TOKENS', '512'))
+        self.chunk_overlap = max(0, int(os.getenv('SENTIMENT_CHUNK_OVERLAP', '32')))
+        self.max_chunks = max(1, int(os.getenv('SENTIMENT_MAX_CHUNKS', '8')))
         self.analyzer = None
-        self._initialize_model()
-    
+        self._queue = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self.initializer = LazyInitializer(
+            f'sentiment model ({language})' if language else 'sentiment model', self._initialize_model)
+        self.routes = {}
+        if language is None:
+            self.configure_routes(parse_language_models(os.getenv('SENTIMENT_LANGUAGE_MODELS', '')))
+
     def _initialize_model(self):
         """Initialize the sentiment analysis pipeline"""
         try:
-            self.analyzer = pipeline(
-                "sentiment-analysis",
-                model=self.model_name,
-                token=self.token
+            if self.inference_socket:
+                analyzer = RemotePipeline(
+                    self.inference_socket,
+                    self.model_name,
+                    token=self.token,
+                    timeout=self.inference_timeout
+                )
+                server = analyzer.ping()
+                self.analyzer = analyzer
+                print(f"✅ Sentiment analyzer using inference server at {self.inference_socket} (worker pid {server['pid']})")
+                return
+            self.analyzer = build_pipeline(
+                self.backend,
+                self.model_name,
+                token=self.token,
+                num_threads=self.num_threads,
+                onnx_path=self.onnx_path
             )
-            print(f"✅ Sentiment analyzer initialized with multilingual model (supports Indonesian & English)")
+            if self.language:
+                print(f"✅ Sentiment analyzer for '{self.language}' initialized with {self.model_name} on {self.backend} backend")
+            else:
+                print(f"✅ Sentiment analyzer initialized with multilingual model on {self.backend} backend (supports Indonesian & English)")
         except Exception as e:
             print(f"❌ Error initializing sentiment analyzer: {str(e)}")
             raise
-    
+
+    def warm_up(self, background=True):
+        """Load the model (and the per-language models) now instead of on the first request"""
+        for route in self.routes.values():
+            route.warm_up(background)
+        if background:
+            return self.initializer.warm_up_async()
+        self.initializer.ensure()
+
+    def configure_routes(self, language_models):
+        """
+        Set the per-language models
+
+        Args:
+            language_models (dict): {language_code: model_name}
+        """
+        self.routes = {
+            language: SentimentAnalyzer(model_name, language=language)
+            for language, model_name in language_models.items()
+        }
+
+    def status(self):
+        """
+        Readiness for health checks: ready only once this model and every
+        per-language model are initialized
+
+        Returns:
+            dict: LazyInitializer.status() plus the model name, and one entry per routed language
+        """
+        status = {**self.initializer.status(), 'model': self.model_name}
+        if self.routes:
+            status['languages'] = {language: route.status() for language, route in sorted(self.routes.items())}
+            status['ready'] = status['ready'] and all(route['ready'] for route in status['languages'].values())
+        return status
+
+    def for_language(self, language):
+        """Analyzer for reviews in language: its per-language model if one is configured, else this one"""
+        return self.routes.get(language, self)
+
+    def install_pipeline(self, analyzer, model_name=None):
+        """
+        Use a ready-made pipeline (or any callable with the same interface)
+        instead of loading the model, e.g. an offline stub for benchmarks
+        """
+        self.analyzer = analyzer
+        if model_name:
+            self.model_name = model_name
+        self.initializer.mark_ready()
+
+    @property
+    def cache_key(self):
+        """Model identifier for the analysis cache; chunked scores differ from truncated ones"""
+        if self.long_text_mode == 'chunk':
+            return f'{self.model_name}:chunk'
+        return self.model_name
+
+    def _ensure_worker(self):
+        """Start the batch inference worker thread on first use"""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._batch_loop,
+                    name='sentiment-batcher',
+                    daemon=True
+                )
+                self._worker.start()
+
+    def _collect_batch(self):
+        """Block for the first pending text, then gather more until the batch is full or the wait expires"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _batch_loop(self):
+        """Inference worker: score queued texts in batches and wake up each caller"""
+        while True:
+            batch = self._collect_batch()
+            try:
+                results = self._predict([item.text for item in batch])
+                for item, result in zip(batch, results):
+                    item.result = result
+            except Exception as e:
+                print(f"❌ Error analyzing sentiment batch of {len(batch)}: {str(e)}")
+                for item in batch:
+                    item.error = e
+            finally:
+                for item in batch:
+                    item.done.set()
+
+    def _token_offsets(self, text):
+        """
+        Character span of every model token in text, plus the token budget
+
+        Texts too short to possibly exceed the budget skip tokenization. When
+        the pipeline has no fast tokenizer (e.g. a benchmark stub) characters
+        stand in for tokens.
+        """
+        tokenizer = getattr(self.analyzer, 'tokenizer', None)
+        if tokenizer is None or not getattr(tokenizer, 'is_fast', False):
+            return None, self.max_tokens
+
+        budget = self.max_tokens
+        model_max = getattr(tokenizer, 'model_max_length', None)
+        if model_max and model_max < 1000000:
+            budget = min(budget, model_max)
+        budget = max(1, budget - tokenizer.num_special_tokens_to_add())
+
+        # SentencePiece can emit a bare word-boundary token before a
+        # character, so a text needs more than budget / 2 characters to overflow
+        if len(text) <= budget // 2:
+            return None, budget
+        encoding = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+        return encoding['offset_mapping'], budget
+
+    def _segments(self, text):
+        """
+        Split text into the pieces that are actually scored
+
+        Returns:
+            tuple: ([(segment_text, token_count), ...], tokens left unscored)
+        """
+        offsets, budget = self._token_offsets(text)
+        if offsets is None:
+            if len(text) <= budget:
+                return [(text, len(text))], 0
+            offsets = [(i, i + 1) for i in range(len(text))]
+        if len(offsets) <= budget:
+            return [(text, len(offsets))], 0
+
+        if self.long_text_mode != 'chunk':
+            return [(text[:offsets[budget - 1][1]], budget)], len(offsets) - budget
+
+        step = max(1, budget - min(self.chunk_overlap, budget // 2))
+        segments = []
+        for start in range(0, len(offsets), step):
+            window = offsets[start:start + budget]
+            segments.append((text[window[0][0]:window[-1][1]], len(window)))
+            if start + budget >= len(offsets) or len(segments) == self.max_chunks:
+                break
+        return segments, max(0, len(offsets) - (start + budget))
+
+    def _predict(self, texts):
+        """
+        Score texts in one padded forward pass and map each output to our format
+
+        Every long text contributes one input per chunk to the same pass.
+        """
+        prepared = [self._segments(text) for text in texts]
+        inputs = [segment for segments, _ in prepared for segment, _ in segments]
+        SENTIMENT_BATCH_SIZE.observe(len(inputs))
+        truncated = sum(1 for _, dropped in prepared if dropped)
+        if truncated:
+            SENTIMENT_TRUNCATED.inc(truncated)
+            SENTIMENT_TRUNCATED_TOKENS.inc(sum(dropped for _, dropped in prepared))
+        chunked = sum(1 for segments, _ in prepared if len(segments) > 1)
+        if chunked:
+            SENTIMENT_CHUNKED.inc(chunked)
+
+        # Chunks are combined from the full label distribution, not just the top label
+        options = {'top_k': None} if self.long_text_mode == 'chunk' else {}
+        outputs = self.analyzer(inputs, batch_size=len(inputs), truncation=True, **options)
+
+        results = []
+        position = 0
+        for segments, dropped in prepared:
+            scores = self._combine(
+                outputs[position:position + len(segments)],
+                [tokens for _, tokens in segments]
+            )
+            position += len(segments)
+            result = self._format_result(scores)
+            result['truncated'] = dropped > 0
+            result['chunks'] = len(segments)
+            results.append(result)
+        return results
+
+    @staticmethod
+    def _label_scores(output):
+        """{label: score} from a pipeline output (top label only, or all labels with top_k=None)"""
+        if isinstance(output, dict):
+            output = [output]
+        return {item['label'].lower(): item['score'] for item in output}
+
+    @classmethod
+    def _combine(cls, outputs, weights):
+        """Length-weighted average of the label scores of a text's chunks"""
+        if len(outputs) == 1:
+            return cls._label_scores(outputs[0])
+        total = float(sum(weights))
+        combined = {}
+        for output, weight in zip(outputs, weights):
+            for label, score in cls._label_scores(output).items():
+                combined[label] = combined.get(label, 0.0) + score * weight / total
+        return combined
+
+    @staticmethod
+    def _format_result(scores):
+        """Map {label: score} to {'sentiment', 'confidence'} using the top label"""
+        label, score = max(scores.items(), key=lambda item: item[1])
+        return {
+            'sentiment': SENTIMENT_MAP.get(label, 'neutral'),
+            'confidence': round(score, 4)
+        }
+
     def analyze(self, text):
         """
         Analyze sentiment of given text
-        
+
         Args:
             text (str): Text to analyze (supports multiple languages)
-            
+
         Returns:
             dict: {
                 'sentiment': 'positive' | 'negative' | 'neutral',
-                'confidence': float (0-1)
+                'confidence': float (0-1),
+                'truncated': bool (part of the text was not scored),
+                'chunks': int (token windows scored)
             }
         """
         if not text or not text.strip():
             raise ValueError("Text cannot be empty")
-        
+
+        self.initializer.ensure()
+
+        if self.batch_size == 1:
+            try:
+                return self._predict([text])[0]
+            except Exception as e:
+                print(f"❌ Error analyzing sentiment: {str(e)}")
+                raise
+
+        self._ensure_worker()
+        pending = _PendingText(text)
+        self._queue.put(pending)
+        pending.done.wait()
+
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def analyze_batch(self, texts):
+        """
+        Analyze sentiment of many texts in batched forward passes
+
+        Used by bulk ingestion, which already holds a whole chunk of texts and
+        doesn't need to go through the micro-batching queue.
+
+        Args:
+            texts (list[str]): Non-empty texts to analyze
+
+        Returns:
+            list[dict]: One result dict per input text, as returned by analyze()
+        """
+        if any(not text or not text.strip() for text in texts):
+            raise ValueError("Text cannot be empty")
+
+        self.initializer.ensure()
+
+        results = []
         try:
-            result = self.analyzer(text[:512])[0]  # Limit to 512 tokens
-            
-            # Map result to our format
-            label = result['label'].lower()
-            confidence = result['score']
-            
-            # XLM-RoBERTa returns: negative, neutral, positive
-            sentiment_map = {
-                'positive': 'positive',
-                'negative': 'negative',
-                'neutral': 'neutral',
-                'pos': 'positive',
-                'neg': 'negative',
-                'neu': 'neutral'
-            }
-            
-            sentiment = sentiment_map.get(label, 'neutral')
-            
-            return {
-                'sentiment': sentiment,
-                'confidence': round(confidence, 4)
-            }
+            for start in range(0, len(texts), self.batch_size):
+                results.extend(self._predict(texts[start:start + self.batch_size]))
         except Exception as e:
-            print(f"❌ Error analyzing sentiment: {str(e)}")
+            print(f"❌ Error analyzing sentiment batch: {str(e)}")
             raise
+        return results
 
-# Global instance
-sentiment_analyzer = SentimentAnalyzer()
+    def metric_families(self):
+        """Queue depth for the metrics endpoint"""
+        return [
+            ('sentiment_queue_depth', 'gauge', 'Texts waiting for the sentiment batch worker',
+             [({}, self._queue.qsize())] + [
+                 ({'language': language}, route._queue.qsize()) for language, route in sorted(self.routes.items())
+             ]),
+        ]
 
+# Global instance (the model itself is loaded lazily)
+sentiment_analyzer = SentimentAnalyzer()
+registry.register_collector(sentiment_analyzer.metric_families)
@@ -0,0 +1,113 @@
+"""
+Inference backends for the sentiment model
+Every backend builds a transformers text-classification pipeline, so
+SentimentAnalyzer maps outputs the same way regardless of the runtime:
+
+    pytorch       Eager PyTorch (baseline)
+    pytorch-int8  PyTorch with Linear layers dynamically quantized to int8
+    onnx          ONNX Runtime session (requires optimum[onnxruntime])
+"""
+import os
+import time
+
+BACKENDS = ('pytorch', 'pytorch-int8', 'onnx')
+
+
+def _load_onnx_model(model_name, token, num_threads, onnx_path):
+    try:
+        import onnxruntime
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+    except ImportError:
+        raise ImportError("The onnx backend requires optimum[onnxruntime]: pip install 'optimum[onnxruntime]'")
+
+    session_options = onnxruntime.SessionOptions()
+    session_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if num_threads:
+        session_options.intra_op_num_threads = num_threads
+        session_options.inter_op_num_threads = 1
+
+    # Reuse a previously exported model; exporting takes longer than loading
+    if onnx_path and os.path.isdir(onnx_path):
+        return ORTModelForSequenceClassification.from_pretrained(onnx_path, session_options=session_options)
+
+    model = ORTModelForSequenceClassification.from_pretrained(
+        model_name,
+        export=True,
+        token=token,
+        session_options=session_options
+    )
+    if onnx_path:
+        model.save_pretrained(onnx_path)
+        print(f"💾 Exported ONNX sentiment model to {onnx_path}")
+    return model
+
+
+def build_pipeline(backend, model_name, token=None, num_threads=None, onnx_path=None):
+    """
+    Build a sentiment-analysis pipeline on the given backend
+
+    Args:
+        backend (str): One of BACKENDS
+        model_name (str): Hugging Face model id
+        token (str): Hugging Face access token
+        num_threads (int): Intra-op CPU threads (None keeps the runtime default)
+        onnx_path (str): Directory to load/save the exported ONNX model
+
+    Returns:
+        transformers.Pipeline
+    """
+    from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown sentiment backend '{backend}', expected one of: {', '.join(BACKENDS)}")
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name, token=token)
+
+    if backend == 'onnx':
+        model = _load_onnx_model(model_name, token, num_threads, onnx_path)
+    else:
+        import torch
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        model = AutoModelForSequenceClassification.from_pretrained(model_name, token=token)
+        model.eval()
+        if backend == 'pytorch-int8':
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
+
+
+def parity_report(texts, model_name, backends=BACKENDS, token=None, num_threads=None, onnx_path=None, batch_size=16):
+    """
+    Compare each backend's labels and scores with the PyTorch baseline
+
+    Args:
+        texts (list[str]): Sample reviews to score
+        backends (iterable): Backends to compare; 'pytorch' is always the baseline
+
+    Returns:
+        dict: Per backend, label agreement with the baseline, the largest and
+        mean absolute score difference, and throughput in texts/second
+    """
+    outputs = {}
+    timings = {}
+    for backend in ['pytorch'] + [b for b in backends if b != 'pytorch']:
+        classifier = build_pipeline(backend, model_name, token, num_threads, onnx_path)
+        started = time.perf_counter()
+        outputs[backend] = classifier(texts, batch_size=batch_size, truncation=True)
+        timings[backend] = time.perf_counter() - started
+
+    baseline = outputs['pytorch']
+    report = {}
+    for backend, results in outputs.items():
+        label_matches = sum(1 for a, b in zip(baseline, results) if a['label'].lower() == b['label'].lower())
+        score_diffs = [abs(a['score'] - b['score']) for a, b in zip(baseline, results)]
+        report[backend] = {
+            'samples': len(texts),
+            'label_agreement': round(label_matches / len(texts), 4) if texts else None,
+            'label_mismatches': len(texts) - label_matches,
+            'max_score_diff': round(max(score_diffs), 4) if score_diffs else None,
+            'mean_score_diff': round(sum(score_diffs) / len(score_diffs), 4) if score_diffs else None,
+            'texts_per_second': round(len(texts) / timings[backend], 2) if timings[backend] else None
+        }
+    return report
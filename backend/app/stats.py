@@ -0,0 +1,164 @@
+"""
+Sentiment rollups
+Analyzed reviews are folded into hourly (bucket, sentiment) rows as they are
+stored, so dashboard queries cost the same no matter how many reviews exist
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy.dialects import postgresql, sqlite
+from .models import Review, SentimentRollup
+
+_UPSERT_DIALECTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert
+}
+
+
+def bucket_of(created_at):
+    """Truncate a timestamp to its hourly bucket"""
+    return created_at.replace(minute=0, second=0, microsecond=0)
+
+
+def _aggregate(reviews):
+    totals = defaultdict(lambda: [0, 0.0])
+    for created_at, sentiment, confidence in reviews:
+        if created_at is None or sentiment is None:
+            continue
+        entry = totals[(bucket_of(created_at), sentiment)]
+        entry[0] += 1
+        entry[1] += confidence or 0.0
+    return totals
+
+
+def _upsert(db, totals):
+    dialect = db.get_bind().dialect.name
+    insert = _UPSERT_DIALECTS.get(dialect)
+
+    for (bucket_start, sentiment), (count, confidence_sum) in totals.items():
+        if insert is not None:
+            stmt = insert(SentimentRollup).values(
+                bucket_start=bucket_start,
+                sentiment=sentiment,
+                review_count=count,
+                confidence_sum=confidence_sum
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['bucket_start', 'sentiment'],
+                set_={
+                    'review_count': SentimentRollup.review_count + stmt.excluded.review_count,
+                    'confidence_sum': SentimentRollup.confidence_sum + stmt.excluded.confidence_sum
+                }
+            )
+            db.execute(stmt)
+            continue
+
+        # Other databases: read-modify-write inside the caller's transaction
+        rollup = db.get(SentimentRollup, (bucket_start, sentiment))
+        if rollup is None:
+            db.add(SentimentRollup(
+                bucket_start=bucket_start,
+                sentiment=sentiment,
+                review_count=count,
+                confidence_sum=confidence_sum
+            ))
+        else:
+            rollup.review_count += count
+            rollup.confidence_sum += confidence_sum
+
+
+def record_reviews(db, reviews):
+    """
+    Add analyzed reviews to the rollup within the caller's transaction
+
+    Call after the reviews are flushed (so created_at is set) and before commit.
+
+    Args:
+        db: Active session
+        reviews (list[Review]): Reviews with sentiment set
+    """
+    db.flush()
+    _upsert(db, _aggregate(
+        (review.created_at, review.sentiment, review.confidence_score) for review in reviews
+    ))
+
+
+def rebuild_rollups(db, batch_size=5000):
+    """
+    Recompute the whole rollup table from reviews
+
+    Returns:
+        int: Number of reviews aggregated
+    """
+    rows = db.query(Review.created_at, Review.sentiment, Review.confidence_score)\
+        .filter(Review.sentiment.isnot(None))\
+        .filter(Review.status == 'completed')\
+        .yield_per(batch_size)
+
+    totals = _aggregate(rows)
+    counted = sum(count for count, _ in totals.values())
+
+    db.query(SentimentRollup).delete(synchronize_session=False)
+    db.add_all([
+        SentimentRollup(
+            bucket_start=bucket_start,
+            sentiment=sentiment,
+            review_count=count,
+            confidence_sum=confidence_sum
+        )
+        for (bucket_start, sentiment), (count, confidence_sum) in totals.items()
+    ])
+    db.commit()
+    return counted
+
+
+def sentiment_stats(db, date_from=None, date_to=None, granularity='day'):
+    """
+    Dashboard aggregates from the rollup table
+
+    Args:
+        date_from (datetime): Inclusive start (default: 30 days ago)
+        date_to (datetime): Exclusive end (default: now)
+        granularity (str): 'day' or 'hour' for the volume series
+
+    Returns:
+        dict: Overall distribution, average confidence per sentiment, and
+        review volume per sentiment per day/hour
+    """
+    date_to = date_to or datetime.utcnow()
+    date_from = date_from or date_to - timedelta(days=30)
+
+    rollups = db.query(SentimentRollup)\
+        .filter(SentimentRollup.bucket_start >= bucket_of(date_from))\
+        .filter(SentimentRollup.bucket_start < date_to)\
+        .order_by(SentimentRollup.bucket_start)\
+        .all()
+
+    counts = defaultdict(int)
+    confidence = defaultdict(float)
+    series = defaultdict(lambda: defaultdict(int))
+    for rollup in rollups:
+        counts[rollup.sentiment] += rollup.review_count
+        confidence[rollup.sentiment] += rollup.confidence_sum
+        period = rollup.bucket_start if granularity == 'hour' else rollup.bucket_start.replace(hour=0)
+        series[period.isoformat()][rollup.sentiment] += rollup.review_count
+
+    total = sum(counts.values())
+    return {
+        'from': date_from.isoformat(),
+        'to': date_to.isoformat(),
+        'total': total,
+        'distribution': {
+            sentiment: {
+                'count': count,
+                'percentage': round(count * 100.0 / total, 2) if total else 0.0,
+                'average_confidence': round(confidence[sentiment] / count, 4) if count else None
+            }
+            for sentiment, count in counts.items()
+        },
+        'average_confidence': round(sum(confidence.values()) / total, 4) if total else None,
+        'granularity': granularity,
+        'volume': [
+            {'period': period, 'counts': dict(by_sentiment)}
+            for period, by_sentiment in series.items()
+        ]
+    }
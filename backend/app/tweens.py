@@ -0,0 +1,160 @@
+"""
+Pyramid tweens
+"""
+import gzip
+import time
+from pyramid.interfaces import IRoutesMapper
+from pyramid.response import Response
+from .metrics import REQUEST_DURATION, REQUESTS_IN_FLIGHT
+from .database import remove_sessions
+from .admission import admission, AdmissionRejected, retry_after_header
+
+try:
+    import brotli
+except ImportError:  # Optional: pip install brotli
+    brotli = None
+
+# Content types worth compressing (the streamed export is left alone)
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/')
+
+
+def metrics_tween_factory(handler, registry):
+    """Record in-flight requests and per-route latency for every request"""
+
+    def metrics_tween(request):
+        REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        status = '500'
+        try:
+            response = handler(request)
+            status = str(response.status_code)
+            return response
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            route = request.matched_route.name if request.matched_route is not None else 'unmatched'
+            REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                route=route,
+                method=request.method,
+                status=status
+            )
+
+    return metrics_tween
+
+
+class _ReleasingIterator:
+    """Wraps a streamed app_iter so the admission slot is held until the WSGI
+    server closes the body, not just until the view returns"""
+
+    def __init__(self, app_iter, release, started):
+        self.app_iter = app_iter
+        self.release = release
+        self.started = started
+        self.released = False
+
+    def __iter__(self):
+        return iter(self.app_iter)
+
+    def close(self):
+        try:
+            close = getattr(self.app_iter, 'close', None)
+            if close is not None:
+                close()
+        finally:
+            if not self.released:
+                self.released = True
+                self.release(time.perf_counter() - self.started)
+
+
+def admission_tween_factory(handler, registry):
+    """Per-route concurrency limits and bounded wait queues (app.admission.*),
+    shedding excess requests with 429/503 and Retry-After"""
+    admission.configure(registry.settings)
+    if not admission.enabled:
+        return handler
+    mapper = registry.queryUtility(IRoutesMapper)
+
+    def admission_tween(request):
+        if request.method == 'OPTIONS':
+            return handler(request)
+        # Routes are matched inside the handler, so look the route up here
+        route = mapper(request)['route'] if mapper is not None else None
+        if route is not None:
+            # Lets the metrics tween label shed requests with their route
+            request.matched_route = route
+        try:
+            release = admission.admit(route.name if route is not None else None)
+        except AdmissionRejected as e:
+            response = Response(
+                json_body={
+                    'error': 'Server is busy, please retry later' if e.status == 503
+                    else 'Too many concurrent requests for this endpoint, please retry later',
+                    'status': 'error'
+                },
+                status=e.status
+            )
+            response.headers['Retry-After'] = retry_after_header(e.retry_after)
+            return response
+        started = time.perf_counter()
+        try:
+            response = handler(request)
+        except BaseException:
+            release(time.perf_counter() - started)
+            raise
+        if isinstance(response.app_iter, (list, tuple)):
+            release(time.perf_counter() - started)
+        else:
+            # Streamed bodies (export) keep the slot until they are fully sent
+            response.app_iter = _ReleasingIterator(response.app_iter, release, started)
+        return response
+
+    return admission_tween
+
+
+def db_session_tween_factory(handler, registry):
+    """Scope database sessions to the request: waitress reuses threads, so
+    the thread-bound sessions are removed once the response is ready"""
+
+    def db_session_tween(request):
+        try:
+            return handler(request)
+        finally:
+            remove_sessions()
+
+    return db_session_tween
+
+
+def compression_tween_factory(handler, registry):
+    """Compress materialized JSON/text bodies of at least app.compression_min_bytes
+    with brotli (when installed and accepted) or gzip; 0 disables"""
+    min_bytes = int(registry.settings.get('app.compression_min_bytes', 1024))
+    if min_bytes <= 0:
+        return handler
+    offers = ['br', 'gzip'] if brotli is not None else ['gzip']
+
+    def compression_tween(request):
+        response = handler(request)
+        content_type = response.content_type or ''
+        if response.status_code != 200 or not content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+        vary = tuple(response.vary or ())
+        if 'Accept-Encoding' not in vary:
+            response.vary = vary + ('Accept-Encoding',)
+        if (response.content_encoding or not isinstance(response.app_iter, (list, tuple))
+                or not request.headers.get('Accept-Encoding')):
+            return response
+        body = response.body
+        if len(body) < min_bytes:
+            return response
+        accepted = request.accept_encoding.acceptable_offers(offers)
+        if not accepted:
+            return response
+        encoding = accepted[0][0]
+        if encoding == 'br':
+            response.body = brotli.compress(body, quality=5)
+        else:
+            response.body = gzip.compress(body, compresslevel=6)
+        response.content_encoding = encoding
+        return response
+
+    return compression_tween
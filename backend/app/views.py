@@ -1,11 +1,91 @@
 from pyramid.view import view_config
 from pyramid.response import Response
 import json
-from sqlalchemy import desc
+import os
+from sqlalchemy import text
 from .models import Review
-from .database import get_db_session
+from .database import get_db_session, get_read_session
 from .services.sentiment_analyzer import sentiment_analyzer
 from .services.gemini_extractor import gemini_extractor
+from .services.language import language_detector
+from .ingest import (ingest_reviews, analyze_sentiment_cached, extract_key_points_cached, key_points_after_sentiment,
+                     sentiment_input, MAX_BULK_REVIEWS)
+from .executor import run_stages, StageError, StageTimeoutError, SENTIMENT_TIMEOUT, KEY_POINTS_TIMEOUT
+from .jobs import job_queue, QueueFullError, FINISHED_STATUSES
+from .counters import review_counter
+from .pagination import keyset_page, newest_first
+from .export import export_stream, parse_date, EXPORT_FORMATS
+from . import search, http_cache
+from .dedup import near_duplicates
+from .stats import record_reviews, sentiment_stats
+from .backlog import key_points_backlog
+from .policy import key_points_policy
+from .metrics import registry, timed_stage, STAGE_ERRORS
+
+# Default for requests that don't pass "async"; true makes every request a background job
+ASYNC_BY_DEFAULT = os.getenv('ANALYZE_ASYNC_DEFAULT', 'false').lower() in ('1', 'true', 'yes')
+
+def _is_truthy(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() in ('1', 'true', 'yes')
+
+def _enqueue_review(request, review_text, language=None, policy='sync'):
+    """Store a pending review, hand it to the job queue and return the 202 response"""
+    if not job_queue.has_capacity():
+        request.response.status = 503
+        request.response.headers['Retry-After'] = '5'
+        return {
+            'error': 'Analysis queue is full, please retry later',
+            'status': 'error'
+        }
+
+    db = get_db_session()
+    try:
+        duplicate = near_duplicates.check(review_text)
+        review = Review(
+            review_text=review_text,
+            status='pending',
+            key_points_status='pending',
+            key_points_policy=policy,
+            language=language,
+            minhash=duplicate.signature,
+            duplicate_of=duplicate.review_id
+        )
+        db.add(review)
+        db.commit()
+        review_counter.add()
+        near_duplicates.add(review.id, duplicate.signature)
+        result = review.to_dict()
+
+        try:
+            job_queue.submit(review.id)
+        except QueueFullError as e:
+            db.delete(review)
+            db.commit()
+            review_counter.add(-1)
+            request.response.status = 503
+            request.response.headers['Retry-After'] = '5'
+            return {
+                'error': f'{str(e)}, please retry later',
+                'status': 'error'
+            }
+
+        request.response.status = 202
+        request.response.headers['Location'] = request.route_url('get_review', id=review.id)
+        return {
+            'status': 'accepted',
+            'data': result
+        }
+    except Exception as e:
+        db.rollback()
+        request.response.status = 500
+        return {
+            'error': f'Database error: {str(e)}',
+            'status': 'error'
+        }
+    finally:
+        db.close()
 
 @view_config(route_name='analyze_review', renderer='json', request_method='POST')
 def analyze_review(request):
@@ -15,22 +95,37 @@ def analyze_review(request):
     
     Request Body:
         {
-            "review_text": "string"
+            "review_text": "string",
+            "async": bool (optional, default: ANALYZE_ASYNC_DEFAULT),
+            "key_points_policy": "sync" | "skip" | "defer" | "sample" (optional, default: KEY_POINTS_POLICY)
         }
     
+    In async mode the review is stored as "pending" and 202 is returned
+    immediately; poll GET /api/reviews/{id} (optionally with ?wait=N) for
+    the result.
+    
+    With a policy other than sync only sentiment runs before responding;
+    key_points_status is then "pending" (the key points backlog fills them
+    in) or "skipped" (see policy.py).
+    
     Returns:
         {
             "id": int,
             "review_text": string,
             "sentiment": string,
             "confidence_score": float,
-            "key_points": string (JSON array),
-            "created_at": string (ISO format)
+            "key_points": [string, ...] | null,
+            "key_points_status": "completed" | "pending" | "skipped",
+            "created_at": string (ISO format),
+            "language": string | null (detected language code),
+            "duplicate_of": int | null (earlier near-duplicate review),
+            "analysis_reused": bool (analysis copied from duplicate_of),
+            "sentiment_input": {"truncated": bool, "chunks": int}
         }
     """
     try:
         # Parse request body
-        data = request.json_body
+        data = timed_stage('analyze_review', 'json_parse', lambda: request.json_body)()
         review_text = data.get('review_text', '').strip()
         
         # Validate input
@@ -41,27 +136,66 @@ def analyze_review(request):
                 'status': 'error'
             }
         
-        # Step 1: Analyze sentiment using Hugging Face
         try:
-            sentiment_result = sentiment_analyzer.analyze(review_text)
-            sentiment = sentiment_result['sentiment']
-            confidence = sentiment_result['confidence']
-        except Exception as e:
-            request.response.status = 500
+            policy = key_points_policy.resolve(data.get('key_points_policy', request.params.get('key_points_policy')))
+        except ValueError as e:
+            request.response.status = 400
             return {
-                'error': f'Sentiment analysis failed: {str(e)}',
+                'error': str(e),
                 'status': 'error'
             }
         
-        # Step 2: Extract key points using Gemini
+        # Cheap local language ID routes the review to a per-language
+        # sentiment model and a language-specific Gemini prompt
+        language = timed_stage('analyze_review', 'language', lambda: language_detector.detect(review_text))()
+        
+        if _is_truthy(data.get('async', request.params.get('async', ASYNC_BY_DEFAULT))):
+            return _enqueue_review(request, review_text, language, policy)
+        
+        # Near-duplicates of an earlier, fully analyzed review reuse its analysis
+        duplicate = near_duplicates.check(review_text)
+        reused = near_duplicates.reusable_analysis(duplicate, review_text)
+        
+        # Steps 1 & 2: Analyze sentiment (Hugging Face) and extract key points
+        # (Gemini) concurrently; cached results skip the model calls
+        key_points_status = 'completed'
         try:
-            key_points = gemini_extractor.extract_key_points(review_text)
-        except Exception as e:
-            request.response.status = 500
-            return {
-                'error': f'Key points extraction failed: {str(e)}',
-                'status': 'error'
-            }
+            if reused is not None:
+                sentiment_result, key_points = reused
+            elif policy != 'sync':
+                # Respond after sentiment; the policy decides about key points
+                sentiment_result, = run_stages([
+                    ('sentiment', timed_stage('analyze_review', 'sentiment',
+                                              lambda: analyze_sentiment_cached(review_text, language)), SENTIMENT_TIMEOUT)
+                ])
+                key_points, key_points_status = key_points_after_sentiment(review_text, sentiment_result, policy)
+            else:
+                sentiment_result, key_points = run_stages([
+                    ('sentiment', timed_stage('analyze_review', 'sentiment',
+                                              lambda: analyze_sentiment_cached(review_text, language)), SENTIMENT_TIMEOUT),
+                    ('key_points', timed_stage('analyze_review', 'gemini',
+                                               lambda: extract_key_points_cached(review_text, language)), KEY_POINTS_TIMEOUT)
+                ])
+        except StageError as e:
+            if isinstance(e.error, StageTimeoutError):
+                STAGE_ERRORS.inc(endpoint='analyze_review', stage='gemini' if e.stage == 'key_points' else e.stage)
+            if e.stage == 'key_points' and gemini_extractor.should_defer(e.error):
+                # Degraded mode: keep the sentiment, queue key points for the backlog
+                sentiment_result, key_points = e.completed[0], None
+                key_points_status = 'pending'
+            else:
+                request.response.status = 500
+                if e.stage == 'sentiment':
+                    return {
+                        'error': f'Sentiment analysis failed: {str(e.error)}',
+                        'status': 'error'
+                    }
+                return {
+                    'error': f'Key points extraction failed: {str(e.error)}',
+                    'status': 'error'
+                }
+        sentiment = sentiment_result['sentiment']
+        confidence = sentiment_result['confidence']
         
         # Step 3: Save to database
         db = get_db_session()
@@ -70,13 +204,29 @@ def analyze_review(request):
                 review_text=review_text,
                 sentiment=sentiment,
                 confidence_score=confidence,
-                key_points=key_points
+                key_points=key_points,
+                key_points_status=key_points_status,
+                key_points_policy=policy,
+                language=language,
+                sentiment_model=sentiment_analyzer.for_language(language).cache_key,
+                key_points_model=gemini_extractor.version if key_points_status == 'completed' else None,
+                minhash=duplicate.signature,
+                duplicate_of=duplicate.review_id
             )
-            db.add(review)
-            db.commit()
+            def commit():
+                db.add(review)
+                record_reviews(db, [review])
+                db.commit()
+            timed_stage('analyze_review', 'db_commit', commit)()
+            review_counter.add()
+            near_duplicates.add(review.id, duplicate.signature)
+            if key_points_status == 'pending':
+                key_points_backlog.notify()
             
             # Get the created review with ID
             result = review.to_dict()
+            result['sentiment_input'] = sentiment_input(sentiment_result)
+            result['analysis_reused'] = reused is not None
             
             request.response.status = 201
             return {
@@ -100,30 +250,155 @@ def analyze_review(request):
             'status': 'error'
         }
 
+def _parse_bulk_body(request):
+    """
+    Read review texts from a JSON array, {"reviews": [...]} or an NDJSON body
+
+    Each entry may be a plain string or an object with a review_text field.
+    Invalid entries are passed through (NDJSON lines that don't parse as a
+    ValueError) so ingest_reviews reports them per item.
+    """
+    if request.content_type == 'application/x-ndjson':
+        entries = []
+        for number, line in enumerate(request.text.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                entries.append(json.loads(line))
+            except ValueError as e:
+                entries.append(ValueError(f'Invalid JSON on line {number}: {str(e)}'))
+    else:
+        entries = request.json_body
+        if isinstance(entries, dict):
+            entries = entries.get('reviews')
+        if not isinstance(entries, list):
+            raise ValueError('Body must be a JSON array of reviews or {"reviews": [...]}')
+
+    texts = []
+    for entry in entries:
+        if isinstance(entry, dict):
+            entry = entry.get('review_text')
+        texts.append(entry)
+    return texts
+
+@view_config(route_name='analyze_reviews', renderer='json', request_method='POST')
+def analyze_reviews(request):
+    """
+    POST /api/analyze-reviews
+    Analyze many product reviews in one request
+
+    Request Body (application/json):
+        ["review 1", {"review_text": "review 2"}, ...]
+        or {"reviews": [...]}
+
+    Request Body (application/x-ndjson):
+        One JSON string or {"review_text": ...} object per line
+
+    Query Parameters:
+        key_points_policy: sync | skip | defer | sample (default: KEY_POINTS_POLICY)
+
+    Returns:
+        {
+            "status": "success",
+            "data": {
+                "results": [
+                    {"index": int, "status": "success", "data": {...review...}},
+                    {"index": int, "status": "error", "error": string}
+                ],
+                "total": int,
+                "succeeded": int,
+                "failed": int
+            }
+        }
+    """
+    try:
+        try:
+            policy = key_points_policy.resolve(request.params.get('key_points_policy'))
+        except ValueError as e:
+            request.response.status = 400
+            return {
+                'error': str(e),
+                'status': 'error'
+            }
+
+        try:
+            review_texts = _parse_bulk_body(request)
+        except ValueError as e:
+            request.response.status = 400
+            return {
+                'error': f'Invalid request body: {str(e)}',
+                'status': 'error'
+            }
+
+        if not review_texts:
+            request.response.status = 400
+            return {
+                'error': 'At least one review is required',
+                'status': 'error'
+            }
+        if len(review_texts) > MAX_BULK_REVIEWS:
+            request.response.status = 413
+            return {
+                'error': f'Too many reviews: maximum is {MAX_BULK_REVIEWS} per request',
+                'status': 'error'
+            }
+
+        results = ingest_reviews(review_texts, policy)
+        succeeded = sum(1 for item in results if item['status'] == 'success')
+        if any(item['status'] == 'success' and item['data']['key_points_status'] == 'pending' for item in results):
+            key_points_backlog.notify()
+
+        return {
+            'status': 'success',
+            'data': {
+                'results': results,
+                'total': len(results),
+                'succeeded': succeeded,
+                'failed': len(results) - succeeded
+            }
+        }
+    except Exception as e:
+        request.response.status = 500
+        return {
+            'error': f'Internal server error: {str(e)}',
+            'status': 'error'
+        }
+
 @view_config(route_name='get_reviews', renderer='json', request_method='GET')
 def get_reviews(request):
     """
     GET /api/reviews?page=1&limit=10
+    GET /api/reviews?cursor=&limit=10
+    GET /api/reviews?key_point=Fast%20shipping
     Get all reviews with pagination
     
+    Passing a cursor (empty for the first page) switches to keyset
+    pagination on (created_at, id), which stays fast on deep pages. The
+    page/limit mode is kept for backward compatibility.
+    
     Query Parameters:
         page: int (default: 1)
+        cursor: string (next_cursor from the previous response)
         limit: int (default: 10, max: 100)
+        key_point: string (only reviews with this exact key point)
     
     Returns:
         {
             "status": "success",
             "data": {
                 "reviews": [...],
-                "total": int,
-                "page": int,
+                "total": int (cached, refreshed every REVIEW_COUNT_TTL_SECONDS;
+                              exact when filtering, null in filtered cursor mode),
                 "limit": int,
-                "total_pages": int
+                "page": int, "total_pages": int    (page mode)
+                "next_cursor": string | null       (cursor mode)
             }
         }
     """
     try:
         # Get pagination parameters
+        cursor = request.params.get('cursor')
+        key_point = request.params.get('key_point')
         page = int(request.params.get('page', 1))
         limit = int(request.params.get('limit', 10))
         
@@ -133,28 +408,51 @@ def get_reviews(request):
         if limit < 1 or limit > 100:
             limit = 10
         
-        # Calculate offset
-        offset = (page - 1) * limit
-        
-        # Query database
-        db = get_db_session()
+        # Query database (served by the read replica when one is configured)
+        db = get_read_session()
         try:
-            # Get total count
-            total = db.query(Review).count()
+            # Answer unchanged polls with 304 before running the page query
+            validators = http_cache.Validators.load(request, db)
+            if validators.matches(request):
+                return validators.not_modified()
+            
+            # Plain column rows: the renderer serializes them without ORM objects
+            query = db.query(*Review.api_columns())
+            if key_point:
+                query = query.filter(Review.has_key_point(key_point, db.get_bind().dialect.name))
+            
+            if cursor is not None:
+                rows, next_cursor = timed_stage('get_reviews', 'query',
+                                                lambda: keyset_page(query, cursor, limit))()
+                validators.apply(request.response)
+                return {
+                    'status': 'success',
+                    'data': {
+                        'reviews': [dict(row._mapping) for row in rows],
+                        'total': None if key_point else review_counter.get(),
+                        'limit': limit,
+                        'next_cursor': next_cursor
+                    }
+                }
+            
+            # Get total count (cached, not a COUNT(*) per request, unless filtered)
+            total = timed_stage('get_reviews', 'count',
+                                lambda: query.count() if key_point else review_counter.get())()
+            
+            # Calculate offset
+            offset = (page - 1) * limit
             
             # Get paginated reviews (ordered by newest first)
-            reviews = db.query(Review)\
-                .order_by(desc(Review.created_at))\
-                .limit(limit)\
-                .offset(offset)\
-                .all()
+            page_query = newest_first(query).limit(limit).offset(offset)
+            rows = timed_stage('get_reviews', 'query', page_query.all)()
             
             # Convert to dict
-            reviews_data = [review.to_dict() for review in reviews]
+            reviews_data = [dict(row._mapping) for row in rows]
             
             # Calculate total pages
             total_pages = (total + limit - 1) // limit
             
+            validators.apply(request.response)
             return {
                 'status': 'success',
                 'data': {
@@ -171,7 +469,7 @@ def get_reviews(request):
     except ValueError as e:
         request.response.status = 400
         return {
-            'error': 'Invalid page or limit parameter',
+            'error': 'Invalid page, limit or cursor parameter',
             'status': 'error'
         }
     except Exception as e:
@@ -181,10 +479,298 @@ def get_reviews(request):
             'status': 'error'
         }
 
+@view_config(route_name='search_reviews', renderer='json', request_method='GET')
+def search_reviews(request):
+    """
+    GET /api/reviews/search?q=pengiriman cepat&sentiment=positive&limit=20
+    Full-text search over review text and key points
+    
+    Query Parameters:
+        q: search terms (required)
+        sentiment: comma-separated sentiments to include
+        sort: relevance | newest (default: relevance)
+        cursor: string (next_cursor from the previous response)
+        limit: int (default: 20, max: 100)
+    
+    Returns:
+        {
+            "status": "success",
+            "data": {
+                "reviews": [{...review..., "rank": float}, ...],
+                "limit": int,
+                "next_cursor": string | null
+            }
+        }
+    """
+    q = request.params.get('q', '').strip()
+    sort = request.params.get('sort', 'relevance').lower()
+    if not q:
+        request.response.status = 400
+        return {
+            'error': 'q is required and cannot be empty',
+            'status': 'error'
+        }
+    if sort not in search.SEARCH_SORTS:
+        request.response.status = 400
+        return {
+            'error': f"Invalid sort '{sort}', expected one of: {', '.join(search.SEARCH_SORTS)}",
+            'status': 'error'
+        }
+
+    try:
+        limit = int(request.params.get('limit', 20))
+    except ValueError:
+        request.response.status = 400
+        return {
+            'error': 'Invalid limit parameter',
+            'status': 'error'
+        }
+    if limit < 1 or limit > 100:
+        limit = 20
+    sentiments = [s.strip().lower() for s in request.params.get('sentiment', '').split(',') if s.strip()]
+
+    db = get_read_session()
+    try:
+        validators = http_cache.Validators.load(request, db)
+        if validators.matches(request):
+            return validators.not_modified()
+        results, next_cursor = timed_stage('search_reviews', 'query', lambda: search.search_reviews(
+            db, q, sentiments, request.params.get('cursor'), limit, sort))()
+        reviews = []
+        for row in results:
+            data = dict(row._mapping)
+            data['rank'] = round(data['rank'], 6)
+            reviews.append(data)
+        validators.apply(request.response)
+        return {
+            'status': 'success',
+            'data': {
+                'reviews': reviews,
+                'limit': limit,
+                'next_cursor': next_cursor
+            }
+        }
+    except ValueError as e:
+        request.response.status = 400
+        return {
+            'error': str(e),
+            'status': 'error'
+        }
+    except Exception as e:
+        request.response.status = 500
+        return {
+            'error': f'Internal server error: {str(e)}',
+            'status': 'error'
+        }
+    finally:
+        db.close()
+
+@view_config(route_name='export_reviews', renderer='json', request_method='GET')
+def export_reviews(request):
+    """
+    GET /api/reviews/export?format=csv&sentiment=negative&from=2025-12-01&to=2025-12-08
+    Stream all matching reviews as CSV or NDJSON
+    
+    Query Parameters:
+        format: csv | ndjson (default: ndjson)
+        sentiment: comma-separated sentiments to include
+        from: ISO date/datetime, inclusive lower bound on created_at
+        to: ISO date/datetime, exclusive upper bound on created_at
+    
+    Returns:
+        A streamed CSV (with header row) or NDJSON body, one review per line
+    """
+    export_format = request.params.get('format', 'ndjson').lower()
+    if export_format not in EXPORT_FORMATS:
+        request.response.status = 400
+        return {
+            'error': f"Invalid format '{export_format}', expected one of: {', '.join(EXPORT_FORMATS)}",
+            'status': 'error'
+        }
+
+    try:
+        date_from = parse_date(request.params.get('from'))
+        date_to = parse_date(request.params.get('to'))
+    except ValueError as e:
+        request.response.status = 400
+        return {
+            'error': str(e),
+            'status': 'error'
+        }
+
+    sentiments = [s.strip().lower() for s in request.params.get('sentiment', '').split(',') if s.strip()]
+
+    response = Response(
+        app_iter=export_stream(export_format, sentiments, date_from, date_to),
+        content_type=EXPORT_FORMATS[export_format],
+        charset='utf-8'
+    )
+    response.content_disposition = f'attachment; filename="reviews.{export_format}"'
+    return response
+
+@view_config(route_name='get_review', renderer='json', request_method='GET')
+def get_review(request):
+    """
+    GET /api/reviews/{id}?wait=0
+    Get a single review, e.g. to poll an async analysis
+    
+    Query Parameters:
+        wait: float seconds to long-poll until the review is completed or
+              failed (default: 0, capped at JOB_MAX_WAIT_SECONDS)
+    
+    Returns:
+        {
+            "status": "success",
+            "data": {...review...}
+        }
+    """
+    try:
+        review_id = int(request.matchdict['id'])
+        wait = float(request.params.get('wait', 0))
+    except ValueError:
+        request.response.status = 400
+        return {
+            'error': 'Invalid review id or wait parameter',
+            'status': 'error'
+        }
+
+    def load():
+        db = get_db_session()
+        try:
+            review = db.get(Review, review_id)
+            return review.to_dict() if review is not None else None
+        finally:
+            db.close()
+
+    try:
+        result = load()
+        if result is None:
+            request.response.status = 404
+            return {
+                'error': f'Review {review_id} not found',
+                'status': 'error'
+            }
+
+        if wait > 0 and result['status'] not in FINISHED_STATUSES:
+            if job_queue.wait(review_id, wait, lambda: load()['status'] in FINISHED_STATUSES):
+                result = load()
+
+        return {
+            'status': 'success',
+            'data': result
+        }
+    except Exception as e:
+        request.response.status = 500
+        return {
+            'error': f'Internal server error: {str(e)}',
+            'status': 'error'
+        }
+
+@view_config(route_name='stats', renderer='json', request_method='GET')
+def get_stats(request):
+    """
+    GET /api/stats?from=2025-12-01&to=2025-12-08&granularity=day
+    Sentiment dashboard aggregates, served from the hourly rollup table
+    
+    Query Parameters:
+        from: ISO date/datetime, inclusive (default: 30 days before "to")
+        to: ISO date/datetime, exclusive (default: now)
+        granularity: day | hour (default: day)
+    
+    Returns:
+        {
+            "status": "success",
+            "data": {
+                "total": int,
+                "distribution": {"positive": {"count", "percentage", "average_confidence"}, ...},
+                "average_confidence": float,
+                "volume": [{"period": string, "counts": {"positive": int, ...}}, ...]
+            }
+        }
+    """
+    granularity = request.params.get('granularity', 'day')
+    if granularity not in ('day', 'hour'):
+        request.response.status = 400
+        return {
+            'error': 'Invalid granularity, expected day or hour',
+            'status': 'error'
+        }
+
+    try:
+        date_from = parse_date(request.params.get('from'))
+        date_to = parse_date(request.params.get('to'))
+    except ValueError as e:
+        request.response.status = 400
+        return {
+            'error': str(e),
+            'status': 'error'
+        }
+
+    db = get_db_session()
+    try:
+        return {
+            'status': 'success',
+            'data': sentiment_stats(db, date_from, date_to, granularity)
+        }
+    except Exception as e:
+        request.response.status = 500
+        return {
+            'error': f'Internal server error: {str(e)}',
+            'status': 'error'
+        }
+    finally:
+        db.close()
+
+@view_config(route_name='metrics', request_method='GET')
+def metrics(request):
+    """
+    GET /api/metrics
+    Prometheus text exposition of request, stage, model and queue metrics
+    """
+    return Response(
+        body=registry.render().encode('utf-8'),
+        content_type='text/plain',
+        charset='utf-8',
+        headers={'Cache-Control': 'no-store'}
+    )
+
 @view_config(route_name='health', renderer='json', request_method='GET')
 def health_check(request):
-    """Health check endpoint"""
+    """Health check endpoint (liveness: the process is up and serving)"""
     return {
         'status': 'healthy',
         'service': 'Product Review Analyzer API'
     }
+
+@view_config(route_name='ready', renderer='json', request_method='GET')
+def readiness_check(request):
+    """
+    GET /api/health/ready
+    Readiness: 200 once the sentiment models (including the per-language
+    ones) and Gemini client are initialized and the database answers, 503 otherwise
+    """
+    components = {
+        'sentiment_model': sentiment_analyzer.status(),
+        'gemini': {
+            **gemini_extractor.initializer.status(),
+            'resilience': gemini_extractor.caller.stats()
+        }
+    }
+
+    db = get_db_session()
+    try:
+        db.execute(text('SELECT 1'))
+        components['database'] = {'ready': True, 'error': None}
+    except Exception as e:
+        components['database'] = {'ready': False, 'error': str(e)}
+    finally:
+        db.close()
+
+    ready = all(component['ready'] for component in components.values())
+    if not ready:
+        request.response.status = 503
+    return {
+        'status': 'ready' if ready else 'not_ready',
+        'components': components,
+        'startup_timings': request.registry.settings.get('app.startup_timings')
+    }
@@ -11,5 +11,12 @@ setup(
         'paste.app_factory': [
             'main = app:main',
         ],
+        'console_scripts': [
+            'review-sentiment-parity = app.scripts.sentiment_parity:main',
+            'review-stats-rebuild = app.scripts.rebuild_stats:main',
+            'review-benchmark = app.scripts.benchmark:main',
+            'review-inference-server = app.scripts.inference_server:main',
+            'review-reprocess = app.scripts.reprocess:main',
+        ],
     },
 )
@@ -0,0 +1,51 @@
+"""
+Shared fixtures
+The app modules build their database engine at import time, so DATABASE_URL
+points at a throwaway SQLite file before anything from app is imported. The
+AI services are replaced by the offline benchmark stubs.
+"""
+import os
+import tempfile
+
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'test.db')
+
+import pytest
+from pyramid import testing
+from app import database
+from app.benchmark import install_stubs
+from app.models import Review
+
+
+@pytest.fixture(scope='session')
+def stubs():
+    """Offline sentiment and Gemini stand-ins with no added latency"""
+    return install_stubs(sentiment_base_ms=0, sentiment_per_item_ms=0,
+                         gemini_latency_ms=0, gemini_jitter_ms=0, seed=1)
+
+
+@pytest.fixture(scope='session')
+def tables():
+    database.init_db()
+
+
+@pytest.fixture
+def db(tables):
+    """Session on an empty reviews table"""
+    session = database.SessionFactory()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.query(Review).delete()
+        session.commit()
+        session.close()
+
+
+@pytest.fixture
+def pyramid_config(tables):
+    """Pyramid registry for calling views directly"""
+    config = testing.setUp(settings={})
+    try:
+        yield config
+    finally:
+        testing.tearDown()
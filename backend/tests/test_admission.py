@@ -0,0 +1,123 @@
+import threading
+import time
+import pytest
+from app.admission import AdmissionController, AdmissionRejected, RouteLimiter, retry_after_header
+
+
+def _settings(**overrides):
+    settings = {
+        'app.admission.enabled': 'true',
+        'app.admission.threads': '4',
+        'app.admission.reserved_threads': '1',
+        'app.admission.reserved_routes': 'health\nget_reviews',
+        'app.admission.routes': 'analyze_review 2 1 0.05\nexport_reviews 1 0 0',
+    }
+    settings.update(overrides)
+    return settings
+
+
+def test_limiter_sheds_when_queue_is_full():
+    limiter = RouteLimiter('analyze_review', limit=1, queue_size=0)
+    assert limiter.acquire() == 0.0
+    with pytest.raises(AdmissionRejected) as rejected:
+        limiter.acquire()
+    assert rejected.value.status == 429
+    assert limiter.rejected == {'queue_full': 1}
+
+
+def test_limiter_times_out_queued_requests():
+    limiter = RouteLimiter('analyze_review', limit=1, queue_size=1, max_wait=0.02)
+    limiter.acquire()
+    with pytest.raises(AdmissionRejected) as rejected:
+        limiter.acquire()
+    assert rejected.value.status == 503
+    assert rejected.value.reason == 'queue_timeout'
+    assert limiter.waiting == 0
+
+
+def test_limiter_admits_queued_request_on_release():
+    limiter = RouteLimiter('analyze_review', limit=1, queue_size=1, max_wait=5)
+    limiter.acquire()
+    waits = []
+    waiter = threading.Thread(target=lambda: waits.append(limiter.acquire()))
+    waiter.start()
+    time.sleep(0.05)
+    assert limiter.waiting == 1
+    limiter.release(0.1)
+    waiter.join(1)
+    assert waits and waits[0] > 0
+    assert limiter.active == 1
+    assert limiter.admitted == 2
+
+
+def test_limiter_service_time_moving_average():
+    limiter = RouteLimiter('analyze_review', limit=1)
+    limiter.acquire()
+    limiter.release(1.0)
+    limiter.acquire()
+    limiter.release(2.0)
+    assert limiter.service_seconds == pytest.approx(1.2)
+    assert limiter.estimated_wait(queued=0) == pytest.approx(1.2)
+    assert limiter.estimated_wait(queued=1) == pytest.approx(2.4)
+
+
+def test_configure_parses_routes():
+    controller = AdmissionController()
+    controller.configure(_settings())
+    assert controller.enabled
+    assert controller.shared_threads == 3
+    assert controller.reserved_routes == {'health', 'get_reviews'}
+    analyze = controller.limiters['analyze_review']
+    assert (analyze.limit, analyze.queue_size, analyze.max_wait) == (2, 1, 0.05)
+    assert controller.limiters['export_reviews'].queue_size == 0
+
+
+def test_configure_rejects_malformed_routes():
+    with pytest.raises(ValueError):
+        AdmissionController().configure(_settings(**{'app.admission.routes': 'analyze_review 1 2 3 4'}))
+
+
+def test_reserved_and_disabled_routes_are_not_limited():
+    controller = AdmissionController()
+    controller.configure(_settings())
+    for _ in range(10):
+        controller.admit('health')
+    assert controller.occupied == 0
+
+    controller.configure(_settings(**{'app.admission.enabled': 'false'}))
+    for _ in range(10):
+        controller.admit('export_reviews')
+    assert controller.occupied == 0
+
+
+def test_route_limit_and_release():
+    controller = AdmissionController()
+    controller.configure(_settings())
+    release = controller.admit('export_reviews')
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.admit('export_reviews')
+    assert rejected.value.status == 429
+    assert controller.occupied == 1
+    release(0.5)
+    assert controller.occupied == 0
+    controller.admit('export_reviews')(0.5)
+
+
+def test_shared_thread_budget_sheds_with_503():
+    controller = AdmissionController()
+    controller.configure(_settings(**{'app.admission.routes': ''}))
+    releases = [controller.admit('stats') for _ in range(3)]
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.admit('stats')
+    assert rejected.value.status == 503
+    assert rejected.value.reason == 'server_busy'
+    controller.admit('health')
+    for release in releases:
+        release(0.1)
+    assert controller.occupied == 0
+
+
+def test_retry_after_header():
+    assert retry_after_header(0) == '1'
+    assert retry_after_header(1.2) == '2'
+    assert retry_after_header(3) == '3'
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+from app import cache as cache_module
+from app.cache import AnalysisCache, normalize_text, text_hash
+from app.database import SessionFactory
+from app.models import AnalysisCacheEntry
+
+
+def test_normalized_copies_share_a_key():
+    assert normalize_text('  Great\tPHONE\n\n battery ') == 'great phone battery'
+    assert text_hash('Great phone') == text_hash(' great  PHONE ')
+    assert text_hash('Great phone') != text_hash('Great phones')
+
+
+def test_hit_miss_and_model_separation():
+    cache = AnalysisCache(max_entries=10, ttl=0)
+    assert cache.get('review', 'model-a') is None
+    cache.set('review', 'model-a', {'sentiment': 'positive'})
+    assert cache.get(' REVIEW ', 'model-a') == {'sentiment': 'positive'}
+    assert cache.get('review', 'model-b') is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_lru_eviction():
+    cache = AnalysisCache(max_entries=2, ttl=0)
+    cache.set('first', 'model', 1)
+    cache.set('second', 'model', 2)
+    cache.get('first', 'model')
+    cache.set('third', 'model', 3)
+    assert cache.get('second', 'model') is None
+    assert cache.get('first', 'model') == 1
+    assert cache.stats()['evictions'] == 1
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module, 'monotonic', lambda: now[0])
+    cache = AnalysisCache(max_entries=10, ttl=60)
+    cache.set('review', 'model', 'value')
+    now[0] += 59
+    assert cache.get('review', 'model') == 'value'
+    now[0] += 2
+    assert cache.get('review', 'model') is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_persistent_tier_survives_a_new_memory_tier(tables):
+    writer = AnalysisCache(ttl=60, persistent=True)
+    writer.set('persisted review', 'model', ['Point one'])
+    reader = AnalysisCache(ttl=60, persistent=True)
+    try:
+        assert reader.get('Persisted  review', 'model') == ['Point one']
+        assert reader.persistent_hits == 1
+        # Promoted into the memory tier
+        assert reader.get('persisted review', 'model') == ['Point one']
+        assert reader.hits == 1
+
+        db = SessionFactory()
+        db.query(AnalysisCacheEntry).update({'created_at': datetime.utcnow() - timedelta(seconds=120)})
+        db.commit()
+        db.close()
+        assert writer.prune() == 1
+        assert AnalysisCache(ttl=60, persistent=True).get('persisted review', 'model') is None
+    finally:
+        db = SessionFactory()
+        db.query(AnalysisCacheEntry).delete()
+        db.commit()
+        db.close()
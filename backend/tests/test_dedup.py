@@ -0,0 +1,94 @@
+from app.dedup import MinHasher, NearDuplicateIndex
+from app.models import Review
+from app.services.gemini_extractor import gemini_extractor
+from app.services.sentiment_analyzer import sentiment_analyzer
+
+ORIGINAL = 'This laptop is powerful and fast, battery lasts all day, I would recommend it to anyone'
+NEGATED = 'This laptop is powerful and fast, battery lasts all day, I would not recommend it to anyone'
+UNRELATED = 'Pengiriman lambat sekali dan kemasan barangnya rusak saat sampai di rumah'
+
+
+def test_minhash_similarity():
+    hasher = MinHasher(64)
+    original = hasher.signature(ORIGINAL)
+    assert hasher.similarity(original, hasher.signature(ORIGINAL.upper())) == 1.0
+    assert hasher.similarity(original, hasher.signature(NEGATED)) >= 0.6
+    assert hasher.similarity(original, hasher.signature(UNRELATED)) < 0.2
+    # Seeded permutations: signatures are stable across instances and restarts
+    assert MinHasher(64).signature(ORIGINAL) == original
+
+
+def test_minhash_skips_short_texts():
+    assert MinHasher(64).signature('great product', min_words=6) is None
+
+
+def test_index_finds_near_duplicates():
+    index = NearDuplicateIndex(mode='flag', threshold=0.6)
+    index.add(1, index.check(ORIGINAL).signature)
+    index.add(2, index.check(UNRELATED).signature)
+    match = index.check(NEGATED)
+    assert match.review_id == 1
+    assert 0.6 <= match.similarity < 1.0
+    assert index.check('Completely different words about a blender that broke after one week').review_id is None
+
+
+def test_index_evicts_oldest_entries():
+    index = NearDuplicateIndex(mode='flag', max_entries=1)
+    index.add(1, index.check(ORIGINAL).signature)
+    index.add(2, index.check(UNRELATED).signature)
+    assert index.check(ORIGINAL).review_id is None
+    assert index.check(UNRELATED).review_id == 2
+
+
+def test_off_mode_does_nothing():
+    index = NearDuplicateIndex(mode='off')
+    assert index.check(ORIGINAL) == (None, None, None)
+
+
+def _stored(db, text):
+    review = Review(
+        review_text=text,
+        sentiment='positive',
+        confidence_score=0.9,
+        key_points=['Powerful', 'Long battery life'],
+        sentiment_model=sentiment_analyzer.for_language(None).cache_key,
+        key_points_model=gemini_extractor.version,
+    )
+    db.add(review)
+    db.commit()
+    return review
+
+
+def test_reuse_requires_identical_text(db, stubs):
+    index = NearDuplicateIndex(mode='reuse', threshold=0.6)
+    review = _stored(db, ORIGINAL)
+    index.add(review.id, index.check(ORIGINAL).signature)
+
+    copy = index.check('  ' + ORIGINAL.upper())
+    assert index.reusable_analysis(copy, '  ' + ORIGINAL.upper()) == (
+        {'sentiment': 'positive', 'confidence': 0.9}, ['Powerful', 'Long battery life'])
+
+    # A negation is a near-duplicate but must be analyzed on its own
+    negated = index.check(NEGATED)
+    assert negated.review_id == review.id
+    assert index.reusable_analysis(negated, NEGATED) is None
+
+
+def test_reuse_threshold_and_flag_mode(db, stubs):
+    review = _stored(db, ORIGINAL)
+    lenient = NearDuplicateIndex(mode='reuse', threshold=0.6, reuse_threshold=0.6)
+    lenient.add(review.id, lenient.check(ORIGINAL).signature)
+    assert lenient.reusable_analysis(lenient.check(NEGATED), NEGATED) is not None
+
+    flag = NearDuplicateIndex(mode='flag', threshold=0.6)
+    flag.add(review.id, flag.check(ORIGINAL).signature)
+    assert flag.reusable_analysis(flag.check(ORIGINAL), ORIGINAL) is None
+
+
+def test_reuse_skips_stale_analysis(db, stubs):
+    index = NearDuplicateIndex(mode='reuse')
+    review = _stored(db, ORIGINAL)
+    review.key_points_model = 'older-model@prompt-1'
+    db.commit()
+    index.add(review.id, index.check(ORIGINAL).signature)
+    assert index.reusable_analysis(index.check(ORIGINAL), ORIGINAL) is None
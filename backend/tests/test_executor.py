@@ -0,0 +1,38 @@
+import time
+import pytest
+from app.executor import run_stages, StageError, StageTimeoutError
+
+
+def _sleep(seconds, result):
+    def stage():
+        time.sleep(seconds)
+        return result
+    return stage
+
+
+def test_stages_run_concurrently():
+    started = time.monotonic()
+    assert run_stages([('a', _sleep(0.2, 'a'), 5), ('b', _sleep(0.2, 'b'), 5)]) == ['a', 'b']
+    assert time.monotonic() - started < 0.35
+
+
+def test_timeouts_share_one_start_time():
+    started = time.monotonic()
+    with pytest.raises(StageError) as failure:
+        run_stages([('sentiment', _sleep(0.2, 'ok'), 1), ('key_points', _sleep(1, 'late'), 0.3)])
+    # key_points had 0.3s from submission, not 0.3s after sentiment finished
+    assert time.monotonic() - started < 0.45
+    assert failure.value.stage == 'key_points'
+    assert isinstance(failure.value.error, StageTimeoutError)
+    assert failure.value.completed == ['ok']
+
+
+def test_first_failure_in_stage_order_is_raised():
+    def broken():
+        raise ValueError('bad input')
+
+    with pytest.raises(StageError) as failure:
+        run_stages([('sentiment', broken, 1), ('key_points', _sleep(0, 'ok'), 1)])
+    assert failure.value.stage == 'sentiment'
+    assert isinstance(failure.value.error, ValueError)
+    assert failure.value.completed == []
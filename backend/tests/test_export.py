@@ -0,0 +1,72 @@
+import csv
+import io
+import json
+from datetime import datetime
+from pyramid import testing
+from app import views
+from app.export import export_stream, EXPORT_COLUMNS
+from app.models import Review
+
+
+def _add(db):
+    db.add_all([
+        Review(review_text='Export: loved it', sentiment='positive', confidence_score=0.9,
+               key_points=['Sturdy', 'Cheap'], status='completed', created_at=datetime(2025, 12, 1, 9)),
+        Review(review_text='Export: "broken", sadly', sentiment='negative', confidence_score=0.8,
+               key_points=None, status='completed', created_at=datetime(2025, 12, 2, 9)),
+        Review(review_text='Export: average', sentiment='neutral', confidence_score=0.6,
+               key_points=['Fine'], status='completed', created_at=datetime(2025, 12, 3, 9)),
+    ])
+    db.commit()
+
+
+def _ndjson(*args, **kwargs):
+    return [json.loads(line) for line in b''.join(export_stream('ndjson', *args, **kwargs)).decode('utf-8').splitlines()]
+
+
+def test_ndjson_one_review_per_line_with_filters(db):
+    _add(db)
+    rows = _ndjson()
+    assert [row['review_text'] for row in rows] == ['Export: loved it', 'Export: "broken", sadly', 'Export: average']
+    assert rows[0]['key_points'] == ['Sturdy', 'Cheap']
+    assert rows[0]['created_at'] == '2025-12-01T09:00:00'
+    assert set(rows[0]) == set(EXPORT_COLUMNS)
+
+    assert [row['sentiment'] for row in _ndjson(['negative', 'neutral'])] == ['negative', 'neutral']
+    assert [row['sentiment'] for row in _ndjson(date_from=datetime(2025, 12, 2), date_to=datetime(2025, 12, 3))] == [
+        'negative']
+
+
+def test_csv_streams_one_chunk_per_row(db):
+    _add(db)
+    chunks = list(export_stream('csv'))
+    # The header goes out with the first row
+    assert len(chunks) == 3
+    rows = list(csv.reader(io.StringIO(b''.join(chunks).decode('utf-8'))))
+    assert tuple(rows[0]) == EXPORT_COLUMNS
+    assert rows[1][1] == 'Export: loved it'
+    assert json.loads(rows[1][4]) == ['Sturdy', 'Cheap']
+    assert rows[2][1] == 'Export: "broken", sadly'
+    assert rows[2][4] == ''
+
+
+def test_empty_csv_export_has_the_header(db):
+    assert b''.join(export_stream('csv')).decode('utf-8').strip() == ','.join(EXPORT_COLUMNS)
+
+
+def test_export_view_validates_parameters(pyramid_config):
+    request = testing.DummyRequest(params={'format': 'xml'})
+    assert views.export_reviews(request)['status'] == 'error'
+    assert request.response.status_code == 400
+
+    request = testing.DummyRequest(params={'from': 'yesterday'})
+    assert views.export_reviews(request)['status'] == 'error'
+    assert request.response.status_code == 400
+
+
+def test_export_view_streams_attachment(pyramid_config, db):
+    _add(db)
+    response = views.export_reviews(testing.DummyRequest(params={'format': 'csv', 'sentiment': 'Positive'}))
+    assert response.content_type == 'text/csv'
+    assert response.content_disposition == 'attachment; filename="reviews.csv"'
+    assert b''.join(response.app_iter).decode('utf-8').count('\n') == 2
@@ -0,0 +1,37 @@
+import pytest
+from pyramid import testing
+from app.services.sentiment_analyzer import sentiment_analyzer
+from app.views import readiness_check
+
+
+@pytest.fixture
+def request_(pyramid_config):
+    return testing.DummyRequest()
+
+
+@pytest.fixture
+def routes(stubs, monkeypatch):
+    """Per-language models: 'id' is stubbed and ready, 'ja' is still loading"""
+    monkeypatch.setattr(sentiment_analyzer, 'routes', {})
+    sentiment_analyzer.configure_routes({'id': 'indonesian-model', 'ja': 'japanese-model'})
+    sentiment_analyzer.routes['id'].install_pipeline(sentiment_analyzer.analyzer)
+    return sentiment_analyzer.routes
+
+
+def test_ready_when_all_models_are_initialized(request_, stubs):
+    body = readiness_check(request_)
+    assert body['status'] == 'ready'
+    assert body['components']['sentiment_model']['ready']
+
+
+def test_ready_waits_for_routed_sentiment_models(request_, routes):
+    body = readiness_check(request_)
+    assert request_.response.status_code == 503
+    sentiment = body['components']['sentiment_model']
+    assert not sentiment['ready']
+    assert sentiment['languages']['id']['ready']
+    assert not sentiment['languages']['ja']['ready']
+    assert sentiment['languages']['ja']['model'] == 'japanese-model'
+
+    routes['ja'].install_pipeline(sentiment_analyzer.analyzer)
+    assert readiness_check(request_)['status'] == 'ready'
@@ -0,0 +1,52 @@
+from datetime import datetime
+from webob import Request
+from app.http_cache import Validators
+from app.models import Review
+
+
+def _validators(db, path='/api/reviews?limit=10', **headers):
+    return Validators.load(Request.blank(path, headers=headers), db)
+
+
+def test_etag_depends_on_path_and_data(db):
+    db.add(Review(review_text='first', updated_at=datetime(2025, 12, 1, 10, 0, 0, 500)))
+    db.commit()
+    first = _validators(db)
+    assert first.etag == _validators(db).etag
+    assert first.etag != _validators(db, '/api/reviews?limit=20').etag
+    assert first.last_modified == datetime(2025, 12, 1, 10, 0, 0)
+
+    db.add(Review(review_text='second', updated_at=datetime(2025, 12, 1, 11, 0, 0)))
+    db.commit()
+    assert _validators(db).etag != first.etag
+
+
+def test_empty_table(db):
+    validators = _validators(db)
+    assert validators.last_modified is None
+    assert not validators.matches(Request.blank('/', headers={'If-Modified-Since': 'Mon, 01 Dec 2025 10:00:00 GMT'}))
+
+
+def test_conditional_request_matching(db):
+    db.add(Review(review_text='first', updated_at=datetime(2025, 12, 1, 10, 0, 0)))
+    db.commit()
+    validators = _validators(db)
+
+    assert validators.matches(Request.blank('/', headers={'If-None-Match': f'W/"{validators.etag}"'}))
+    assert not validators.matches(Request.blank('/', headers={'If-None-Match': '"other"'}))
+    assert validators.matches(Request.blank('/', headers={'If-Modified-Since': 'Mon, 01 Dec 2025 10:00:00 GMT'}))
+    assert not validators.matches(Request.blank('/', headers={'If-Modified-Since': 'Mon, 01 Dec 2025 09:59:59 GMT'}))
+    # If-None-Match wins over If-Modified-Since
+    assert not validators.matches(Request.blank('/', headers={
+        'If-None-Match': '"other"', 'If-Modified-Since': 'Mon, 01 Dec 2025 10:00:00 GMT'}))
+
+
+def test_not_modified_response(db):
+    db.add(Review(review_text='first', updated_at=datetime(2025, 12, 1, 10, 0, 0)))
+    db.commit()
+    validators = _validators(db)
+    response = validators.not_modified()
+    assert response.status_code == 304
+    assert response.headers['ETag'] == f'W/"{validators.etag}"'
+    assert response.headers['Last-Modified'] == 'Mon, 01 Dec 2025 10:00:00 GMT'
+    assert response.headers['Cache-Control'] == 'no-cache'
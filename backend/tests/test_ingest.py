@@ -0,0 +1,76 @@
+import json
+import pytest
+from pyramid.request import Request
+from app import ingest, views
+from app.models import Review
+
+
+def _bulk_request(config, body, content_type='application/json'):
+    request = Request.blank('/api/analyze-reviews', POST=body, content_type=content_type)
+    request.registry = config.registry
+    return request
+
+
+def test_ingest_reports_invalid_entries_per_item(db, stubs):
+    results = ingest.ingest_reviews([
+        'Bulk ingest: sturdy and cheap',
+        '   ',
+        42,
+        ValueError('Invalid JSON on line 4: Expecting value'),
+        None,
+        'Bulk ingest: broke after a week',
+    ])
+    assert [item['index'] for item in results] == [0, 1, 2, 3, 4, 5]
+    assert [item['status'] for item in results] == ['success', 'error', 'error', 'error', 'error', 'success']
+    assert results[1]['error'] == results[4]['error'] == 'review_text is required and cannot be empty'
+    assert results[2]['error'] == 'review_text must be a string, got int'
+    assert results[3]['error'] == 'Invalid JSON on line 4: Expecting value'
+    assert db.query(Review).count() == 2
+
+
+def test_ingest_processes_chunks_in_order(db, stubs, monkeypatch):
+    monkeypatch.setattr(ingest, 'BULK_CHUNK_SIZE', 2)
+    texts = [f'Bulk ingest chunk review {n}' for n in range(5)]
+    results = ingest.ingest_reviews(texts)
+    assert [item['data']['review_text'] for item in results] == texts
+    assert all(item['data']['key_points_status'] == 'completed' for item in results)
+
+
+def test_ingest_with_skip_policy_runs_sentiment_only(db, stubs):
+    calls = stubs.calls
+    item, = ingest.ingest_reviews(['Bulk ingest without key points'], policy='skip')
+    assert item['data']['sentiment'] is not None
+    assert item['data']['key_points_status'] == 'skipped'
+    assert stubs.calls == calls
+
+
+def test_ndjson_body_reports_bad_lines(pyramid_config, db, stubs):
+    body = '\n'.join([
+        json.dumps('NDJSON review one'),
+        '{"review_text": "unterminated',
+        '',
+        json.dumps({'review_text': 'NDJSON review two'}),
+        json.dumps({'review_text': 7}),
+    ])
+    response = views.analyze_reviews(_bulk_request(pyramid_config, body, 'application/x-ndjson'))
+    data = response['data']
+    assert (data['total'], data['succeeded'], data['failed']) == (4, 2, 2)
+    assert data['results'][1]['error'].startswith('Invalid JSON on line 2')
+    assert data['results'][3]['error'] == 'review_text must be a string, got int'
+
+
+def test_json_body_shapes(pyramid_config, db, stubs):
+    wrapped = views.analyze_reviews(_bulk_request(pyramid_config, json.dumps({'reviews': ['JSON wrapped review']})))
+    assert wrapped['data']['succeeded'] == 1
+
+    request = _bulk_request(pyramid_config, json.dumps({'review_text': 'not a list'}))
+    assert views.analyze_reviews(request)['status'] == 'error'
+    assert request.response.status_code == 400
+
+
+@pytest.mark.parametrize('body, status', [('[]', 400), ('["a", "b", "c"]', 413)])
+def test_empty_and_oversized_requests(pyramid_config, monkeypatch, body, status):
+    monkeypatch.setattr(views, 'MAX_BULK_REVIEWS', 2)
+    request = _bulk_request(pyramid_config, body)
+    assert views.analyze_reviews(request)['status'] == 'error'
+    assert request.response.status_code == status
@@ -0,0 +1,68 @@
+from app.jobs import JobQueue
+from app.models import Review
+from app.services.gemini_extractor import gemini_extractor
+from app.services.resilience import CircuitOpenError
+
+
+def _pending(db, texts, policy=None):
+    reviews = [Review(review_text=text, status='pending', key_points_status='pending', key_points_policy=policy)
+               for text in texts]
+    db.add_all(reviews)
+    db.commit()
+    return [review.id for review in reviews]
+
+
+def _results(db, ids):
+    db.expire_all()
+    return [db.get(Review, review_id) for review_id in ids]
+
+
+def test_process_completes_batch(db, stubs):
+    ids = _pending(db, ['Job queue review one, works well', 'Job queue review two, broke quickly'])
+    JobQueue()._process(ids)
+    for review in _results(db, ids):
+        assert review.status == 'completed'
+        assert review.key_points_status == 'completed'
+        assert review.sentiment in ('positive', 'negative', 'neutral')
+        assert review.key_points and review.key_points_model == gemini_extractor.version
+
+
+def test_process_applies_key_points_policy(db, stubs):
+    ids = _pending(db, ['Job queue review with skipped key points'], policy='skip')
+    JobQueue()._process(ids)
+    review, = _results(db, ids)
+    assert review.status == 'completed'
+    assert review.key_points_status == 'skipped'
+    assert review.key_points is None
+
+
+def _gemini_down(monkeypatch, degraded):
+    def unavailable(prompt):
+        raise CircuitOpenError('Gemini circuit is open')
+
+    monkeypatch.setattr(gemini_extractor, '_generate', unavailable)
+    monkeypatch.setattr(gemini_extractor, 'degraded_mode', degraded)
+
+
+def test_degraded_mode_keeps_sentiment_and_defers_key_points(db, stubs, monkeypatch):
+    _gemini_down(monkeypatch, degraded=True)
+    single = _pending(db, ['Degraded job, a single review'])
+    batch = _pending(db, ['Degraded job, first of a batch', 'Degraded job, second of a batch'])
+    queue = JobQueue()
+    queue._process(single)
+    queue._process(batch)
+    for review in _results(db, single + batch):
+        assert review.status == 'completed'
+        assert review.sentiment is not None
+        assert review.key_points_status == 'pending'
+        assert review.key_points is None and review.key_points_model is None
+
+
+def test_gemini_outage_fails_reviews_without_degraded_mode(db, stubs, monkeypatch):
+    _gemini_down(monkeypatch, degraded=False)
+    ids = _pending(db, ['Failing job, first of a batch', 'Failing job, second of a batch'])
+    JobQueue()._process(ids)
+    for review in _results(db, ids):
+        assert review.status == 'failed'
+        assert review.key_points_status == 'failed'
+        assert review.error_message.startswith('Key points extraction failed')
@@ -0,0 +1,70 @@
+import json
+import threading
+from app import ingest
+from app.services.gemini_extractor import gemini_extractor
+from app.services.resilience import CircuitOpenError
+
+
+class _Response:
+    def __init__(self, value):
+        self.text = json.dumps(value)
+
+
+def test_pack_limits_reviews_and_tokens(monkeypatch):
+    monkeypatch.setattr(gemini_extractor, 'batch_size', 3)
+    assert gemini_extractor.pack(['short'] * 7) == [[0, 1, 2], [3, 4, 5], [6]]
+
+    monkeypatch.setattr(gemini_extractor, 'batch_token_budget', 1000)
+    long_text = 'x' * 2000
+    assert gemini_extractor.pack([long_text, long_text, 'short']) == [[0], [1, 2]]
+
+
+def test_one_request_per_pack(stubs):
+    calls = stubs.calls
+    results = gemini_extractor.extract_key_points_batch(['Packed review one', 'Packed review two'])
+    assert stubs.calls == calls + 1
+    assert all(isinstance(points, list) and points for points in results)
+
+
+def test_items_missing_from_the_pack_fall_back_to_single_requests(stubs, monkeypatch):
+    prompts = []
+
+    def generate(prompt):
+        prompts.append(prompt)
+        if len(prompts) == 1:
+            return _Response({'0': ['Good screen'], '1': 'not a list'})
+        return _Response(['Single request point'])
+
+    monkeypatch.setattr(gemini_extractor, '_generate', generate)
+    assert gemini_extractor.extract_key_points_batch(['Packed review one', 'Packed review two']) == [
+        ['Good screen'], ['Single request point']]
+    assert len(prompts) == 2
+
+
+def test_unavailable_pack_fails_every_item_without_fallback(stubs, monkeypatch):
+    prompts = []
+
+    def generate(prompt):
+        prompts.append(prompt)
+        raise CircuitOpenError('Gemini circuit is open')
+
+    monkeypatch.setattr(gemini_extractor, '_generate', generate)
+    results = gemini_extractor.extract_key_points_batch(['Outage review one', 'Outage review two', 'Outage review three'])
+    assert all(isinstance(result, CircuitOpenError) for result in results)
+    assert len(prompts) == 1
+
+
+def test_packs_run_on_the_bulk_executor_grouped_by_language(stubs, monkeypatch):
+    seen = []
+
+    def batch(texts, language=None):
+        seen.append((threading.current_thread().name, language, list(texts)))
+        return [[f'Point for {text}'] for text in texts]
+
+    monkeypatch.setattr(gemini_extractor, 'extract_key_points_batch', batch)
+    texts = ['Executor review en one', 'Executor review id one', 'Executor review en two']
+    results = ingest.extract_key_points_many(texts, ['en', 'id', 'en'])
+    assert results == [[f'Point for {text}'] for text in texts]
+    assert all(thread.startswith('bulk-key-points') for thread, _, _ in seen)
+    assert sorted((language, batch_texts) for _, language, batch_texts in seen) == [
+        ('en', [texts[0], texts[2]]), ('id', [texts[1]])]
@@ -0,0 +1,76 @@
+import pytest
+from app import ingest
+from app.benchmark import StubSentimentPipeline
+from app.metrics import SENTIMENT_ROUTED
+from app.services.gemini_extractor import gemini_extractor
+from app.services.language import LanguageDetector
+from app.services.sentiment_analyzer import SentimentAnalyzer, parse_language_models, sentiment_analyzer
+
+
+@pytest.fixture
+def detector(monkeypatch):
+    monkeypatch.setenv('LANGUAGE_ID_BACKEND', 'stopwords')
+    monkeypatch.setenv('LANGUAGE_ID_LANGUAGES', 'id,en')
+    return LanguageDetector()
+
+
+def test_stopword_detection(detector):
+    assert detector.detect('Barangnya bagus banget dan pengiriman cepat, penjual ramah') == 'id'
+    assert detector.detect('The quality is great and the delivery was really fast') == 'en'
+    # Mixed evidence is left to the multilingual path
+    assert detector.detect('Bagus, good') is None
+    assert detector.detect('12345 !!!') is None
+    assert detector.detect_many(['yang bagus sekali', 'it is good']) == ['id', 'en']
+
+
+def test_detection_can_be_turned_off(monkeypatch):
+    monkeypatch.setenv('LANGUAGE_ID_BACKEND', 'off')
+    assert LanguageDetector().detect('The quality is great and the delivery was really fast') is None
+
+
+def test_parse_language_models():
+    assert parse_language_models('en=small-en, id = small-id,,bad') == {'en': 'small-en', 'id': 'small-id'}
+    assert parse_language_models('') == {}
+
+
+class _Pipeline(StubSentimentPipeline):
+    def __init__(self):
+        super().__init__(base_ms=0, per_item_ms=0)
+        self.texts = []
+
+    def __call__(self, texts, **kwargs):
+        self.texts.extend(texts)
+        return super().__call__(texts, **kwargs)
+
+
+def test_sentiment_routes_by_language(stubs, monkeypatch):
+    indonesian = SentimentAnalyzer('small-id', language='id')
+    pipeline = _Pipeline()
+    indonesian.install_pipeline(pipeline)
+    monkeypatch.setattr(sentiment_analyzer, 'routes', {'id': indonesian})
+    assert sentiment_analyzer.for_language('id') is indonesian
+    assert sentiment_analyzer.for_language('en') is sentiment_analyzer
+
+    before = SENTIMENT_ROUTED.snapshot()
+    texts = ['Routing: barangnya bagus', 'Routing: great product', 'Routing: unknown language']
+    results = ingest.analyze_sentiments(texts, ['id', 'en', None])
+    assert all(isinstance(result, dict) for result in results)
+    assert pipeline.texts == [texts[0]]
+    after = SENTIMENT_ROUTED.snapshot()
+    assert after[('id', 'small-id')] == before.get(('id', 'small-id'), 0) + 1
+    assert after[('unknown', sentiment_analyzer.model_name)] == before.get(('unknown', sentiment_analyzer.model_name), 0) + 1
+
+
+def test_key_point_prompt_names_the_detected_language(stubs, monkeypatch):
+    prompts = []
+    generate = gemini_extractor._generate
+
+    def recording(prompt):
+        prompts.append(prompt)
+        return generate(prompt)
+
+    monkeypatch.setattr(gemini_extractor, '_generate', recording)
+    gemini_extractor.extract_key_points('Barangnya bagus banget', 'id')
+    gemini_extractor.extract_key_points('Great product', None)
+    assert 'Write them in Indonesian' in prompts[0]
+    assert 'SAME language' in prompts[1]
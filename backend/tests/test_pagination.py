@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+import pytest
+from app.models import Review
+from app.pagination import encode_cursor, decode_cursor, keyset_page
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 12, 6, 16, 30, 0, 123456)
+    cursor = encode_cursor(created_at, 42)
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == (created_at, 42)
+
+
+@pytest.mark.parametrize('cursor', ['', 'not-a-cursor', 'WzEsIDJd', '!!!'])
+def test_malformed_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_keyset_pages_cover_every_row_once(db):
+    start = datetime(2025, 12, 1)
+    # Several rows share a created_at so the id tie-breaker matters
+    stamps = [start, start, start + timedelta(hours=1), start + timedelta(hours=1), start + timedelta(hours=2)]
+    db.add_all([Review(review_text=f'review {n}', created_at=stamp) for n, stamp in enumerate(stamps)])
+    db.commit()
+    expected = [review.id for review in db.query(Review).order_by(Review.created_at.desc(), Review.id.desc())]
+
+    seen = []
+    cursor = None
+    for _ in range(10):
+        reviews, cursor = keyset_page(db.query(Review), cursor, 2)
+        seen.extend(review.id for review in reviews)
+        if cursor is None:
+            break
+    assert seen == expected
+
+
+def test_keyset_last_full_page_has_no_cursor(db):
+    db.add_all([Review(review_text=f'review {n}') for n in range(2)])
+    db.commit()
+    reviews, cursor = keyset_page(db.query(Review), None, 2)
+    assert len(reviews) == 2
+    assert cursor is None
@@ -0,0 +1,50 @@
+import pytest
+from app.metrics import KEY_POINTS_DECISIONS
+from app.policy import KeyPointsPolicy
+
+POSITIVE = {'sentiment': 'positive', 'confidence': 0.95}
+NEGATIVE = {'sentiment': 'negative', 'confidence': 0.95}
+UNSURE = {'sentiment': 'positive', 'confidence': 0.4}
+
+
+def test_resolve():
+    policy = KeyPointsPolicy(default='defer')
+    assert policy.resolve(None) == 'defer'
+    assert policy.resolve('') == 'defer'
+    assert policy.resolve('SKIP') == 'skip'
+    with pytest.raises(ValueError):
+        policy.resolve('later')
+
+
+def test_unknown_default_falls_back_to_sync():
+    assert KeyPointsPolicy(default='later').default == 'sync'
+
+
+def test_skip_and_defer():
+    policy = KeyPointsPolicy(sample_rate=1.0, sentiments=['negative'])
+    assert policy.status_after_sentiment('skip', 'review', NEGATIVE) == 'skipped'
+    assert policy.status_after_sentiment('defer', 'review', POSITIVE) == 'pending'
+
+
+def test_sample_selects_negative_and_low_confidence():
+    policy = KeyPointsPolicy(sample_rate=0.0, confidence_below=0.6, sentiments=['negative'])
+    assert policy.status_after_sentiment('sample', 'review', NEGATIVE) == 'pending'
+    assert policy.status_after_sentiment('sample', 'review', UNSURE) == 'pending'
+    assert policy.status_after_sentiment('sample', 'review', POSITIVE) == 'skipped'
+
+
+def test_sample_rate_is_deterministic():
+    policy = KeyPointsPolicy(sample_rate=0.5)
+    texts = [f'review number {n}' for n in range(200)]
+    selected = [text for text in texts if policy.selects(text, POSITIVE)]
+    assert 60 < len(selected) < 140
+    # Same decision for a resubmitted copy of the same review
+    assert all(policy.selects(f'  {text.upper()} ', POSITIVE) for text in selected)
+    assert not any(KeyPointsPolicy(sample_rate=0.0).selects(text, POSITIVE) for text in texts)
+    assert all(KeyPointsPolicy(sample_rate=1.0).selects(text, POSITIVE) for text in texts)
+
+
+def test_decisions_are_counted():
+    before = KEY_POINTS_DECISIONS.snapshot().get(('skip', 'skipped'), 0)
+    KeyPointsPolicy().status_after_sentiment('skip', 'review', POSITIVE)
+    assert KEY_POINTS_DECISIONS.snapshot()[('skip', 'skipped')] == before + 1
@@ -0,0 +1,65 @@
+from app.models import Review
+from app.reprocess import current_versions, reprocess
+from app.services.gemini_extractor import gemini_extractor
+
+
+def _stored(db, text, sentiment_model, key_points_model, key_points_status='completed'):
+    review = Review(
+        review_text=text,
+        language='en',
+        sentiment='neutral',
+        confidence_score=0.5,
+        key_points=['Stored point'] if key_points_status == 'completed' else None,
+        key_points_status=key_points_status,
+        sentiment_model=sentiment_model,
+        key_points_model=key_points_model,
+        status='completed',
+    )
+    db.add(review)
+    db.commit()
+    return review.id
+
+
+def _reviews(db, ids):
+    db.expire_all()
+    return [db.get(Review, review_id) for review_id in ids]
+
+
+def test_each_stage_rescores_only_stale_rows(db, stubs):
+    versions = current_versions()
+    current_sentiment = versions['sentiment_languages'].get('en', versions['sentiment'])
+    calls = stubs.calls
+    stale_key_points = _stored(db, 'Reprocess: only the key points are stale', current_sentiment, 'old@prompt-1')
+    stale_sentiment = _stored(db, 'Reprocess: only the sentiment is stale', 'old-model', versions['key_points'])
+    skipped = _stored(db, 'Reprocess: key points skipped by policy', 'old-model', None, key_points_status='skipped')
+
+    result = reprocess(checkpoint_path=None)
+    assert result['processed'] == 3
+    assert result['updated'] == 3 and result['failed'] == 0
+
+    key_points_row, sentiment_row, skipped_row = _reviews(db, [stale_key_points, stale_sentiment, skipped])
+    assert key_points_row.key_points_model == versions['key_points']
+    assert key_points_row.key_points != ['Stored point']
+    assert key_points_row.sentiment == 'neutral'
+
+    assert sentiment_row.sentiment_model == current_sentiment
+    assert sentiment_row.sentiment != 'neutral' or sentiment_row.confidence_score != 0.5
+    assert sentiment_row.key_points == ['Stored point']
+
+    assert skipped_row.key_points_status == 'skipped' and skipped_row.key_points is None
+    # Only the row with stale key points went to Gemini
+    assert stubs.calls == calls + 1
+
+
+def test_current_rows_are_left_alone_unless_forced(db, stubs):
+    versions = current_versions()
+    current_sentiment = versions['sentiment_languages'].get('en', versions['sentiment'])
+    review_id = _stored(db, 'Reprocess: everything is current', current_sentiment, versions['key_points'])
+    assert reprocess(checkpoint_path=None)['processed'] == 0
+
+    calls = stubs.calls
+    result = reprocess(checkpoint_path=None, force=True)
+    assert result['updated'] == 1
+    review, = _reviews(db, [review_id])
+    assert review.key_points != ['Stored point']
+    assert stubs.calls == calls + 1
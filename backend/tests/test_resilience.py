@@ -0,0 +1,166 @@
+import time
+import pytest
+from app.services.resilience import (
+    TokenBucket, CircuitBreaker, ResilientCaller, CircuitOpenError, RateLimitTimeoutError,
+    is_retryable, is_unavailable
+)
+
+
+def test_error_classification():
+    assert is_retryable(RuntimeError('503 Service Unavailable'))
+    assert is_retryable(RuntimeError('Quota exceeded for this project'))
+    assert not is_retryable(ValueError('Invalid JSON in response'))
+    assert not is_retryable(CircuitOpenError('open'))
+    assert is_unavailable(CircuitOpenError('open'))
+    assert is_unavailable(RateLimitTimeoutError('no slot'))
+    assert not is_unavailable(ValueError('bad input'))
+
+
+class _APIError(Exception):
+    def __init__(self, message, code):
+        super().__init__(message)
+        self.code = code
+
+
+def test_retryable_status_codes_not_numbers_in_the_message():
+    assert is_retryable(_APIError('Internal error', 500))
+    assert is_retryable(_APIError('Resource exhausted', 429))
+    assert not is_retryable(_APIError('Request contains 500 tokens over the limit', 400))
+    assert not is_retryable(ValueError('Response listed 500 key points, expected at most 5'))
+    assert not is_retryable(ValueError('Review 5030 has no text'))
+    assert is_retryable(RuntimeError('504 Deadline exceeded'))
+
+
+def test_token_bucket_allows_burst_then_times_out():
+    bucket = TokenBucket(rate=0.001, burst=3)
+    for _ in range(3):
+        bucket.acquire(timeout=0)
+    with pytest.raises(RateLimitTimeoutError):
+        bucket.acquire(timeout=0.01)
+
+
+def test_token_bucket_refills_at_rate():
+    bucket = TokenBucket(rate=100, burst=1)
+    bucket.acquire()
+    started = time.monotonic()
+    bucket.acquire(timeout=1)
+    assert time.monotonic() - started < 0.5
+    assert bucket.waits == 1
+
+
+def test_token_bucket_zero_rate_is_unlimited():
+    bucket = TokenBucket(rate=0, burst=1)
+    for _ in range(100):
+        bucket.acquire(timeout=0)
+
+
+def test_token_bucket_split():
+    bucket = TokenBucket(rate=2.0, burst=10)
+    bucket.split(4)
+    assert bucket.rate == 0.5
+    assert bucket.burst == 2
+    bucket.acquire(timeout=0)
+    bucket.acquire(timeout=0)
+    with pytest.raises(RateLimitTimeoutError):
+        bucket.acquire(timeout=0)
+
+
+def test_breaker_opens_after_threshold_and_fails_fast():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert breaker.opened_count == 1
+    assert breaker.rejected_count == 1
+
+
+def test_breaker_half_open_allows_one_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_failed_trial_reopens():
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=0.01)
+    for _ in range(5):
+        breaker.record_failure()
+    time.sleep(0.02)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.opened_count == 2
+
+
+def _caller(max_retries=3, failure_threshold=100):
+    return ResilientCaller(TokenBucket(rate=0, burst=1), CircuitBreaker(failure_threshold, 60),
+                           max_retries=max_retries, backoff_base=0, backoff_max=0)
+
+
+def test_caller_retries_transient_errors():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError('503 Service Unavailable')
+        return 'ok'
+
+    caller = _caller()
+    assert caller.call(flaky) == 'ok'
+    assert caller.stats()['retries'] == 2
+    assert caller.stats()['calls'] == 3
+
+
+def test_caller_raises_permanent_errors_without_retry():
+    caller = _caller()
+
+    def bad():
+        raise ValueError('bad request')
+
+    with pytest.raises(ValueError):
+        caller.call(bad)
+    assert caller.stats()['calls'] == 1
+    assert caller.stats()['circuit_state'] == CircuitBreaker.CLOSED
+
+
+def test_caller_gives_up_after_max_retries_and_opens_breaker():
+    caller = _caller(max_retries=2, failure_threshold=3)
+    calls = []
+
+    def down():
+        calls.append(1)
+        raise RuntimeError('503 Service Unavailable')
+
+    with pytest.raises(RuntimeError):
+        caller.call(down)
+    assert len(calls) == 3
+    assert caller.stats()['failures'] == 1
+    with pytest.raises(CircuitOpenError):
+        caller.call(down)
+    assert len(calls) == 3
+
+
+def test_rate_limit_timeout_releases_half_open_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    caller = ResilientCaller(TokenBucket(rate=0.001, burst=1), breaker, max_retries=0, acquire_timeout=0)
+    caller.rate_limiter.acquire()
+    breaker.record_failure()
+    time.sleep(0.02)
+    with pytest.raises(RateLimitTimeoutError):
+        caller.call(lambda: 'ok')
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # The trial slot is free again: the next call is let through
+    caller.rate_limiter.rate = 0
+    assert caller.call(lambda: 'ok') == 'ok'
+    assert breaker.state == CircuitBreaker.CLOSED
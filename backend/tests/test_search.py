@@ -0,0 +1,51 @@
+import pytest
+from app.models import Review
+from app.search import search_reviews, encode_rank_cursor, decode_rank_cursor
+
+
+def _add(db, texts, sentiment='positive'):
+    reviews = [Review(review_text=text, sentiment=sentiment, status='completed') for text in texts]
+    db.add_all(reviews)
+    db.commit()
+    return [review.id for review in reviews]
+
+
+def _pages(db, q, limit, **kwargs):
+    ids, cursor = [], None
+    while True:
+        rows, cursor = search_reviews(db, q, cursor=cursor, limit=limit, **kwargs)
+        ids.extend(row.id for row in rows)
+        if cursor is None:
+            return ids
+
+
+def test_matches_text_and_filters_sentiment(db):
+    battery, = _add(db, ['Battery lasts two days'])
+    _add(db, ['Battery died within a week'], sentiment='negative')
+    _add(db, ['Shipping was fast'])
+    rows, cursor = search_reviews(db, 'battery', sentiments=['positive'])
+    assert [row.id for row in rows] == [battery]
+    assert cursor is None
+
+
+def test_relevance_cursor_pages_through_tied_ranks(db):
+    # Identical texts tie on rank, so the id tiebreaker alone orders them
+    ids = _add(db, ['Kemasan rapi dan pengiriman cepat'] * 7)
+    assert _pages(db, 'pengiriman', limit=2) == sorted(ids, reverse=True)
+
+
+def test_newest_cursor_pages_through_results(db):
+    ids = _add(db, [f'Blender number {n} is loud' for n in range(5)])
+    assert sorted(_pages(db, 'blender', limit=2, sort='newest')) == sorted(ids)
+
+
+def test_rank_cursor_round_trip():
+    rank = 0.1 + 0.2
+    assert decode_rank_cursor(encode_rank_cursor(rank, 42)) == (rank, 42)
+    with pytest.raises(ValueError):
+        decode_rank_cursor('not-a-cursor')
+
+
+def test_query_without_words_is_rejected(db):
+    with pytest.raises(ValueError):
+        search_reviews(db, '!!!')
@@ -0,0 +1,176 @@
+import threading
+import pytest
+from app.benchmark import StubSentimentPipeline
+from app.services.sentiment_analyzer import SentimentAnalyzer
+
+
+class RecordingPipeline(StubSentimentPipeline):
+    """Stub pipeline that remembers the inputs of every forward pass"""
+
+    def __init__(self, fail=False):
+        super().__init__(base_ms=0, per_item_ms=0)
+        self.fail = fail
+        self.passes = []
+
+    def __call__(self, texts, **kwargs):
+        self.passes.append(list(texts))
+        if self.fail:
+            raise RuntimeError('forward pass failed')
+        return super().__call__(texts, **kwargs)
+
+
+def _analyzer(pipeline, batch_size=4, batch_wait_ms=200):
+    analyzer = SentimentAnalyzer('test-model', language='en')
+    analyzer.batch_size = batch_size
+    analyzer.batch_wait = batch_wait_ms / 1000.0
+    analyzer.install_pipeline(pipeline)
+    return analyzer
+
+
+def _analyze_concurrently(analyzer, texts):
+    results = [None] * len(texts)
+
+    def run(pos):
+        try:
+            results[pos] = analyzer.analyze(texts[pos])
+        except Exception as e:
+            results[pos] = e
+
+    threads = [threading.Thread(target=run, args=(pos,)) for pos in range(len(texts))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return results
+
+
+def test_concurrent_calls_share_forward_passes():
+    pipeline = RecordingPipeline()
+    analyzer = _analyzer(pipeline)
+    texts = [f'great product number {n}' if n % 2 else f'terrible product number {n}' for n in range(8)]
+    results = _analyze_concurrently(analyzer, texts)
+
+    assert len(pipeline.passes) < len(texts)
+    assert max(len(batch) for batch in pipeline.passes) <= 4
+    assert sorted(text for batch in pipeline.passes for text in batch) == sorted(texts)
+    # Every caller gets the result for its own text
+    for text, result in zip(texts, results):
+        assert result['sentiment'] == ('positive' if 'great' in text else 'negative')
+
+
+def test_batch_error_reaches_every_caller():
+    analyzer = _analyzer(RecordingPipeline(fail=True))
+    results = _analyze_concurrently(analyzer, ['first review', 'second review'])
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_batch_size_one_skips_the_queue():
+    pipeline = RecordingPipeline()
+    analyzer = _analyzer(pipeline, batch_size=1)
+    assert analyzer.analyze('great phone')['sentiment'] == 'positive'
+    assert analyzer._worker is None
+    assert pipeline.passes == [['great phone']]
+
+
+def test_analyze_batch_splits_by_batch_size():
+    pipeline = RecordingPipeline()
+    analyzer = _analyzer(pipeline, batch_size=4)
+    results = analyzer.analyze_batch([f'review {n}' for n in range(10)])
+    assert len(results) == 10
+    assert [len(batch) for batch in pipeline.passes] == [4, 4, 2]
+
+
+def test_empty_text_is_rejected():
+    analyzer = _analyzer(RecordingPipeline())
+    with pytest.raises(ValueError):
+        analyzer.analyze('   ')
+    with pytest.raises(ValueError):
+        analyzer.analyze_batch(['fine', ''])
+
+
+class WordTokenizer:
+    """Fast-tokenizer stand-in: one token per word, no special tokens"""
+
+    is_fast = True
+    model_max_length = 512
+
+    def num_special_tokens_to_add(self):
+        return 0
+
+    def __call__(self, text, add_special_tokens=False, return_offsets_mapping=False):
+        offsets, start = [], None
+        for pos, char in enumerate(text + ' '):
+            if char != ' ' and start is None:
+                start = pos
+            elif char == ' ' and start is not None:
+                offsets.append((start, pos))
+                start = None
+        return {'offset_mapping': offsets}
+
+
+class TokenizedPipeline(RecordingPipeline):
+    tokenizer = WordTokenizer()
+
+    def __call__(self, texts, **kwargs):
+        self.passes.append(list(texts))
+        if kwargs.get('top_k', 0) is None:
+            return [[{'label': 'positive', 'score': 0.9 if 'great' in text else 0.2},
+                     {'label': 'negative', 'score': 0.1 if 'great' in text else 0.8}] for text in texts]
+        return StubSentimentPipeline.__call__(self, texts)
+
+
+def _long_text_analyzer(mode, max_tokens=10, overlap=2, max_chunks=8):
+    pipeline = TokenizedPipeline()
+    analyzer = _analyzer(pipeline, batch_size=1)
+    analyzer.long_text_mode = mode
+    analyzer.max_tokens = max_tokens
+    analyzer.chunk_overlap = overlap
+    analyzer.max_chunks = max_chunks
+    return analyzer, pipeline
+
+
+def _words(count, word='word'):
+    return ' '.join(f'{word}{n}' for n in range(count))
+
+
+def test_short_text_is_scored_whole():
+    analyzer, pipeline = _long_text_analyzer('truncate')
+    result = analyzer.analyze('great phone')
+    assert (result['truncated'], result['chunks']) == (False, 1)
+    assert pipeline.passes == [['great phone']]
+
+
+def test_truncate_cuts_on_a_token_boundary():
+    analyzer, pipeline = _long_text_analyzer('truncate')
+    result = analyzer.analyze(_words(25))
+    assert (result['truncated'], result['chunks']) == (True, 1)
+    assert pipeline.passes == [[_words(10)]]
+
+
+def test_chunk_scores_overlapping_windows_in_one_pass():
+    analyzer, pipeline = _long_text_analyzer('chunk')
+    text = _words(10, 'great') + ' ' + _words(12, 'bad')
+    result = analyzer.analyze(text)
+    windows = pipeline.passes[0]
+    assert len(pipeline.passes) == 1
+    assert result['chunks'] == len(windows) == 3
+    assert not result['truncated']
+    # 8-token step: each window starts two tokens before the previous one ends
+    assert windows[0].split()[-2:] == windows[1].split()[:2]
+    assert windows[-1].endswith('bad11')
+    assert analyzer.cache_key == 'test-model:chunk'
+
+
+def test_chunk_combines_scores_weighted_by_window_length():
+    analyzer, _ = _long_text_analyzer('chunk', overlap=0)
+    # Two 10-token positive windows outweigh one 2-token negative window
+    result = analyzer.analyze(_words(20, 'great') + ' ' + _words(2, 'bad'))
+    assert result['sentiment'] == 'positive'
+    assert result['confidence'] == pytest.approx((0.9 * 20 + 0.2 * 2) / 22, abs=1e-4)
+
+
+def test_chunk_count_is_capped():
+    analyzer, pipeline = _long_text_analyzer('chunk', overlap=0, max_chunks=2)
+    result = analyzer.analyze(_words(35))
+    assert (result['truncated'], result['chunks']) == (True, 2)
+    assert len(pipeline.passes[0]) == 2
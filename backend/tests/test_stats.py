@@ -0,0 +1,84 @@
+from datetime import datetime
+import pytest
+from app.models import Review, SentimentRollup
+from app.stats import record_reviews, rebuild_rollups, sentiment_stats
+
+
+def _clear(db):
+    db.rollback()
+    db.query(SentimentRollup).delete()
+    db.commit()
+
+
+@pytest.fixture
+def rollups(db):
+    """Session on empty reviews and rollup tables (other tests leave rollups behind)"""
+    _clear(db)
+    yield db
+    _clear(db)
+
+
+def _review(created_at, sentiment, confidence):
+    return Review(review_text='Stats review', sentiment=sentiment, confidence_score=confidence,
+                  status='completed', created_at=created_at)
+
+
+def _counts(db):
+    return {(rollup.bucket_start, rollup.sentiment): (rollup.review_count, round(rollup.confidence_sum, 4))
+            for rollup in db.query(SentimentRollup)}
+
+
+def test_reviews_fold_into_hourly_buckets(rollups):
+    db = rollups
+    first = [_review(datetime(2025, 12, 1, 9, 5), 'positive', 0.9), _review(datetime(2025, 12, 1, 9, 55), 'positive', 0.7)]
+    db.add_all(first)
+    record_reviews(db, first)
+    db.commit()
+    later = [_review(datetime(2025, 12, 1, 9, 30), 'positive', 0.5), _review(datetime(2025, 12, 1, 10, 0), 'negative', 0.8)]
+    db.add_all(later)
+    record_reviews(db, later)
+    db.commit()
+
+    assert _counts(db) == {
+        (datetime(2025, 12, 1, 9), 'positive'): (3, 2.1),
+        (datetime(2025, 12, 1, 10), 'negative'): (1, 0.8),
+    }
+
+
+def test_rebuild_matches_incremental_rollups(rollups):
+    db = rollups
+    reviews = [_review(datetime(2025, 12, 1, hour), sentiment, 0.6)
+               for hour, sentiment in [(8, 'positive'), (8, 'negative'), (9, 'positive')]]
+    db.add_all(reviews)
+    record_reviews(db, reviews)
+    db.add(Review(review_text='Not analyzed yet', status='pending', created_at=datetime(2025, 12, 1, 8)))
+    db.commit()
+    incremental = _counts(db)
+
+    assert rebuild_rollups(db) == 3
+    assert _counts(db) == incremental
+
+
+def test_stats_distribution_and_volume(rollups):
+    db = rollups
+    reviews = [_review(datetime(2025, 12, 1, 9), 'positive', 0.9), _review(datetime(2025, 12, 1, 15), 'positive', 0.7),
+               _review(datetime(2025, 12, 2, 9), 'negative', 0.6), _review(datetime(2025, 11, 1, 9), 'negative', 0.6)]
+    db.add_all(reviews)
+    record_reviews(db, reviews)
+    db.commit()
+
+    stats = sentiment_stats(db, datetime(2025, 12, 1), datetime(2025, 12, 3))
+    assert stats['total'] == 3
+    assert stats['distribution']['positive'] == {'count': 2, 'percentage': 66.67, 'average_confidence': 0.8}
+    assert stats['average_confidence'] == pytest.approx(0.7333, abs=1e-4)
+    assert stats['volume'] == [
+        {'period': '2025-12-01T00:00:00', 'counts': {'positive': 2}},
+        {'period': '2025-12-02T00:00:00', 'counts': {'negative': 1}},
+    ]
+    hourly = sentiment_stats(db, datetime(2025, 12, 1), datetime(2025, 12, 2), granularity='hour')
+    assert [item['period'] for item in hourly['volume']] == ['2025-12-01T09:00:00', '2025-12-01T15:00:00']
+
+
+def test_empty_range(rollups):
+    stats = sentiment_stats(rollups, datetime(2020, 1, 1), datetime(2020, 1, 2))
+    assert (stats['total'], stats['distribution'], stats['average_confidence']) == (0, {}, None)
@@ -9,12 +9,16 @@ export function ReviewResults({ analysis }) {
     const { data } = analysis
     const { sentiment, confidence_score, key_points, review_text } = data
 
-    // Parse key points JSON
+    // Key points arrive as an array (older responses sent a JSON string)
     let keyPointsArray = []
-    try {
-        keyPointsArray = JSON.parse(key_points)
-    } catch (e) {
-        keyPointsArray = [key_points]
+    if (Array.isArray(key_points)) {
+        keyPointsArray = key_points
+    } else if (key_points) {
+        try {
+            keyPointsArray = JSON.parse(key_points)
+        } catch (e) {
+            keyPointsArray = [key_points]
+        }
     }
 
     // Sentiment configuration
@@ -131,7 +135,10 @@ ReviewResults.propTypes = {
             review_text: PropTypes.string,
             sentiment: PropTypes.string,
             confidence_score: PropTypes.number,
-            key_points: PropTypes.string,
+            key_points: PropTypes.oneOfType([
+                PropTypes.arrayOf(PropTypes.string),
+                PropTypes.string,
+            ]),
             created_at: PropTypes.string,
         }),
     }),